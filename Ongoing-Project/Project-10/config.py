@@ -12,6 +12,17 @@ API_KEY = os.getenv("RAPIDAPI_KEY", "YOUR_API_KEY")
 API_HOST = "exchange-liquidation-tracker.p.rapidapi.com"
 API_BASE_URL = f"https://{API_HOST}/api"
 
+# Request Settings
+API_CONNECT_TIMEOUT = 5.0   # seconds
+API_READ_TIMEOUT = 30.0     # seconds
+API_MAX_RETRIES = 3
+API_BACKOFF_BASE = 0.5      # seconds, doubled on every retry
+API_BACKOFF_MAX = 30.0      # seconds
+API_RETRY_STATUSES = [429, 500, 502, 503, 504]
+API_ACCEPT_ENCODING = "gzip, deflate"
+API_READ_CHUNK_SIZE = 64 * 1024  # bytes
+API_TRANSFER_LOG_SIZE = 100      # per-request transfer records kept in memory
+
 # Default Parameters
 DEFAULT_EXCHANGE = "Bi**ce"
 DEFAULT_PAIR = "BTC/USDT"
@@ -20,11 +31,69 @@ DEFAULT_TIME_TYPE = "1D"
 # Leverage Levels
 LEVERAGE_LEVELS = ["10x", "25x", "50x", "100x"]
 
+# Batch Settings
+BATCH_MARKETS = [
+    ("Bi**ce", "BTC/USDT", "1D"),
+    ("Bi**ce", "ETH/USDT", "1D"),
+    ("Bi**ce", "SOL/USDT", "1D"),
+]
+BATCH_FETCH_WORKERS = 8
+BATCH_PROCESS_WORKERS = os.cpu_count() or 1
+NEAR_SPOT_PCT = 2.0  # Band (+/- %) around current price used for ranking
+
+# Streaming Statistics Settings
+STATS_WINDOW = 24       # Snapshots used for rolling metrics
+STATS_EWMA_ALPHA = 0.1  # EWMA smoothing factor
+
+# Scenario Engine Settings
+SCENARIO_DEPTH_USD_PER_PCT = 100_000_000  # Forced-order USD that moves price 1%
+SCENARIO_MAX_ITER = 50
+SCENARIO_TOL = 1e-6            # Cascade convergence, relative to current price
+SCENARIO_GRID_RANGE_PCT = 20.0
+SCENARIO_GRID_POINTS = 401
+
+# Multi-Timeframe Settings
+MTF_TIMEFRAMES = ["1d", "7d", "30D"]
+MTF_NUM_BINS = 200  # Price bins in the common grid
+
+# Animation Settings
+ANIMATION_NUM_BINS = 200  # Price bins in the common grid
+ANIMATION_DPI = 80        # Frame resolution (16x12 in -> 1280x960 px)
+ANIMATION_FPS = 4         # Playback frame rate
+
+# Sparse Storage Settings
+SPARSE_MIN_LEVEL = 0.0  # Liquidation levels at or below this amount (USD) are not stored
+
+# Memory Profiling Settings
+PROFILE_TOP_SITES = 10  # Allocation sites reported per stage with --profile-memory
+
+# Chunked Processing Settings
+CHUNK_SIZE = 50_000            # Rows parsed at once per leverage block
+CHUNK_MEMORY_BUDGET_MB = 64.0  # Working memory budget for chunked processing
+CHUNK_TOP_K = 100              # Critical zones retained per leverage level
+CHUNK_MEASURE_MEMORY = False   # Trace the peak working memory with tracemalloc
+
+# Query Service Settings
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8050
+SERVICE_TTL_SECONDS = 300
+SERVICE_PROCESSOR_CACHE_MB = 512
+SERVICE_RENDER_CACHE_MB = 128
+
+# Processed Data Settings
+PROCESSED_FORMAT_VERSION = 2
+PROCESSED_TOP_N = 20  # Critical zones stored per leverage level
+PROCESSED_MMAP = True  # Memory-map processed arrays on warm start
+
 # Visualization Settings
 FIGURE_SIZE = (14, 8)
 DPI = 100
 COLOR_PALETTE = "viridis"
 
+# Artifact Writer Settings
+ARTIFACT_WRITER_WORKERS = 2
+ARTIFACT_QUEUE_SIZE = 8  # Pending artifacts before submit blocks
+
 # File Paths
 DATA_DIR = "data"
 RAW_DATA_DIR = os.path.join(DATA_DIR, "raw")
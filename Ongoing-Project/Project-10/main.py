@@ -2,12 +2,22 @@
 Main execution script for Liquidation Visualizer
 Project 10: Visualizing liquidation patterns across different leverage levels
 """
+import argparse
+import contextlib
 import logging
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend
 from src.data_fetcher import LiquidationDataFetcher
 from src.data_processor import LiquidationDataProcessor
-from src.visualizer import LiquidationVisualizer
+from src.chunked_processor import ChunkedLiquidationProcessor
+from src.sparse_processor import SparseLiquidationProcessor
+from src.visualizer import LiquidationVisualizer, MultiTimeframeVisualizer
+from src.batch_runner import BatchLiquidationRunner
+from src.artifact_writer import ArtifactWriter
+from src.query_service import LiquidationQueryService, create_server
+from src.multi_timeframe import MultiTimeframeProcessor
+from src.animation import LiquidationAnimator, load_snapshots
+from src.profiling import MemoryProfiler
 import config
 
 # Configure logging
@@ -18,31 +28,68 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def main():
+def main(chunked=False, sparse=False, profile_memory=False):
     """
     Main execution function
+    
+    Args:
+        chunked: Process in bounded-memory chunks (skips per-row heatmaps)
+        sparse: Store only levels above config.SPARSE_MIN_LEVEL
+        profile_memory: Record per-stage memory usage and write a report to REPORTS_DIR
     """
+    profiler = MemoryProfiler() if profile_memory else None
+    
+    def stage(name):
+        """Profile a pipeline stage when profiling is enabled"""
+        return profiler.stage(name) if profiler else contextlib.nullcontext()
+    
     try:
         logger.info("="*60)
         logger.info("Project 10: Liquidation Visualizer")
         logger.info("="*60)
         
+        if profiler:
+            profiler.start()
+        
         # Step 1: Fetch liquidation data
         logger.info("\n[Step 1] Fetching liquidation data...")
-        fetcher = LiquidationDataFetcher(api_key=config.API_KEY)
-        raw_data = fetcher.fetch_liquidation_map(
-            exchange=config.DEFAULT_EXCHANGE,
-            pair=config.DEFAULT_PAIR,
-            time_type=config.DEFAULT_TIME_TYPE
-        )
+        with stage("fetch"):
+            fetcher = LiquidationDataFetcher(api_key=config.API_KEY)
+            raw_data = fetcher.fetch_liquidation_map(
+                exchange=config.DEFAULT_EXCHANGE,
+                pair=config.DEFAULT_PAIR,
+                time_type=config.DEFAULT_TIME_TYPE
+            )
         
         # Step 2: Process data
         logger.info("\n[Step 2] Processing liquidation data...")
-        processor = LiquidationDataProcessor(raw_data)
+        with stage("process"):
+            if chunked:
+                processor = ChunkedLiquidationProcessor(raw_data)
+                logger.info(f"Chunked processing memory: {processor.get_memory_report()}")
+                # The processor released its reference; free the decoded response
+                del raw_data
+            elif sparse:
+                processor = SparseLiquidationProcessor.load_or_process(
+                    raw_data, config.PROCESSED_DATA_DIR
+                )
+                logger.info(f"Sparse storage memory: {processor.get_memory_report()}")
+            else:
+                processor = LiquidationDataProcessor.load_or_process(
+                    raw_data, config.PROCESSED_DATA_DIR
+                )
+        
+        # The combined frame is not needed below; build it to attribute pd.concat
+        if profiler and not chunked:
+            with stage("combine"):
+                combined = processor.get_all_leverage_data()
+                logger.info(f"Combined data: {len(combined)} rows")
+            del combined
         
         # Display summary statistics
         logger.info("\n[Step 3] Generating summary statistics...")
-        summary = processor.get_liquidation_summary()
+        with stage("statistics"):
+            summary = processor.get_liquidation_summary()
         print("\n" + "="*60)
         print("LIQUIDATION SUMMARY - ALL LEVERAGE LEVELS")
         print("="*60)
@@ -51,44 +98,289 @@ def main():
         
         # Step 4: Create visualizations
         logger.info("\n[Step 4] Creating visualizations...")
-        visualizer = LiquidationVisualizer(processor)
+        # Figures are rendered in this thread and written in the background
+        with stage("visualize"), ArtifactWriter() as writer:
+            visualizer = LiquidationVisualizer(processor, writer=writer, show=False)
+            
+            # 4.1: Liquidation heatmap for all leverage levels (needs per-row data)
+            if not chunked:
+                logger.info("Creating liquidation heatmap...")
+                visualizer.plot_liquidation_heatmap(
+                    save_path=f"{config.FIGURES_DIR}/liquidation_heatmap_all.png"
+                )
+            
+            # 4.2: Compare leverage levels
+            logger.info("Creating leverage comparison...")
+            visualizer.compare_leverage_levels(
+                save_path=f"{config.FIGURES_DIR}/leverage_comparison.png"
+            )
+            
+            # 4.3: Identify critical zones for 100x leverage
+            logger.info("Identifying critical liquidation zones...")
+            visualizer.identify_liquidation_zones(
+                leverage="100x",
+                top_n=10,
+                save_path=f"{config.FIGURES_DIR}/critical_zones_100x.png"
+            )
+            
+            # 4.4: Create interactive heatmap (needs per-row data)
+            if not chunked:
+                logger.info("Creating interactive heatmap...")
+                visualizer.create_interactive_heatmap(
+                    leverage="100x",
+                    save_path=f"{config.FIGURES_DIR}/interactive_heatmap_100x.html"
+                )
         
-        # 4.1: Liquidation heatmap for all leverage levels
-        logger.info("Creating liquidation heatmap...")
-        visualizer.plot_liquidation_heatmap(
-            save_path=f"{config.FIGURES_DIR}/liquidation_heatmap_all.png"
-        )
+        if profiler:
+            print("="*60)
+            print("MEMORY PROFILE")
+            print("="*60)
+            print(profiler.format_report())
+            print("="*60 + "\n")
+            profiler.write_report(config.REPORTS_DIR)
+        
+        logger.info("\n" + "="*60)
+        logger.info("Analysis completed successfully!")
+        logger.info(f"Results saved to: {config.RESULTS_DIR}/")
+        logger.info("="*60)
         
-        # 4.2: Compare leverage levels
-        logger.info("Creating leverage comparison...")
-        visualizer.compare_leverage_levels(
-            save_path=f"{config.FIGURES_DIR}/leverage_comparison.png"
+    except Exception as e:
+        logger.error(f"Error in main execution: {str(e)}")
+        raise
+    finally:
+        if profiler:
+            profiler.stop()
+
+
+def run_batch(markets=None, charts=False):
+    """
+    Batch execution across multiple markets
+
+    Args:
+        markets: List of (exchange, pair, time_type) tuples
+        charts: Render heatmap, comparison and zone charts per market
+    """
+    try:
+        logger.info("="*60)
+        logger.info("Project 10: Liquidation Visualizer - Batch Mode")
+        logger.info("="*60)
+
+        runner = BatchLiquidationRunner(
+            fetcher=LiquidationDataFetcher(api_key=config.API_KEY),
+            figures_dir=config.FIGURES_DIR if charts else None
         )
+        cross_market = runner.run(markets or config.BATCH_MARKETS)
+        ranking = runner.rank_markets(cross_market)
+
+        print("\n" + "="*60)
+        print(f"CROSS-MARKET RANKING - LIQUIDATIONS WITHIN +/-{config.NEAR_SPOT_PCT}% OF SPOT")
+        print("="*60)
+        print(ranking.to_string(index=False))
+        print("="*60)
+        print("STAGE THROUGHPUT")
+        print("="*60)
+        print(runner.get_throughput_report().to_string(index=False))
+        print("="*60 + "\n")
+
+        cross_market.to_csv(f"{config.REPORTS_DIR}/cross_market_summary.csv", index=False)
+        ranking.to_csv(f"{config.REPORTS_DIR}/cross_market_ranking.csv", index=False)
+        logger.info(f"Results saved to: {config.REPORTS_DIR}/")
+
+    except Exception as e:
+        logger.error(f"Error in batch execution: {str(e)}")
+        raise
+
+
+def run_animation(save_path=None):
+    """
+    Render a time-lapse of the saved raw snapshots for the default market
+    
+    Args:
+        save_path: Output .gif or .mp4 path (default: FIGURES_DIR/liquidation_timelapse.gif)
+    """
+    try:
+        logger.info("="*60)
+        logger.info("Project 10: Liquidation Visualizer - Time-Lapse")
+        logger.info("="*60)
+        
+        snapshots = load_snapshots()
+        if not snapshots:
+            logger.error(f"No saved snapshots found in {config.RAW_DATA_DIR}/")
+            return
         
-        # 4.3: Identify critical zones for 100x leverage
-        logger.info("Identifying critical liquidation zones...")
-        visualizer.identify_liquidation_zones(
-            leverage="100x",
-            top_n=10,
-            save_path=f"{config.FIGURES_DIR}/critical_zones_100x.png"
+        labels, processors = zip(*snapshots)
+        save_path = save_path or f"{config.FIGURES_DIR}/liquidation_timelapse.gif"
+        
+        animator = LiquidationAnimator()
+        stats = animator.render(
+            processors, save_path, labels=labels,
+            title=f"{config.DEFAULT_PAIR} Liquidation Map Time-Lapse ({config.DEFAULT_EXCHANGE})"
         )
         
-        # 4.4: Create interactive heatmap
-        logger.info("Creating interactive heatmap...")
-        visualizer.create_interactive_heatmap(
-            leverage="100x",
-            save_path=f"{config.FIGURES_DIR}/interactive_heatmap_100x.html"
+        logger.info(
+            f"Rendered {stats['frames']} frames at {stats['frames_per_second']:.1f} frames/s "
+            f"({stats['total_seconds']:.2f}s including encoding)"
         )
         
-        logger.info("\n" + "="*60)
-        logger.info("Analysis completed successfully!")
-        logger.info(f"Results saved to: {config.RESULTS_DIR}/")
+    except Exception as e:
+        logger.error(f"Error rendering animation: {str(e)}")
+        raise
+
+
+def run_timeframes(timeframes=None):
+    """
+    Compare liquidation maps across timeframes
+    
+    Args:
+        timeframes: List of timeframes (default: config.MTF_TIMEFRAMES)
+    """
+    try:
+        logger.info("="*60)
+        logger.info("Project 10: Liquidation Visualizer - Timeframe Comparison")
         logger.info("="*60)
         
+        fetcher = LiquidationDataFetcher(api_key=config.API_KEY)
+        raw_by_timeframe = fetcher.fetch_multiple_timeframes(
+            exchange=config.DEFAULT_EXCHANGE,
+            pair=config.DEFAULT_PAIR,
+            timeframes=timeframes or config.MTF_TIMEFRAMES
+        )
+        
+        mtf = MultiTimeframeProcessor(raw_by_timeframe)
+        comparison = mtf.compare(normalize=True)
+        
+        print("\n" + "="*60)
+        print(f"LIQUIDATION ZONES CHANGED VS {comparison['reference']}")
+        print("="*60)
+        print(comparison['zones'].to_string(index=False))
+        print("="*60 + "\n")
+        
+        with ArtifactWriter() as writer:
+            visualizer = MultiTimeframeVisualizer(mtf, writer=writer, show=False)
+            visualizer.plot_timeframe_comparison(
+                save_path=f"{config.FIGURES_DIR}/timeframe_comparison.png"
+            )
+        
+        logger.info(f"Results saved to: {config.FIGURES_DIR}/")
+        
     except Exception as e:
-        logger.error(f"Error in main execution: {str(e)}")
+        logger.error(f"Error in timeframe comparison: {str(e)}")
         raise
 
 
+def run_server(host=config.SERVICE_HOST, port=config.SERVICE_PORT):
+    """
+    Serve liquidation queries over local HTTP until interrupted
+    
+    Args:
+        host: Interface to bind
+        port: Port to bind
+    """
+    service = LiquidationQueryService(
+        fetcher=LiquidationDataFetcher(api_key=config.API_KEY)
+    )
+    server = create_server(service, host, port)
+    logger.info(f"Serving on http://{host}:{server.server_port}/ "
+                "(/summary, /zones, /band, /chart, /stats)")
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down server")
+    finally:
+        server.server_close()
+
+
+def parse_market(value):
+    """Parse an EXCHANGE:PAIR:TIME_TYPE market argument"""
+    parts = value.split(":")
+    if len(parts) != 3:
+        raise argparse.ArgumentTypeError(
+            f"Invalid market '{value}', expected EXCHANGE:PAIR:TIME_TYPE"
+        )
+    return tuple(parts)
+
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments
+    
+    Run modes (--batch, --animate, --timeframes, --serve) are mutually
+    exclusive; options of one mode are rejected in the others.
+    
+    Args:
+        argv: Argument list (default: sys.argv[1:])
+    """
+    parser = argparse.ArgumentParser(description="Liquidation Visualizer")
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument(
+        "--batch", action="store_true",
+        help="Run the pipeline across multiple markets"
+    )
+    parser.add_argument(
+        "--charts", action="store_true",
+        help="With --batch, render charts for every market"
+    )
+    storage = parser.add_mutually_exclusive_group()
+    storage.add_argument(
+        "--chunked", action="store_true",
+        help="Process large maps in bounded-memory chunks"
+    )
+    storage.add_argument(
+        "--sparse", action="store_true",
+        help="Store only liquidation levels above config.SPARSE_MIN_LEVEL"
+    )
+    parser.add_argument(
+        "--profile-memory", action="store_true",
+        help="Report per-stage memory usage (combine with --chunked/--sparse)"
+    )
+    modes.add_argument(
+        "--animate", nargs="?", const="", metavar="PATH",
+        help="Render a time-lapse (.gif/.mp4) of saved raw snapshots"
+    )
+    modes.add_argument(
+        "--timeframes", nargs="*", metavar="TIME_TYPE",
+        help="Compare timeframes (default: config.MTF_TIMEFRAMES)"
+    )
+    modes.add_argument(
+        "--serve", action="store_true",
+        help="Serve summaries, zones, band queries and charts over local HTTP"
+    )
+    parser.add_argument(
+        "--host",
+        help=f"Host for --serve (default: {config.SERVICE_HOST})"
+    )
+    parser.add_argument(
+        "--port", type=int,
+        help=f"Port for --serve (default: {config.SERVICE_PORT})"
+    )
+    parser.add_argument(
+        "--markets", nargs="+", type=parse_market, metavar="EXCHANGE:PAIR:TIME_TYPE",
+        help="Markets for batch mode (default: config.BATCH_MARKETS)"
+    )
+    args = parser.parse_args(argv)
+    
+    other_mode = args.batch or args.serve or args.animate is not None or args.timeframes is not None
+    if other_mode and (args.chunked or args.sparse or args.profile_memory):
+        parser.error("--chunked, --sparse and --profile-memory apply only to the default pipeline")
+    if not args.batch and (args.charts or args.markets):
+        parser.error("--charts and --markets require --batch")
+    if not args.serve and (args.host is not None or args.port is not None):
+        parser.error("--host and --port require --serve")
+    
+    args.host = args.host if args.host is not None else config.SERVICE_HOST
+    args.port = args.port if args.port is not None else config.SERVICE_PORT
+    return args
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.serve:
+        run_server(args.host, args.port)
+    elif args.animate is not None:
+        run_animation(args.animate or None)
+    elif args.timeframes is not None:
+        run_timeframes(args.timeframes)
+    elif args.batch:
+        run_batch(args.markets, charts=args.charts)
+    else:
+        main(chunked=args.chunked, sparse=args.sparse, profile_memory=args.profile_memory)
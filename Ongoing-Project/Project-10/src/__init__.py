@@ -1,12 +1,39 @@
 """
 Liquidation Visualizer Package
 """
-from .data_fetcher import LiquidationDataFetcher
+from .data_fetcher import LiquidationDataFetcher, UpstreamError
 from .data_processor import LiquidationDataProcessor
-from .visualizer import LiquidationVisualizer
+from .chunked_processor import ChunkedLiquidationProcessor
+from .sparse_processor import SparseLiquidationProcessor
+from .visualizer import LiquidationVisualizer, MultiTimeframeVisualizer
+from .batch_runner import BatchLiquidationRunner
+from .streaming_stats import LiquidationStatsAccumulator, StreamingStatistic
+from .scenario_engine import LiquidationScenarioEngine
+from .artifact_writer import ArtifactWriter, ArtifactWriteError
+from .query_service import LiquidationQueryService, InvalidQueryError
+from .multi_timeframe import MultiTimeframeProcessor
+from .animation import LiquidationAnimator
+from .figure_templates import FigureTemplates
+from .profiling import MemoryProfiler
 
 __all__ = [
     'LiquidationDataFetcher',
+    'UpstreamError',
     'LiquidationDataProcessor',
-    'LiquidationVisualizer'
+    'ChunkedLiquidationProcessor',
+    'SparseLiquidationProcessor',
+    'LiquidationVisualizer',
+    'MultiTimeframeVisualizer',
+    'BatchLiquidationRunner',
+    'LiquidationStatsAccumulator',
+    'StreamingStatistic',
+    'LiquidationScenarioEngine',
+    'ArtifactWriter',
+    'ArtifactWriteError',
+    'LiquidationQueryService',
+    'InvalidQueryError',
+    'MultiTimeframeProcessor',
+    'LiquidationAnimator',
+    'FigureTemplates',
+    'MemoryProfiler'
 ]
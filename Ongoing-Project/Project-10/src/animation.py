@@ -0,0 +1,319 @@
+"""
+Animation Module for Liquidation Visualizer
+Renders time-lapse animations of liquidation maps across a sequence of snapshots
+"""
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+import io
+import json
+import logging
+import math
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from typing import Dict, Iterator, List, Optional, Sequence
+from PIL import Image
+from .artifact_writer import ArtifactWriter, write_atomic
+from .data_processor import LiquidationDataProcessor
+from .multi_timeframe import MultiTimeframeProcessor
+import config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class LiquidationAnimator:
+    """
+    Renders a time-lapse of liquidation maps (one panel per leverage level)
+    
+    Snapshots are aligned on a common price grid, the figure and its artists
+    are built once, and each frame only updates the bar heights, the current
+    price lines and the frame label. Frames are blitted: the static layout is
+    drawn once and cached, then restored and overdrawn with the animated
+    artists for every frame.
+    """
+    
+    def __init__(
+        self,
+        num_bins: int = config.ANIMATION_NUM_BINS,
+        dpi: int = config.ANIMATION_DPI,
+        fps: float = config.ANIMATION_FPS
+    ):
+        """
+        Initialize the animator
+        
+        Args:
+            num_bins: Number of price bins in the common grid
+            dpi: Resolution of the rendered frames
+            fps: Playback frame rate of the exported animation
+        """
+        self.num_bins = num_bins
+        self.dpi = dpi
+        self.fps = fps
+        self.render_stats: Dict = {}
+    
+    def iter_frames(
+        self,
+        snapshots: Sequence[LiquidationDataProcessor],
+        labels: Optional[Sequence[str]] = None,
+        title: str = "Liquidation Map Time-Lapse"
+    ) -> Iterator[np.ndarray]:
+        """
+        Render the snapshots frame by frame
+        
+        Args:
+            snapshots: Processors in time order
+            labels: Frame labels (default: snapshot numbers)
+            title: Figure title
+        
+        Yields:
+            RGBA frame arrays of shape (height, width, 4); each array is a
+            copy and stays valid after the next frame is rendered
+        """
+        if not snapshots:
+            raise ValueError("At least one snapshot is required")
+        
+        labels = list(labels) if labels is not None else [
+            f"Snapshot {i + 1}/{len(snapshots)}" for i in range(len(snapshots))
+        ]
+        if len(labels) != len(snapshots) or len(set(labels)) != len(labels):
+            raise ValueError("labels must be unique and match the snapshots")
+        
+        mtf = MultiTimeframeProcessor.from_processors(
+            dict(zip(labels, snapshots)), num_bins=self.num_bins
+        )
+        prices = np.array([snapshot.current_price for snapshot in snapshots])
+        
+        start = time.perf_counter()
+        fig, artists = self._build_figure(mtf, title)
+        setup_seconds = time.perf_counter() - start
+        
+        try:
+            canvas = fig.canvas
+            canvas.draw()
+            background = canvas.copy_from_bbox(fig.bbox)
+            
+            # Time spent rendering only, excluding the consumer (encoder)
+            frame_seconds = 0.0
+            for frame, label in enumerate(labels):
+                start = time.perf_counter()
+                canvas.restore_region(background)
+                self._update_artists(artists, mtf, frame, prices[frame], label)
+                for artist in artists['all']:
+                    fig.draw_artist(artist)
+                rgba = np.array(canvas.buffer_rgba())
+                frame_seconds += time.perf_counter() - start
+                yield rgba
+            
+            self.render_stats = {
+                'frames': len(labels),
+                'frame_size': canvas.get_width_height(),
+                'setup_seconds': setup_seconds,
+                'frame_seconds': frame_seconds,
+                'frames_per_second': len(labels) / frame_seconds if frame_seconds > 0 else np.inf
+            }
+        finally:
+            plt.close(fig)
+    
+    def _build_figure(self, mtf: MultiTimeframeProcessor, title: str):
+        """Create the figure, static decoration and animated artists once"""
+        num_leverage = len(mtf.leverage_levels)
+        rows = math.ceil(num_leverage / 2)
+        fig, axes = plt.subplots(rows, 2, figsize=(16, 6 * rows), dpi=self.dpi, squeeze=False)
+        axes = axes.flatten()
+        
+        edges = mtf.price_edges
+        zeros = np.zeros(mtf.num_bins)
+        artists = {'long': [], 'short': [], 'price': [], 'all': []}
+        
+        for idx, leverage in enumerate(mtf.leverage_levels):
+            ax = axes[idx]
+            
+            long_bars = ax.stairs(zeros, edges, fill=True, color='red', alpha=0.6, label='Long')
+            short_bars = ax.stairs(zeros, edges, fill=True, color='green', alpha=0.6, label='Short')
+            price_line = ax.axvline(mtf.current_price, color='blue', linestyle='--',
+                                    linewidth=2, label='Current Price')
+            
+            # Fixed limits keep the cached background valid for every frame
+            ax.set_xlim(edges[0], edges[-1])
+            ax.set_ylim(0, max(mtf.cube[:, idx, :].max(), 1.0) * 1.05)
+            ax.set_xlabel('Price (USD)')
+            ax.set_ylabel('Liquidation Amount (USD)')
+            ax.set_title(f'{leverage} Leverage', fontweight='bold')
+            ax.grid(True, alpha=0.3)
+            
+            artists['long'].append(long_bars)
+            artists['short'].append(short_bars)
+            artists['price'].append(price_line)
+        
+        for ax in axes[num_leverage:]:
+            ax.set_visible(False)
+        
+        fig.suptitle(title, fontsize=16, fontweight='bold', y=0.995)
+        # One static legend outside the panels, so animated bars never cover it
+        fig.legend(*axes[0].get_legend_handles_labels(), loc='upper right', ncol=3)
+        frame_label = fig.text(0.5, 0.955, '', ha='center', fontsize=12)
+        artists['label'] = frame_label
+        
+        fig.tight_layout(rect=(0, 0, 1, 0.95))
+        
+        artists['all'] = artists['long'] + artists['short'] + artists['price'] + [frame_label]
+        for artist in artists['all']:
+            artist.set_animated(True)
+        
+        return fig, artists
+    
+    @staticmethod
+    def _update_artists(
+        artists: Dict,
+        mtf: MultiTimeframeProcessor,
+        frame: int,
+        current_price: float,
+        label: str
+    ) -> None:
+        """Update bar heights, price lines and label in place for one frame"""
+        is_long = mtf.price_centers < current_price
+        
+        for idx in range(len(mtf.leverage_levels)):
+            levels = mtf.cube[frame, idx]
+            artists['long'][idx].set_data(values=np.where(is_long, levels, 0.0))
+            artists['short'][idx].set_data(values=np.where(is_long, 0.0, levels))
+            artists['price'][idx].set_xdata([current_price, current_price])
+        
+        artists['label'].set_text(f"{label} | Current Price: ${current_price:,.0f}")
+    
+    def render(
+        self,
+        snapshots: Sequence[LiquidationDataProcessor],
+        save_path: str,
+        labels: Optional[Sequence[str]] = None,
+        title: str = "Liquidation Map Time-Lapse",
+        writer: Optional[ArtifactWriter] = None
+    ) -> Dict:
+        """
+        Render the snapshots and export a GIF or MP4
+        
+        Args:
+            snapshots: Processors in time order
+            save_path: Output path; the extension selects the format (.gif or .mp4)
+            labels: Frame labels (default: snapshot numbers)
+            title: Figure title
+            writer: ArtifactWriter for background writes, or None to write inline
+        
+        Returns:
+            Render statistics (frames, frame size, setup/frame time, frames per second)
+        """
+        extension = os.path.splitext(save_path)[1].lower()
+        frames = self.iter_frames(snapshots, labels, title)
+        
+        start = time.perf_counter()
+        if extension == '.gif':
+            data = self._encode_gif(frames)
+        elif extension == '.mp4':
+            data = self._encode_mp4(frames)
+        else:
+            raise ValueError(f"Unsupported animation format '{extension}' (use .gif or .mp4)")
+        
+        self.render_stats['total_seconds'] = time.perf_counter() - start
+        
+        if writer is not None:
+            writer.submit_bytes(save_path, data)
+        else:
+            write_atomic(save_path, data)
+        
+        logger.info(
+            f"Animation saved to {save_path}: {self.render_stats['frames']} frames, "
+            f"{self.render_stats['frames_per_second']:.1f} frames/s rendered"
+        )
+        return self.render_stats
+    
+    def _encode_gif(self, frames: Iterator[np.ndarray]) -> bytes:
+        """Encode frames as an animated GIF, one frame in memory at a time"""
+        # Fast octree quantization without dithering keeps flat plot colors exact
+        images = (
+            Image.fromarray(frame[..., :3]).quantize(
+                256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE
+            )
+            for frame in frames
+        )
+        first = next(images)
+        
+        buffer = io.BytesIO()
+        first.save(
+            buffer, format='GIF', save_all=True, append_images=images,
+            duration=int(1000 / self.fps), loop=0
+        )
+        return buffer.getvalue()
+    
+    def _encode_mp4(self, frames: Iterator[np.ndarray]) -> bytes:
+        """Encode frames as H.264 MP4 by piping raw RGBA into ffmpeg"""
+        ffmpeg = shutil.which(matplotlib.rcParams['animation.ffmpeg_path'])
+        if ffmpeg is None:
+            raise RuntimeError("MP4 export requires ffmpeg; install it or save as .gif")
+        
+        first = next(frames)
+        height, width = first.shape[:2]
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = os.path.join(tmp_dir, "animation.mp4")
+            command = [
+                ffmpeg, '-y', '-loglevel', 'error',
+                '-f', 'rawvideo', '-pix_fmt', 'rgba', '-s', f'{width}x{height}',
+                '-r', str(self.fps), '-i', 'pipe:',
+                '-vf', 'scale=trunc(iw/2)*2:trunc(ih/2)*2',
+                '-vcodec', 'libx264', '-pix_fmt', 'yuv420p', output
+            ]
+            process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+            try:
+                process.stdin.write(first.tobytes())
+                for frame in frames:
+                    process.stdin.write(frame.tobytes())
+            finally:
+                process.stdin.close()
+                stderr = process.stderr.read()
+                process.wait()
+            
+            if process.returncode != 0:
+                raise RuntimeError(f"ffmpeg failed: {stderr.decode(errors='replace')}")
+            
+            with open(output, 'rb') as f:
+                return f.read()
+
+
+def load_snapshots(
+    exchange: str = config.DEFAULT_EXCHANGE,
+    pair: str = config.DEFAULT_PAIR,
+    time_type: str = config.DEFAULT_TIME_TYPE,
+    input_dir: str = config.RAW_DATA_DIR
+) -> List[tuple]:
+    """
+    Load saved raw snapshots for a market in time order
+    
+    Args:
+        exchange: Exchange name
+        pair: Trading pair
+        time_type: Time period
+        input_dir: Directory holding raw API responses
+    
+    Returns:
+        List of (timestamp label, LiquidationDataProcessor) tuples
+    """
+    prefix = f"{exchange}_{pair.replace('/', '_')}_{time_type}_"
+    filenames = sorted(
+        name for name in os.listdir(input_dir)
+        if name.startswith(prefix) and name.endswith('.json')
+    )
+    
+    snapshots = []
+    for name in filenames:
+        with open(os.path.join(input_dir, name)) as f:
+            raw_data = json.load(f)
+        label = name[len(prefix):-len('.json')]
+        snapshots.append((label, LiquidationDataProcessor.load_or_process(raw_data)))
+    
+    logger.info(f"Loaded {len(snapshots)} snapshots for {exchange} {pair} {time_type}")
+    return snapshots
@@ -0,0 +1,313 @@
+"""
+Artifact Writer Module for Liquidation Visualizer
+Writes rendered figures, HTML and reports to disk on background threads
+"""
+import matplotlib.pyplot as plt
+import contextlib
+import io
+import logging
+import os
+import queue
+import stat
+import tempfile
+import threading
+from typing import Iterator, List, Optional, Tuple
+import config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Queue sentinel telling a worker thread to exit
+_STOP = object()
+
+
+def _current_umask() -> int:
+    """Read the process umask (it can only be read by setting it)"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# mkstemp creates files as 0600; new artifacts get the mode open() would give
+# them. Read once at import, as os.umask is process-wide and not thread-safe.
+_NEW_FILE_MODE = 0o666 & ~_current_umask()
+
+
+class ArtifactWriteError(Exception):
+    """
+    Raised by ArtifactWriter.close when background writes failed
+    """
+    
+    def __init__(self, errors: List[Tuple[str, str]]):
+        """
+        Args:
+            errors: (path, error message) for every failed write
+        """
+        self.errors = errors
+        details = "; ".join(f"{path}: {message}" for path, message in errors)
+        super().__init__(f"Failed to write {len(errors)} artifact(s): {details}")
+
+
+class ArtifactWriter:
+    """
+    Background writer pool for rendered artifacts
+    
+    Figures are rendered into in-memory buffers on the caller thread (matplotlib
+    is not thread-safe) and closed immediately; the encoded bytes are handed to
+    worker threads through a bounded queue and written with an atomic
+    rename-into-place. When the queue is full, submit calls block, which keeps
+    memory flat when rendering outpaces the disk.
+    """
+    
+    def __init__(
+        self,
+        num_workers: int = config.ARTIFACT_WRITER_WORKERS,
+        max_queue_size: int = config.ARTIFACT_QUEUE_SIZE
+    ):
+        """
+        Initialize the writer and start worker threads
+        
+        Args:
+            num_workers: Number of background writer threads
+            max_queue_size: Maximum number of pending artifacts before blocking
+        """
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self.errors: List[Tuple[str, str]] = []
+        self.bytes_written = 0
+        self.files_written = 0
+        self._closed = False
+        
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"artifact-writer-{i}", daemon=True)
+            for i in range(max(1, num_workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+    
+    def __enter__(self) -> "ArtifactWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+            return
+        # Write errors were logged; do not mask the exception already propagating
+        try:
+            self.close()
+        except ArtifactWriteError:
+            pass
+    
+    def submit_bytes(self, path: str, data: bytes) -> None:
+        """
+        Queue raw bytes for writing (blocks while the queue is full)
+        
+        Args:
+            path: Destination file path
+            data: File contents
+        """
+        if self._closed:
+            raise RuntimeError("ArtifactWriter is closed")
+        self._queue.put((path, data))
+    
+    def submit_text(self, path: str, text: str) -> None:
+        """
+        Queue text (e.g. a report) for writing
+        
+        Args:
+            path: Destination file path
+            text: File contents
+        """
+        self.submit_bytes(path, text.encode("utf-8"))
+    
+    def submit_figure(self, fig, path: str, **savefig_kwargs) -> None:
+        """
+        Render a matplotlib figure to memory, close it and queue the bytes
+        
+        Args:
+            fig: Matplotlib figure
+            path: Destination file path (format inferred from extension)
+            **savefig_kwargs: Extra arguments for Figure.savefig
+        """
+        try:
+            data = render_figure(fig, path, **savefig_kwargs)
+        finally:
+            plt.close(fig)
+        self.submit_bytes(path, data)
+    
+    def submit_html(self, fig, path: str) -> None:
+        """
+        Render a Plotly figure to HTML and queue it
+        
+        Args:
+            fig: Plotly figure
+            path: Destination file path
+        """
+        self.submit_text(path, fig.to_html())
+    
+    def flush(self) -> None:
+        """
+        Block until all queued artifacts have been written
+        """
+        self._queue.join()
+    
+    def close(self) -> None:
+        """
+        Flush pending artifacts and stop worker threads
+        
+        Raises:
+            ArtifactWriteError: If any queued artifact could not be written
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            self._queue.put(_STOP)
+        for worker in self._workers:
+            worker.join()
+        
+        logger.info(
+            f"Artifact writer wrote {self.files_written} files "
+            f"({self.bytes_written:,} bytes), {len(self.errors)} errors"
+        )
+        if self.errors:
+            raise ArtifactWriteError(list(self.errors))
+    
+    def _worker(self) -> None:
+        """Write queued artifacts until told to stop"""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                path, data = item
+                try:
+                    write_atomic(path, data)
+                    with self._lock:
+                        self.files_written += 1
+                        self.bytes_written += len(data)
+                except Exception as e:
+                    logger.error(f"Failed to write {path}: {str(e)}")
+                    with self._lock:
+                        self.errors.append((path, str(e)))
+            finally:
+                self._queue.task_done()
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """
+    Write bytes to a temporary file and rename it into place
+    
+    An existing file keeps its permissions; a new file gets the default
+    permissions for the process umask.
+    
+    Args:
+        path: Destination file path
+        data: File contents
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = _NEW_FILE_MODE
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def render_figure(fig, path: str, **savefig_kwargs) -> bytes:
+    """
+    Render a matplotlib figure into memory
+    
+    Args:
+        fig: Matplotlib figure
+        path: Destination path, used to infer the output format
+        **savefig_kwargs: Extra arguments for Figure.savefig
+    
+    Returns:
+        Encoded figure bytes
+    """
+    buffer = io.BytesIO()
+    fmt = os.path.splitext(path)[1].lstrip('.') or None
+    fig.savefig(buffer, format=fmt, **savefig_kwargs)
+    return buffer.getvalue()
+
+
+@contextlib.contextmanager
+def closing_figure(fig) -> Iterator:
+    """
+    Close a matplotlib figure when the block exits, also when drawing fails
+    
+    Args:
+        fig: Matplotlib figure
+    """
+    try:
+        yield fig
+    finally:
+        plt.close(fig)
+
+
+def save_figure(
+    fig,
+    save_path: Optional[str],
+    writer: Optional[ArtifactWriter] = None,
+    show: bool = True,
+    close: bool = True,
+    **savefig_kwargs
+) -> None:
+    """
+    Save (inline or through a writer), optionally show, and close a figure
+    
+    Args:
+        fig: Matplotlib figure
+        save_path: Destination path or None to skip saving
+        writer: ArtifactWriter for background writes, or None to write inline
+        show: Call plt.show() before closing
+        close: Close the figure; False keeps reusable (template) figures open
+        **savefig_kwargs: Extra arguments for Figure.savefig
+    """
+    try:
+        if save_path:
+            if writer is not None:
+                writer.submit_bytes(save_path, render_figure(fig, save_path, **savefig_kwargs))
+            else:
+                fig.savefig(save_path, **savefig_kwargs)
+        if show:
+            plt.show()
+    finally:
+        if close:
+            plt.close(fig)
+
+
+def save_html(
+    fig,
+    save_path: Optional[str],
+    writer: Optional[ArtifactWriter] = None,
+    show: bool = True
+) -> None:
+    """
+    Save a Plotly figure as HTML (inline or through a writer) and optionally show it
+    
+    Args:
+        fig: Plotly figure
+        save_path: Destination path or None to skip saving
+        writer: ArtifactWriter for background writes, or None to write inline
+        show: Call fig.show()
+    """
+    if save_path:
+        if writer is not None:
+            writer.submit_html(fig, save_path)
+        else:
+            fig.write_html(save_path)
+    if show:
+        fig.show()
@@ -0,0 +1,332 @@
+"""
+Batch Runner Module for Liquidation Data
+Runs the fetch and processing pipeline across many markets and merges the results
+"""
+import pandas as pd
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+from .data_fetcher import LiquidationDataFetcher
+from .data_processor import LiquidationDataProcessor
+from .figure_templates import get_figure_templates
+from .visualizer import LiquidationVisualizer
+import config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# (exchange, pair, time_type)
+Market = Tuple[str, str, str]
+
+
+def _render_market(
+    market: Market,
+    processor: LiquidationDataProcessor,
+    figures_dir: str
+) -> float:
+    """
+    Render the heatmap, comparison and zone charts of a market
+
+    Charts are filled into the worker process's figure templates, so the
+    layout is built once per process rather than once per market.
+
+    Args:
+        market: (exchange, pair, time_type) tuple
+        processor: Processed market data
+        figures_dir: Output directory
+
+    Returns:
+        Render time in seconds
+    """
+    start = time.perf_counter()
+    exchange, pair, time_type = market
+    prefix = os.path.join(figures_dir, f"{exchange}_{pair.replace('/', '_')}_{time_type}")
+    label = f"{pair} ({exchange}, {time_type})"
+
+    visualizer = LiquidationVisualizer(processor, show=False, templates=get_figure_templates())
+    visualizer.plot_liquidation_heatmap(
+        save_path=f"{prefix}_heatmap.png",
+        title=f"Liquidation Heatmap - {label}"
+    )
+    visualizer.compare_leverage_levels(save_path=f"{prefix}_comparison.png")
+    visualizer.identify_liquidation_zones(
+        leverage="100x", top_n=10,
+        save_path=f"{prefix}_zones.png",
+        title=f"Top 10 Critical Liquidation Zones - 100x - {label}"
+    )
+
+    return time.perf_counter() - start
+
+
+def _process_market(
+    market: Market,
+    raw_data: Dict,
+    band_pct: float,
+    figures_dir: Optional[str] = None,
+    processed_dir: str = config.PROCESSED_DATA_DIR
+) -> Dict:
+    """
+    Process a single market (runs inside a worker process)
+
+    Args:
+        market: (exchange, pair, time_type) tuple
+        raw_data: Raw API response data
+        band_pct: Band around current price used for near-spot mass
+        figures_dir: Directory for per-market charts (None skips rendering)
+        processed_dir: Directory for processed snapshots (warm start)
+
+    Returns:
+        Dictionary with the market, its current price, summary DataFrame,
+        processing time and render time
+    """
+    start = time.perf_counter()
+    processor = LiquidationDataProcessor.load_or_process(raw_data, processed_dir)
+    summary = processor.get_liquidation_summary()
+    near_spot = processor.get_near_spot_liquidation(band_pct)
+    summary['near_spot_amount'] = summary['leverage'].map(near_spot)
+
+    exchange, pair, time_type = market
+    summary.insert(0, 'time_type', time_type)
+    summary.insert(0, 'pair', pair)
+    summary.insert(0, 'exchange', exchange)
+    summary['current_price'] = processor.current_price
+    process_seconds = time.perf_counter() - start
+
+    render_seconds = None
+    if figures_dir is not None:
+        render_seconds = _render_market(market, processor, figures_dir)
+
+    return {
+        'market': market,
+        'current_price': processor.current_price,
+        'summary': summary,
+        'process_seconds': process_seconds,
+        'render_seconds': render_seconds
+    }
+
+
+class BatchLiquidationRunner:
+    """
+    Fetches and processes liquidation data for a list of markets
+    """
+
+    def __init__(
+        self,
+        fetcher: Optional[LiquidationDataFetcher] = None,
+        fetch_workers: int = config.BATCH_FETCH_WORKERS,
+        process_workers: int = config.BATCH_PROCESS_WORKERS,
+        band_pct: float = config.NEAR_SPOT_PCT,
+        figures_dir: Optional[str] = None,
+        processed_dir: Optional[str] = None
+    ):
+        """
+        Initialize the batch runner
+
+        Args:
+            fetcher: LiquidationDataFetcher instance (created if not given)
+            fetch_workers: Number of concurrent fetch threads
+            process_workers: Number of processing worker processes
+            band_pct: Band (+/- %) around current price used for ranking
+            figures_dir: Directory for per-market charts (None skips rendering)
+            processed_dir: Directory for processed snapshots (default:
+                config.PROCESSED_DATA_DIR)
+        """
+        self.fetcher = fetcher or LiquidationDataFetcher()
+        self.fetch_workers = max(1, fetch_workers)
+        self.process_workers = max(1, process_workers)
+        self.band_pct = band_pct
+        self.figures_dir = figures_dir
+        self.processed_dir = processed_dir or config.PROCESSED_DATA_DIR
+        self.stage_stats = {}
+
+    def fetch_all(self, markets: List[Market]) -> Dict[Market, Dict]:
+        """
+        Fetch liquidation maps for all markets concurrently
+
+        Args:
+            markets: List of (exchange, pair, time_type) tuples
+
+        Returns:
+            Dictionary with market as key and raw data as value
+        """
+        results = {}
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.fetch_workers) as executor:
+            futures = {
+                executor.submit(self.fetcher.fetch_liquidation_map, *market): market
+                for market in markets
+            }
+            for future in as_completed(futures):
+                market = futures[future]
+                try:
+                    results[market] = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to fetch {market}: {str(e)}")
+
+        self._record_stage('fetch', len(results), time.perf_counter() - start)
+        return results
+
+    def process_all(self, raw_by_market: Dict[Market, Dict]) -> List[Dict]:
+        """
+        Process raw data for all markets across a process pool
+
+        The process and render stages are timed separately inside the
+        workers and summed across markets (time spent, not wall time).
+
+        Args:
+            raw_by_market: Dictionary with market as key and raw data as value
+
+        Returns:
+            List of per-market results from _process_market
+        """
+        results = []
+
+        if self.process_workers == 1 or len(raw_by_market) <= 1:
+            for market, raw_data in raw_by_market.items():
+                try:
+                    results.append(_process_market(
+                        market, raw_data, self.band_pct, self.figures_dir, self.processed_dir
+                    ))
+                except Exception as e:
+                    logger.error(f"Failed to process {market}: {str(e)}")
+        else:
+            workers = min(self.process_workers, len(raw_by_market))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(
+                        _process_market, market, raw_data, self.band_pct,
+                        self.figures_dir, self.processed_dir
+                    ): market
+                    for market, raw_data in raw_by_market.items()
+                }
+                for future in as_completed(futures):
+                    market = futures[future]
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        logger.error(f"Failed to process {market}: {str(e)}")
+
+        self._record_stage('process', len(results), sum(r['process_seconds'] for r in results))
+
+        rendered = [r['render_seconds'] for r in results if r['render_seconds'] is not None]
+        if rendered:
+            self._record_stage('render', len(rendered), sum(rendered))
+        return results
+
+    def run(
+        self,
+        markets: Optional[List[Market]] = None,
+        raw_by_market: Optional[Dict[Market, Dict]] = None
+    ) -> pd.DataFrame:
+        """
+        Run the full batch pipeline
+
+        Args:
+            markets: List of (exchange, pair, time_type) tuples
+            raw_by_market: Already fetched raw data (skips the fetch stage)
+
+        Returns:
+            Cross-market DataFrame with one row per market and leverage level
+        """
+        self.stage_stats = {}
+        start = time.perf_counter()
+
+        if raw_by_market is None:
+            markets = markets or config.BATCH_MARKETS
+            logger.info(f"Fetching {len(markets)} markets...")
+            raw_by_market = self.fetch_all(markets)
+
+        logger.info(f"Processing {len(raw_by_market)} markets...")
+        results = self.process_all(raw_by_market)
+
+        merge_start = time.perf_counter()
+        cross_market = self.merge_summaries(results)
+        self._record_stage('merge', len(results), time.perf_counter() - merge_start)
+
+        self.stage_stats['total_wall_time'] = time.perf_counter() - start
+        logger.info(f"Batch completed in {self.stage_stats['total_wall_time']:.2f}s")
+
+        return cross_market
+
+    @staticmethod
+    def merge_summaries(results: List[Dict]) -> pd.DataFrame:
+        """
+        Merge per-market summaries into one cross-market table
+
+        Args:
+            results: List of per-market results
+
+        Returns:
+            Combined DataFrame with all markets
+        """
+        if not results:
+            return pd.DataFrame()
+
+        return pd.concat([r['summary'] for r in results], ignore_index=True)
+
+    @staticmethod
+    def rank_markets(cross_market: pd.DataFrame) -> pd.DataFrame:
+        """
+        Rank markets by liquidation mass near the current price
+
+        Args:
+            cross_market: Cross-market DataFrame from run()
+
+        Returns:
+            DataFrame with one row per market, sorted by near-spot amount
+        """
+        if cross_market.empty:
+            return cross_market
+
+        ranking = (
+            cross_market
+            .groupby(['exchange', 'pair', 'time_type'], as_index=False)
+            .agg(
+                current_price=('current_price', 'first'),
+                near_spot_amount=('near_spot_amount', 'sum'),
+                total_liquidation_amount=('total_liquidation_amount', 'sum'),
+                long_liquidation_amount=('long_liquidation_amount', 'sum'),
+                short_liquidation_amount=('short_liquidation_amount', 'sum')
+            )
+            .sort_values('near_spot_amount', ascending=False)
+            .reset_index(drop=True)
+        )
+        ranking['near_spot_share'] = (
+            ranking['near_spot_amount'] / ranking['total_liquidation_amount']
+        ).fillna(0)
+        ranking.insert(0, 'rank', range(1, len(ranking) + 1))
+
+        return ranking
+
+    def get_throughput_report(self) -> pd.DataFrame:
+        """
+        Get per-stage throughput of the last run
+
+        Returns:
+            DataFrame with markets, seconds and markets/second per stage
+        """
+        rows = [
+            {'stage': stage, **stats}
+            for stage, stats in self.stage_stats.items()
+            if isinstance(stats, dict)
+        ]
+        rows.append({
+            'stage': 'total',
+            'markets': None,
+            'seconds': self.stage_stats.get('total_wall_time', 0.0),
+            'markets_per_sec': None
+        })
+        return pd.DataFrame(rows)
+
+    def _record_stage(self, stage: str, count: int, seconds: float) -> None:
+        """Record item count and duration for a pipeline stage"""
+        self.stage_stats[stage] = {
+            'markets': count,
+            'seconds': seconds,
+            'markets_per_sec': count / seconds if seconds > 0 else float('inf')
+        }
+        logger.info(f"[{stage}] {count} markets in {seconds:.2f}s")
@@ -0,0 +1,406 @@
+"""
+Chunked Processor Module for Liquidation Data
+Processes very large liquidation maps in fixed-size chunks within a memory budget
+"""
+import pandas as pd
+import numpy as np
+import logging
+import tracemalloc
+from typing import Dict, List, Optional
+from .data_processor import extract_current_price
+import config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Estimated working bytes per row of a chunk (list slices, parsed float64
+# arrays, masks and temporaries), used to size chunks to the memory budget.
+# Conservative: tracemalloc measures ~60-75 bytes per row.
+ESTIMATED_BYTES_PER_ROW = 96
+
+
+class _LeverageAggregate:
+    """
+    Mergeable partial aggregate for one leverage level
+    """
+    
+    def __init__(self, top_k: int, band_pcts: List[float]):
+        """
+        Initialize an empty aggregate
+        
+        Args:
+            top_k: Number of top rows by liquidation amount to retain
+            band_pcts: Bands (+/- %) around current price to accumulate
+        """
+        self.top_k = top_k
+        self.band_pcts = band_pcts
+        self.count = 0
+        self.total = 0.0
+        self.long = 0.0
+        self.short = 0.0
+        self.max_level = -np.inf
+        self.min_price = np.inf
+        self.max_price = -np.inf
+        self.near_spot = {band: 0.0 for band in band_pcts}
+        self.top_prices = np.empty(0)
+        self.top_levels = np.empty(0)
+    
+    def update(self, prices: np.ndarray, levels: np.ndarray, current_price: float) -> None:
+        """
+        Fold a chunk of rows into the aggregate
+        
+        Args:
+            prices: Liquidation prices of the chunk
+            levels: Liquidation amounts of the chunk
+            current_price: Current market price
+        """
+        if len(prices) == 0:
+            return
+        
+        is_long = prices < current_price
+        long_sum = levels[is_long].sum()
+        chunk_sum = levels.sum()
+        
+        self.count += len(prices)
+        self.total += chunk_sum
+        self.long += long_sum
+        self.short += chunk_sum - long_sum
+        self.max_level = max(self.max_level, levels.max())
+        self.min_price = min(self.min_price, prices.min())
+        self.max_price = max(self.max_price, prices.max())
+        
+        abs_distance_pct = np.abs((prices - current_price) / current_price * 100)
+        for band in self.band_pcts:
+            self.near_spot[band] += levels[abs_distance_pct <= band].sum()
+        
+        self._merge_top(prices, levels)
+    
+    def merge(self, other: "_LeverageAggregate") -> "_LeverageAggregate":
+        """
+        Merge another partial aggregate into this one
+        
+        Args:
+            other: Aggregate over a different set of rows
+        
+        Returns:
+            Self, updated in place
+        """
+        self.count += other.count
+        self.total += other.total
+        self.long += other.long
+        self.short += other.short
+        self.max_level = max(self.max_level, other.max_level)
+        self.min_price = min(self.min_price, other.min_price)
+        self.max_price = max(self.max_price, other.max_price)
+        for band in self.band_pcts:
+            self.near_spot[band] += other.near_spot.get(band, 0.0)
+        self._merge_top(other.top_prices, other.top_levels)
+        return self
+    
+    def _merge_top(self, prices: np.ndarray, levels: np.ndarray) -> None:
+        """Keep the top_k rows by level, ties broken by lower price"""
+        prices = np.concatenate((self.top_prices, prices))
+        levels = np.concatenate((self.top_levels, levels))
+        
+        if len(levels) > self.top_k:
+            cutoff = levels[np.argpartition(-levels, self.top_k - 1)[self.top_k - 1]]
+            above = np.flatnonzero(levels > cutoff)
+            tied = np.flatnonzero(levels == cutoff)
+            # Among rows tied at the cutoff keep the lowest prices
+            num_tied = self.top_k - len(above)
+            if len(tied) > num_tied:
+                tied = tied[np.argpartition(prices[tied], num_tied - 1)[:num_tied]]
+            keep = np.concatenate((above, tied))
+            prices, levels = prices[keep], levels[keep]
+        
+        order = np.lexsort((prices, -levels))[:self.top_k]
+        self.top_prices = prices[order]
+        self.top_levels = levels[order]
+
+
+class ChunkedLiquidationProcessor:
+    """
+    Bounded-memory processor for very large liquidation maps
+    
+    Each liq_{lev}_map_data block is parsed in fixed-size chunks and folded
+    into mergeable aggregates; no per-row data is kept. It provides the
+    aggregate part of the LiquidationDataProcessor API (statistics, summary,
+    critical zones, near-spot amounts) with matching results. Per-row data,
+    arbitrary price-band queries and processed snapshots need the rows, so
+    use LiquidationDataProcessor for those.
+    
+    The memory budget bounds the working memory of parsing and folding, on
+    top of the decoded response itself: the caller must drop its reference
+    to raw_data once the processor is built for that memory to be freed.
+    Chunks are sized from the budget with an estimated cost per row. While
+    tracemalloc is tracing (measure_memory=True turns it on) the traced peak
+    is checked after every chunk and the chunk size is halved whenever it
+    exceeds the budget.
+    """
+    
+    def __init__(
+        self,
+        raw_data: Dict,
+        chunk_size: int = config.CHUNK_SIZE,
+        memory_budget_mb: float = config.CHUNK_MEMORY_BUDGET_MB,
+        top_k: int = config.CHUNK_TOP_K,
+        band_pcts: Optional[List[float]] = None,
+        release_raw: bool = True,
+        measure_memory: bool = config.CHUNK_MEASURE_MEMORY
+    ):
+        """
+        Initialize the chunked processor
+        
+        Args:
+            raw_data: Raw API response data (not modified)
+            chunk_size: Maximum rows parsed at once
+            memory_budget_mb: Working memory budget; chunk_size is reduced to fit
+                (and halved while the traced peak exceeds it)
+            top_k: Number of critical zones retained per leverage level
+            band_pcts: Bands (+/- %) for which near-spot amounts are tracked
+            release_raw: Drop the processor's reference to raw_data once
+                processed; the memory is freed when the caller drops theirs
+            measure_memory: Trace the peak working memory with tracemalloc and
+                enforce the budget on it (slower); otherwise this only happens
+                if tracing is already on
+        """
+        self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024)
+        self.top_k = top_k
+        self.band_pcts = band_pcts or [config.NEAR_SPOT_PCT]
+        self.measure_memory = measure_memory
+        
+        # Fixed cost: top-k candidate buffers per leverage level
+        fixed_bytes = len(config.LEVERAGE_LEVELS) * top_k * 2 * 2 * 8
+        rows_in_budget = (self.memory_budget_bytes - fixed_bytes) // ESTIMATED_BYTES_PER_ROW
+        if rows_in_budget < 1:
+            raise MemoryError(
+                f"Memory budget of {memory_budget_mb} MB cannot hold a single chunk"
+            )
+        self.chunk_size = int(min(chunk_size, rows_in_budget))
+        self.fixed_bytes = fixed_bytes
+        self.peak_estimated_bytes = 0
+        self.peak_traced_bytes = None
+        self.aggregates: Dict[str, _LeverageAggregate] = {}
+        self._summary_cache = None
+        
+        self.raw_data = raw_data
+        self.current_price = extract_current_price(raw_data)
+        self._process_all_leverage_levels()
+        
+        if release_raw:
+            self.raw_data = None
+    
+    def _process_all_leverage_levels(self) -> None:
+        """
+        Process liquidation data for all leverage levels in chunks
+        """
+        started_tracing = self.measure_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            self.peak_traced_bytes = 0
+            self._traced_baseline = tracemalloc.get_traced_memory()[0]
+        
+        try:
+            for leverage in config.LEVERAGE_LEVELS:
+                try:
+                    aggregate = self._process_leverage_chunks(leverage, tracing)
+                    self.aggregates[leverage] = aggregate
+                    logger.info(
+                        f"Processed {leverage} data: {aggregate.count} records "
+                        f"in chunks of {self.chunk_size}"
+                    )
+                except MemoryError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error processing {leverage} data: {str(e)}")
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+    
+    def _check_traced_peak(self, chunk_rows: int) -> None:
+        """
+        Halve the chunk size if the last chunk's traced peak exceeded the budget
+        
+        Args:
+            chunk_rows: Rows in the last chunk
+        
+        Raises:
+            MemoryError: Even single-row chunks exceed the budget
+        """
+        # Working memory above what was allocated before processing
+        peak = tracemalloc.get_traced_memory()[1] - self._traced_baseline
+        tracemalloc.reset_peak()
+        self.peak_traced_bytes = max(self.peak_traced_bytes, peak)
+        if peak <= self.memory_budget_bytes:
+            return
+        
+        if chunk_rows == 1:
+            raise MemoryError(
+                f"Chunked processing peaked at {peak:,} bytes with single-row chunks, "
+                f"above the {self.memory_budget_bytes:,} byte budget"
+            )
+        self.chunk_size = chunk_rows // 2
+        logger.warning(
+            f"Chunk peaked at {peak:,} bytes, above the {self.memory_budget_bytes:,} "
+            f"byte budget; reducing chunk size to {self.chunk_size}"
+        )
+    
+    def _process_leverage_chunks(self, leverage: str, tracing: bool = False) -> _LeverageAggregate:
+        """
+        Fold one leverage block into an aggregate chunk by chunk
+        
+        Args:
+            leverage: Leverage level (e.g., "10x", "25x")
+            tracing: Check the traced peak against the budget after every chunk
+        
+        Returns:
+            Aggregate for the leverage level
+        """
+        key = f"liq_{leverage}_map_data"
+        data = self.raw_data['data']['data'][key]['data'][0]
+        liq_price = data['liq_price']
+        liq_level = data['liq_level']
+        
+        lengths = {field: len(data[field]) for field in ['liq_price', 'liq_level', 'price']
+                   if field in data}
+        if len(set(lengths.values())) > 1:
+            raise ValueError(f"Mismatched column lengths in {key}: {lengths}")
+        num_rows = len(liq_price)
+        
+        aggregate = _LeverageAggregate(self.top_k, self.band_pcts)
+        
+        start = 0
+        while start < num_rows:
+            stop = min(start + self.chunk_size, num_rows)
+            prices = np.asarray(liq_price[start:stop], dtype=np.float64)
+            levels = np.asarray(liq_level[start:stop], dtype=np.float64)
+            
+            self.peak_estimated_bytes = max(
+                self.peak_estimated_bytes,
+                self.fixed_bytes + (stop - start) * ESTIMATED_BYTES_PER_ROW
+            )
+            aggregate.update(prices, levels, self.current_price)
+            del prices, levels
+            
+            if tracing:
+                self._check_traced_peak(stop - start)
+            start = stop
+        
+        return aggregate
+    
+    def get_memory_report(self) -> Dict:
+        """
+        Get memory budget and peak usage
+        
+        Returns:
+            Dictionary with budget, chunk size, the estimated peak used to
+            size chunks and the traced peak (None unless tracemalloc was on)
+        """
+        return {
+            'memory_budget_bytes': self.memory_budget_bytes,
+            'chunk_size': self.chunk_size,
+            'peak_estimated_bytes': self.peak_estimated_bytes,
+            'peak_traced_bytes': self.peak_traced_bytes
+        }
+    
+    def identify_critical_zones(
+        self,
+        leverage: str,
+        top_n: int = 10
+    ) -> pd.DataFrame:
+        """
+        Identify critical liquidation zones with highest amounts
+        
+        Args:
+            leverage: Leverage level to analyze
+            top_n: Number of top zones to return (at most top_k)
+        
+        Returns:
+            DataFrame with top liquidation zones (positional index, as no
+            per-row data is kept)
+        """
+        if top_n > self.top_k:
+            raise ValueError(f"top_n={top_n} exceeds retained top_k={self.top_k}")
+        
+        aggregate = self.aggregates.get(leverage)
+        if aggregate is None:
+            return pd.DataFrame(columns=['liq_price', 'liq_level', 'position_type', 'distance_pct'])
+        
+        prices = aggregate.top_prices[:top_n]
+        return pd.DataFrame({
+            'liq_price': prices,
+            'liq_level': aggregate.top_levels[:top_n],
+            'position_type': np.where(prices < self.current_price, 'Long', 'Short'),
+            'distance_pct': (prices - self.current_price) / self.current_price * 100
+        })
+    
+    def calculate_statistics(self, leverage: str) -> Dict:
+        """
+        Calculate statistical metrics for liquidation data
+        
+        Args:
+            leverage: Leverage level to analyze
+        
+        Returns:
+            Dictionary with statistical metrics
+        """
+        aggregate = self.aggregates.get(leverage) or _LeverageAggregate(self.top_k, self.band_pcts)
+        has_rows = aggregate.count > 0
+        
+        return {
+            'total_liquidation_amount': aggregate.total,
+            'long_liquidation_amount': aggregate.long,
+            'short_liquidation_amount': aggregate.short,
+            'avg_liquidation_amount': aggregate.total / aggregate.count if has_rows else np.nan,
+            'max_liquidation_amount': aggregate.max_level if has_rows else np.nan,
+            'num_liquidation_levels': aggregate.count,
+            'price_range': (aggregate.min_price, aggregate.max_price)
+            if has_rows else (np.nan, np.nan),
+            'long_short_ratio': aggregate.long / aggregate.short
+            if aggregate.short > 0 else 0
+        }
+    
+    def get_liquidation_summary(self) -> pd.DataFrame:
+        """
+        Get summary statistics for all leverage levels
+        
+        Returns:
+            DataFrame with summary statistics
+        """
+        if self._summary_cache is None:
+            summary_data = []
+            
+            for leverage in config.LEVERAGE_LEVELS:
+                stats = self.calculate_statistics(leverage)
+                stats['leverage'] = leverage
+                summary_data.append(stats)
+            
+            self._summary_cache = pd.DataFrame(summary_data)
+        
+        return self._summary_cache.copy()
+    
+    def get_near_spot_liquidation(
+        self,
+        band_pct: float = config.NEAR_SPOT_PCT
+    ) -> Dict[str, float]:
+        """
+        Calculate liquidation amount within a band around the current price
+        
+        Args:
+            band_pct: Half-width of the band; must be one of band_pcts
+        
+        Returns:
+            Dictionary with leverage as key and liquidation amount (USD) as value
+        """
+        if band_pct not in self.band_pcts:
+            raise ValueError(f"Band {band_pct}% was not tracked (band_pcts={self.band_pcts})")
+        
+        return {
+            leverage: float(self.aggregates[leverage].near_spot[band_pct])
+            if leverage in self.aggregates else 0.0
+            for leverage in config.LEVERAGE_LEVELS
+        }
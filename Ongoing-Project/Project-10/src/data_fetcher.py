@@ -5,8 +5,16 @@ Handles API requests to fetch liquidation heatmap data from crypto exchanges
 import http.client
 import json
 import logging
-from typing import Dict, Optional
-from datetime import datetime
+import random
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timezone
+from .data_processor import compute_body_hash
 import config
 
 # Configure logging
@@ -14,20 +22,75 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class UpstreamError(ValueError):
+    """
+    The API answered with an error status or an unsuccessful response
+    """
+
+
+class RawResponse(dict):
+    """
+    Decoded API response that carries the hash of its body
+    
+    Processed snapshots are keyed on raw_hash (see compute_raw_hash), which
+    saves hashing every decoded value on warm start.
+    """
+    
+    def __init__(self, data: Dict, raw_hash: str):
+        super().__init__(data)
+        self.raw_hash = raw_hash
+
+
 class LiquidationDataFetcher:
     """
     Fetches liquidation data from Exchange Liquidation Tracker API
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        connect_timeout: float = config.API_CONNECT_TIMEOUT,
+        read_timeout: float = config.API_READ_TIMEOUT,
+        max_retries: int = config.API_MAX_RETRIES,
+        backoff_base: float = config.API_BACKOFF_BASE,
+        backoff_max: float = config.API_BACKOFF_MAX,
+        api_host: Optional[str] = None,
+        use_https: bool = True,
+        accept_encoding: Optional[str] = config.API_ACCEPT_ENCODING
+    ):
         """
         Initialize the data fetcher
         
         Args:
             api_key: RapidAPI key for authentication
+            connect_timeout: Timeout for establishing the connection (seconds)
+            read_timeout: Timeout for reading the response (seconds)
+            max_retries: Number of retries for 429/5xx responses and network errors (>= 0)
+            backoff_base: Base delay for exponential backoff (seconds)
+            backoff_max: Maximum backoff delay, also capping Retry-After (seconds)
+            api_host: API host, optionally with port (default: config.API_HOST)
+            use_https: Use HTTPS (disable only for local servers)
+            accept_encoding: Accept-Encoding header value or None to disable compression
         """
+        if max_retries < 0:
+            raise ValueError(f"max_retries must be >= 0, got {max_retries}")
+        
         self.api_key = api_key or config.API_KEY
-        self.api_host = config.API_HOST
+        self.api_host = api_host or config.API_HOST
+        self.use_https = use_https
+        self.accept_encoding = accept_encoding
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        
+        # In-flight requests keyed by (exchange, pair, time_type)
+        self._inflight: Dict[Tuple[str, str, str], Future] = {}
+        self._inflight_lock = threading.Lock()
+        
+        # Bytes-on-wire vs decoded bytes for recent requests
+        self.transfer_log = deque(maxlen=config.API_TRANSFER_LOG_SIZE)
         
     def fetch_liquidation_map(
         self,
@@ -38,6 +101,9 @@ class LiquidationDataFetcher:
         """
         Fetch liquidation heatmap data from the API
         
+        Concurrent calls with the same (exchange, pair, time_type) share a
+        single in-flight request and receive the same response object.
+        
         Args:
             exchange: Exchange name (e.g., "Bi**ce")
             pair: Trading pair (e.g., "BTC/USDT")
@@ -46,32 +112,90 @@ class LiquidationDataFetcher:
         Returns:
             Dictionary containing liquidation data
         """
+        key = (exchange, pair, time_type)
+        
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._inflight[key] = future
+        
+        if not is_leader:
+            logger.info(f"Joining in-flight request for {pair} on {exchange}")
+            return future.result()
+        
         try:
-            logger.info(f"Fetching liquidation data for {pair} on {exchange}")
+            response_data = self._fetch_with_retry(exchange, pair, time_type)
+            future.set_result(response_data)
+            return response_data
+        except Exception as e:
+            logger.error(f"Error fetching liquidation data: {str(e)}")
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+    
+    def _fetch_with_retry(
+        self,
+        exchange: str,
+        pair: str,
+        time_type: str
+    ) -> Dict:
+        """
+        Request the liquidation map, retrying 429/5xx responses and network errors
+        
+        Args:
+            exchange: Exchange name
+            pair: Trading pair
+            time_type: Time period
             
-            # Establish connection
-            conn = http.client.HTTPSConnection(self.api_host)
+        Returns:
+            Dictionary containing liquidation data
+        """
+        logger.info(f"Fetching liquidation data for {pair} on {exchange}")
+        
+        # Build endpoint URL
+        endpoint = f"/api/liquidity-map?exchange={exchange}&pair={pair}&timeType={time_type}"
+        
+        for attempt in range(self.max_retries + 1):
+            retries_left = attempt < self.max_retries
             
-            # Set headers
-            headers = {
-                'x-rapidapi-key': self.api_key,
-                'x-rapidapi-host': self.api_host
-            }
+            try:
+                status, headers, data = self._request(endpoint)
+            except (OSError, http.client.HTTPException) as e:
+                if not retries_left:
+                    raise
+                delay = self._backoff_delay(attempt)
+                logger.warning(
+                    f"Request error ({str(e)}), retrying in {delay:.2f}s "
+                    f"[{attempt + 1}/{self.max_retries}]"
+                )
+                time.sleep(delay)
+                continue
             
-            # Build endpoint URL
-            endpoint = f"/api/liquidity-map?exchange={exchange}&pair={pair}&timeType={time_type}"
+            if status in config.API_RETRY_STATUSES and retries_left:
+                retry_after = self._parse_retry_after(headers.get('Retry-After'))
+                # Honour Retry-After, but never let the server stall us past backoff_max
+                delay = (min(retry_after, self.backoff_max) if retry_after is not None
+                         else self._backoff_delay(attempt))
+                logger.warning(
+                    f"API returned {status}, retrying in {delay:.2f}s "
+                    f"[{attempt + 1}/{self.max_retries}]"
+                )
+                time.sleep(delay)
+                continue
             
-            # Make request
-            conn.request("GET", endpoint, headers=headers)
-            res = conn.getresponse()
-            data = res.read()
+            if status != 200:
+                raise UpstreamError(f"API request failed with status {status}")
             
             # Parse response
-            response_data = json.loads(data.decode("utf-8"))
+            response_data = RawResponse(json.loads(data.decode("utf-8")), compute_body_hash(data))
             
             # Validate response
             if not response_data.get("success"):
-                raise ValueError("API request failed")
+                raise UpstreamError("API request failed")
             
             logger.info("Successfully fetched liquidation data")
             
@@ -79,13 +203,146 @@ class LiquidationDataFetcher:
             self._save_raw_data(response_data, exchange, pair, time_type)
             
             return response_data
+    
+    def _request(self, endpoint: str) -> Tuple[int, http.client.HTTPMessage, bytes]:
+        """
+        Perform a single GET request with connect and read timeouts
+        
+        Args:
+            endpoint: Request path including query string
             
-        except Exception as e:
-            logger.error(f"Error fetching liquidation data: {str(e)}")
-            raise
+        Returns:
+            Tuple of (status code, response headers (case-insensitive), response body)
+        """
+        connection_class = (
+            http.client.HTTPSConnection if self.use_https else http.client.HTTPConnection
+        )
+        conn = connection_class(self.api_host, timeout=self.connect_timeout)
+        
+        try:
+            # Set headers
+            headers = {
+                'x-rapidapi-key': self.api_key,
+                'x-rapidapi-host': self.api_host
+            }
+            if self.accept_encoding:
+                headers['Accept-Encoding'] = self.accept_encoding
+            
+            start = time.perf_counter()
+            conn.connect()
+            conn.sock.settimeout(self.read_timeout)
+            
+            # Make request
+            conn.request("GET", endpoint, headers=headers)
+            res = conn.getresponse()
+            encoding = (res.getheader('Content-Encoding') or 'identity').strip().lower()
+            data, wire_bytes = self._read_body(res, encoding)
+            
+            self.transfer_log.append({
+                'endpoint': endpoint,
+                'status': res.status,
+                'content_encoding': encoding,
+                'wire_bytes': wire_bytes,
+                'decoded_bytes': len(data),
+                'seconds': time.perf_counter() - start
+            })
+            logger.info(
+                f"Received {wire_bytes:,} bytes on wire, {len(data):,} bytes decoded "
+                f"({encoding})"
+            )
+            
+            return res.status, res.headers, data
         finally:
             conn.close()
     
+    @staticmethod
+    def _read_body(res: http.client.HTTPResponse, encoding: str) -> Tuple[bytes, int]:
+        """
+        Read the response body in chunks, decompressing incrementally
+        
+        Args:
+            res: HTTP response
+            encoding: Content-Encoding of the response
+            
+        Returns:
+            Tuple of (decoded body, bytes received on the wire)
+        """
+        if encoding in ('gzip', 'x-gzip'):
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == 'deflate':
+            decompressor = zlib.decompressobj(zlib.MAX_WBITS)
+        elif encoding == 'identity':
+            decompressor = None
+        else:
+            raise UpstreamError(f"Unsupported Content-Encoding: {encoding}")
+        
+        chunks: List[bytes] = []
+        wire_bytes = 0
+        first_chunk = True
+        
+        while True:
+            chunk = res.read(config.API_READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            wire_bytes += len(chunk)
+            
+            if decompressor is None:
+                chunks.append(chunk)
+                continue
+            
+            try:
+                chunks.append(decompressor.decompress(chunk))
+            except zlib.error:
+                # Some servers send raw deflate without the zlib wrapper
+                if not (first_chunk and encoding == 'deflate'):
+                    raise
+                decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+                chunks.append(decompressor.decompress(chunk))
+            first_chunk = False
+        
+        if decompressor is not None:
+            chunks.append(decompressor.flush())
+        
+        return b"".join(chunks), wire_bytes
+    
+    def _backoff_delay(self, attempt: int) -> float:
+        """
+        Exponential backoff with full jitter
+        
+        Args:
+            attempt: Zero-based attempt number
+            
+        Returns:
+            Delay in seconds
+        """
+        cap = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, cap)
+    
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """
+        Parse a Retry-After header given in seconds or as an HTTP date
+        
+        Args:
+            value: Header value
+            
+        Returns:
+            Delay in seconds or None if missing/invalid
+        """
+        if not value:
+            return None
+        
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+    
     def _save_raw_data(
         self,
         data: Dict,
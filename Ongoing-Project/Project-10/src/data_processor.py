@@ -4,14 +4,189 @@ Processes and transforms raw liquidation data for analysis
 """
 import pandas as pd
 import numpy as np
+import hashlib
+import json
 import logging
-from typing import Dict, List, Tuple
+import os
+import shutil
+import tempfile
+from typing import Callable, Dict, List, Tuple
 import config
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Numeric columns persisted per leverage level in processed snapshots
+PROCESSED_COLUMNS = [
+    'liq_price', 'liq_level', 'current_price',
+    'distance_from_current', 'distance_pct'
+]
+
+
+def compute_body_hash(body: bytes) -> str:
+    """
+    Compute the hash of a raw API response body
+    
+    Hashing the body bytes is much cheaper than hashing the decoded values,
+    so the fetcher keys its responses this way (see RawResponse).
+    
+    Args:
+        body: Decoded (uncompressed) response body
+    
+    Returns:
+        Hex digest identifying the raw input
+    """
+    return hashlib.sha256(body).hexdigest()[:32]
+
+
+def _update_values(digest, values: List) -> None:
+    """Add one raw column to the digest without parsing string values"""
+    try:
+        encoded = "\x1f".join(values).encode("utf-8")
+        tag = b"s"
+    except TypeError:
+        encoded = np.asarray(values, dtype=np.float64).tobytes()
+        tag = b"f"
+    digest.update(tag + len(encoded).to_bytes(8, "little"))
+    digest.update(encoded)
+
+
+def compute_raw_hash(raw_data: Dict) -> str:
+    """
+    Compute a stable hash of the raw fields used for processing
+    
+    Responses that carry the hash of their body (raw_hash attribute, set by
+    the fetcher) use it directly; otherwise the price and level columns are
+    hashed as joined strings or as float64 bytes.
+    
+    Args:
+        raw_data: Raw API response data
+    
+    Returns:
+        Hex digest identifying the raw input
+    """
+    raw_hash = getattr(raw_data, 'raw_hash', None)
+    if raw_hash:
+        return raw_hash
+    
+    digest = hashlib.sha256()
+    data = raw_data['data']['data']
+    
+    digest.update(json.dumps(data.get('cur_price_data'), sort_keys=True).encode("utf-8"))
+    for leverage in config.LEVERAGE_LEVELS:
+        key = f"liq_{leverage}_map_data"
+        digest.update(key.encode("utf-8"))
+        if key not in data:
+            continue
+        block = data[key]['data'][0]
+        for field in ['liq_price', 'liq_level', 'price']:
+            _update_values(digest, block[field])
+    
+    return digest.hexdigest()[:32]
+
+
+def extract_current_price(raw_data: Dict) -> float:
+    """
+    Extract current market price from raw data
+    
+    Args:
+        raw_data: Raw API response data
+    
+    Returns:
+        Current price as float (0.0 if missing)
+    """
+    try:
+        cur_price_data = raw_data['data']['data']['cur_price_data']
+        price = float(cur_price_data['data'][0]['cur_price'])
+        logger.info(f"Current price: ${price:,.2f}")
+        return price
+    except Exception as e:
+        logger.error(f"Error extracting current price: {str(e)}")
+        return 0.0
+
+
+def write_snapshot(
+    output_dir: str,
+    name: str,
+    write: Callable[[str], None],
+    replace: bool = False
+) -> str:
+    """
+    Write a processed snapshot directory atomically
+    
+    The files are written to a temporary directory and renamed into place,
+    so readers never see partial data. An existing snapshot is kept unless
+    replace is set or its metadata is unreadable or of another format
+    version; a replaced snapshot is moved aside before the new one is
+    renamed into place.
+    
+    Args:
+        output_dir: Directory holding processed snapshots
+        name: Snapshot directory name
+        write: Writes the snapshot files into the directory it is given
+        replace: Replace an existing snapshot (e.g. one that failed to load)
+    
+    Returns:
+        Path of the snapshot directory
+    """
+    snapshot_dir = os.path.join(output_dir, name)
+    if os.path.isdir(snapshot_dir) and not replace:
+        try:
+            read_snapshot_meta(snapshot_dir)
+            return snapshot_dir
+        except (OSError, ValueError):
+            replace = True
+    
+    tmp_dir = tempfile.mkdtemp(prefix=f".{name}.", dir=output_dir)
+    
+    try:
+        write(tmp_dir)
+        if replace:
+            _discard_snapshot(snapshot_dir)
+        os.rename(tmp_dir, snapshot_dir)
+        logger.info(f"Processed data saved to {snapshot_dir}")
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not os.path.isdir(snapshot_dir):
+            raise
+        # Another process saved the same snapshot first
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    
+    return snapshot_dir
+
+
+def _discard_snapshot(snapshot_dir: str) -> None:
+    """Move a snapshot aside and delete it (no-op if another process already did)"""
+    stale_dir = tempfile.mkdtemp(
+        prefix=f".{os.path.basename(snapshot_dir)}.stale.", dir=os.path.dirname(snapshot_dir)
+    )
+    try:
+        os.rename(snapshot_dir, os.path.join(stale_dir, "snapshot"))
+    except FileNotFoundError:
+        pass
+    shutil.rmtree(stale_dir, ignore_errors=True)
+
+
+def read_snapshot_meta(snapshot_dir: str) -> Dict:
+    """
+    Read and check the metadata of a processed snapshot
+    
+    Args:
+        snapshot_dir: Snapshot directory
+    
+    Returns:
+        Snapshot metadata
+    """
+    with open(os.path.join(snapshot_dir, "meta.json")) as f:
+        meta = json.load(f)
+    
+    if meta.get('format_version') != config.PROCESSED_FORMAT_VERSION:
+        raise ValueError(f"Unsupported processed data format in {snapshot_dir}")
+    return meta
+
 
 class LiquidationDataProcessor:
     """
@@ -26,8 +201,11 @@ class LiquidationDataProcessor:
             raw_data: Raw API response data
         """
         self.raw_data = raw_data
+        self.raw_hash = None
         self.current_price = self._extract_current_price()
         self.leverage_data = {}
+        self._summary_cache = None
+        self._zones_cache = {}
         self._process_all_leverage_levels()
     
     def _extract_current_price(self) -> float:
@@ -37,14 +215,7 @@ class LiquidationDataProcessor:
         Returns:
             Current price as float
         """
-        try:
-            cur_price_data = self.raw_data['data']['data']['cur_price_data']
-            price = float(cur_price_data['data'][0]['cur_price'])
-            logger.info(f"Current price: ${price:,.2f}")
-            return price
-        except Exception as e:
-            logger.error(f"Error extracting current price: {str(e)}")
-            return 0.0
+        return extract_current_price(self.raw_data)
     
     def _process_all_leverage_levels(self) -> None:
         """
@@ -131,12 +302,17 @@ class LiquidationDataProcessor:
         Returns:
             DataFrame with top liquidation zones
         """
-        df = self.get_leverage_data(leverage)
-        
-        # Get top liquidation zones
-        critical_zones = df.nlargest(top_n, 'liq_level')
+        cached = self._zones_cache.get(leverage)
+        if cached is None or top_n > len(cached):
+            df = self.get_leverage_data(leverage)
+            
+            # Get top liquidation zones
+            critical_zones = df.nlargest(top_n, 'liq_level')
+            cached = critical_zones[['liq_price', 'liq_level', 'position_type', 'distance_pct']]
+            cached = cached.astype({'position_type': str})
+            self._zones_cache[leverage] = cached
         
-        return critical_zones[['liq_price', 'liq_level', 'position_type', 'distance_pct']]
+        return cached.head(top_n).copy()
     
     def calculate_statistics(self, leverage: str) -> Dict:
         """
@@ -167,6 +343,71 @@ class LiquidationDataProcessor:
         
         return stats
     
+    def get_near_spot_liquidation(
+        self,
+        band_pct: float = config.NEAR_SPOT_PCT
+    ) -> Dict[str, float]:
+        """
+        Calculate liquidation amount within a band around the current price
+        
+        Args:
+            band_pct: Half-width of the band in percent of current price
+        
+        Returns:
+            Dictionary with leverage as key and liquidation amount (USD) as value
+        """
+        near_spot = {}
+        
+        for leverage in config.LEVERAGE_LEVELS:
+            df = self.get_leverage_data(leverage)
+            if df.empty:
+                near_spot[leverage] = 0.0
+                continue
+        
+            in_band = df['distance_pct'].abs().to_numpy() <= band_pct
+            near_spot[leverage] = float(df['liq_level'].to_numpy()[in_band].sum())
+        
+        return near_spot
+    
+    def get_price_band_summary(
+        self,
+        low_price: float,
+        high_price: float
+    ) -> pd.DataFrame:
+        """
+        Summarize liquidations with liquidation price inside a price band
+        
+        Args:
+            low_price: Lower bound of the band (inclusive)
+            high_price: Upper bound of the band (inclusive)
+        
+        Returns:
+            DataFrame with long/short amounts and level count per leverage
+        """
+        band_data = []
+        
+        for leverage in config.LEVERAGE_LEVELS:
+            df = self.get_leverage_data(leverage)
+            if df.empty:
+                continue
+            
+            # Rows are sorted by liq_price
+            prices = df['liq_price'].to_numpy()
+            start = np.searchsorted(prices, low_price, side='left')
+            stop = np.searchsorted(prices, high_price, side='right')
+            levels = df['liq_level'].to_numpy()[start:stop]
+            is_long = prices[start:stop] < self.current_price
+            
+            band_data.append({
+                'leverage': leverage,
+                'long_liquidation_amount': float(levels[is_long].sum()),
+                'short_liquidation_amount': float(levels[~is_long].sum()),
+                'total_liquidation_amount': float(levels.sum()),
+                'num_liquidation_levels': int(stop - start)
+            })
+        
+        return pd.DataFrame(band_data)
+
     def get_liquidation_summary(self) -> pd.DataFrame:
         """
         Get summary statistics for all leverage levels
@@ -174,11 +415,196 @@ class LiquidationDataProcessor:
         Returns:
             DataFrame with summary statistics
         """
-        summary_data = []
+        if self._summary_cache is None:
+            summary_data = []
+            
+            for leverage in config.LEVERAGE_LEVELS:
+                stats = self.calculate_statistics(leverage)
+                stats['leverage'] = leverage
+                summary_data.append(stats)
+            
+            self._summary_cache = pd.DataFrame(summary_data)
         
-        for leverage in config.LEVERAGE_LEVELS:
-            stats = self.calculate_statistics(leverage)
-            stats['leverage'] = leverage
-            summary_data.append(stats)
+        return self._summary_cache.copy()
+    
+    def save_processed(
+        self,
+        output_dir: str = config.PROCESSED_DATA_DIR,
+        top_n: int = config.PROCESSED_TOP_N,
+        replace: bool = False
+    ) -> str:
+        """
+        Persist processed arrays, summary and critical zones
+        
+        Each leverage column is written as a separate .npy file so it can be
+        memory-mapped on load. The snapshot directory is written to a temporary
+        location and renamed into place, so readers never see partial data.
+        
+        Args:
+            output_dir: Directory holding processed snapshots
+            top_n: Number of critical zones stored per leverage level
+            replace: Replace an existing snapshot of the same name
+            
+        Returns:
+            Path of the snapshot directory
+        """
+        if self.raw_hash is None:
+            self.raw_hash = compute_raw_hash(self.raw_data)
+        
+        def write(tmp_dir: str) -> None:
+            zones = {}
+            for leverage, df in self.leverage_data.items():
+                for column in PROCESSED_COLUMNS:
+                    np.save(
+                        os.path.join(tmp_dir, f"{leverage}_{column}.npy"),
+                        df[column].to_numpy(dtype=np.float64)
+                    )
+                np.save(
+                    os.path.join(tmp_dir, f"{leverage}_is_long.npy"),
+                    (df['position_type'] == 'Long').to_numpy()
+                )
+                zones[leverage] = self.identify_critical_zones(leverage, top_n).to_dict('tight')
+            
+            summary = self.get_liquidation_summary()
+            summary['price_range'] = summary['price_range'].apply(list)
+            
+            meta = {
+                'format_version': config.PROCESSED_FORMAT_VERSION,
+                'raw_hash': self.raw_hash,
+                'current_price': self.current_price,
+                'leverage_levels': list(self.leverage_data.keys()),
+                'summary': summary.to_dict('records'),
+                'critical_zones': zones
+            }
+            with open(os.path.join(tmp_dir, "meta.json"), 'w') as f:
+                json.dump(meta, f, default=float)
+        
+        return write_snapshot(output_dir, self.snapshot_name(self.raw_hash), write, replace)
+    
+    @classmethod
+    def snapshot_name(cls, raw_hash: str) -> str:
+        """
+        Name of the snapshot directory for a raw input
+        
+        Args:
+            raw_hash: Hash of the raw input (see compute_raw_hash)
+        
+        Returns:
+            Directory name inside the processed data directory
+        """
+        return raw_hash
+    
+    @classmethod
+    def from_processed(
+        cls,
+        raw_hash: str,
+        input_dir: str = config.PROCESSED_DATA_DIR,
+        mmap: bool = config.PROCESSED_MMAP
+    ) -> "LiquidationDataProcessor":
+        """
+        Warm-start a processor from a processed snapshot
+        
+        Args:
+            raw_hash: Hash of the raw input (see compute_raw_hash)
+            input_dir: Directory holding processed snapshots
+            mmap: Memory-map the arrays instead of reading them into memory
+            
+        Returns:
+            LiquidationDataProcessor without raw_data; the leverage and
+            position_type columns are categoricals
+        """
+        snapshot_dir = os.path.join(input_dir, cls.snapshot_name(raw_hash))
+        meta = read_snapshot_meta(snapshot_dir)
+        mmap_mode = 'r' if mmap else None
+        
+        processor = cls.__new__(cls)
+        processor.raw_data = None
+        processor.raw_hash = raw_hash
+        processor.current_price = meta['current_price']
+        processor.leverage_data = {}
+        processor._zones_cache = {}
+        
+        for leverage in meta['leverage_levels']:
+            columns = {
+                column: np.load(
+                    os.path.join(snapshot_dir, f"{leverage}_{column}.npy"),
+                    mmap_mode=mmap_mode
+                )
+                for column in PROCESSED_COLUMNS
+            }
+            is_long = np.load(os.path.join(snapshot_dir, f"{leverage}_is_long.npy"))
+            num_rows = len(is_long)
+            
+            # Categoricals avoid materializing one Python string per row
+            df = pd.DataFrame(
+                {
+                    'liq_price': columns['liq_price'],
+                    'liq_level': columns['liq_level'],
+                    'current_price': columns['current_price'],
+                    'leverage': pd.Categorical.from_codes(
+                        np.zeros(num_rows, dtype=np.int8), [leverage]
+                    ),
+                    'distance_from_current': columns['distance_from_current'],
+                    'distance_pct': columns['distance_pct'],
+                    'position_type': pd.Categorical.from_codes(
+                        is_long.view(np.int8), ['Short', 'Long']
+                    )
+                },
+                copy=False
+            )
+            processor.leverage_data[leverage] = df
+            processor._zones_cache[leverage] = pd.DataFrame.from_dict(
+                meta['critical_zones'][leverage], orient='tight'
+            )
+        
+        summary = pd.DataFrame(meta['summary'])
+        summary['price_range'] = summary['price_range'].apply(tuple)
+        processor._summary_cache = summary
+        
+        logger.info(f"Loaded processed data from {snapshot_dir}")
+        return processor
+    
+    @classmethod
+    def load_or_process(
+        cls,
+        raw_data: Dict,
+        processed_dir: str = config.PROCESSED_DATA_DIR,
+        mmap: bool = config.PROCESSED_MMAP,
+        **options
+    ) -> "LiquidationDataProcessor":
+        """
+        Warm-start from a processed snapshot if one exists, otherwise process and save
+        
+        Args:
+            raw_data: Raw API response data
+            processed_dir: Directory holding processed snapshots
+            mmap: Memory-map the arrays when warm-starting
+            **options: Constructor options of the processor class (e.g. min_level)
+            
+        Returns:
+            LiquidationDataProcessor instance
+        """
+        try:
+            raw_hash = compute_raw_hash(raw_data)
+        except Exception as e:
+            logger.warning(f"Failed to hash raw data, processing without cache: {str(e)}")
+            return cls(raw_data, **options)
+        
+        name = cls.snapshot_name(raw_hash, **options)
+        stale = False
+        if os.path.isfile(os.path.join(processed_dir, name, "meta.json")):
+            try:
+                return cls.from_processed(raw_hash, processed_dir, mmap, **options)
+            except Exception as e:
+                # e.g. written by an older format version; replaced below
+                logger.warning(f"Failed to load processed data, reprocessing: {str(e)}")
+                stale = True
+        
+        processor = cls(raw_data, **options)
+        processor.raw_hash = raw_hash
+        try:
+            processor.save_processed(processed_dir, replace=stale)
+        except Exception as e:
+            logger.warning(f"Failed to save processed data: {str(e)}")
         
-        return pd.DataFrame(summary_data)
+        return processor
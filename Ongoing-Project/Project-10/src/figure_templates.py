@@ -0,0 +1,351 @@
+"""
+Figure Templates Module for Liquidation Visualizer
+Reusable figure layouts that are built once and refilled with new data per market
+"""
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import pandas as pd
+import numpy as np
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+import config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class FigureTemplate(ABC):
+    """
+    Base class for reusable figure layouts
+    
+    The first render builds the figure scaffolding (subplots, labels, titles,
+    grid); later renders only swap the data artists and the title text, then
+    recompute the layout. Reference lines that take part in autoscaling are
+    drawn with the data, in the original order, so output stays identical to
+    a freshly built figure. Pooled templates use a figure
+    outside pyplot, so it is never shown, never closed by plt.close('all')
+    and can be kept for the life of the process.
+    """
+    
+    nrows = 1
+    ncols = 1
+    figsize = (14, 6)
+    
+    def __init__(self, pooled: bool = True):
+        """
+        Initialize the template
+        
+        Args:
+            pooled: Keep the figure outside pyplot for reuse; False creates a
+                regular pyplot figure for a one-off render
+        """
+        self.pooled = pooled
+        self.fig = None
+        self.axes = None
+        self.renders = 0
+        self._data_artists: List = []
+        self._has_legend = False
+        self._subplotpars: Dict[str, float] = {}
+    
+    def render(self, *args, **kwargs) -> Figure:
+        """
+        Fill the template with new data
+        
+        Returns:
+            The template figure, ready to save; do not close it if pooled
+        """
+        if self.fig is None:
+            self._create_figure()
+        else:
+            self.reset()
+            # Data limits must be clean before drawing: artists such as axvline
+            # read the current view while they are added
+            for ax in self.fig.axes:
+                ax.relim()
+            # tight_layout depends on the starting layout (tick density follows
+            # axes size), so start from the same subplot parameters as a new figure
+            self.fig.subplots_adjust(**self._subplotpars)
+        
+        try:
+            self._data_artists = self._draw(*args, **kwargs)
+        except Exception:
+            # Partially drawn data cannot be reset reliably; rebuild next time
+            self.close()
+            raise
+        
+        if not self._has_legend:
+            # Legends copy the handles' style, so they are built once from the first data
+            self._add_legends()
+            self._has_legend = True
+        
+        self.fig.tight_layout()
+        
+        self.renders += 1
+        return self.fig
+    
+    def reset(self) -> None:
+        """
+        Remove the data artists so the next market starts from a clean layout
+        """
+        for artist in self._data_artists:
+            artist.remove()
+        self._data_artists = []
+    
+    def close(self) -> None:
+        """
+        Release the figure; the next render builds the layout again
+        """
+        if self.fig is not None and not self.pooled:
+            plt.close(self.fig)
+        self.fig = None
+        self.axes = None
+        self.renders = 0
+        self._data_artists = []
+        self._has_legend = False
+    
+    def _create_figure(self) -> None:
+        """Create the figure and its static scaffolding"""
+        if self.pooled:
+            self.fig = Figure(figsize=self.figsize)
+            FigureCanvasAgg(self.fig)
+        else:
+            self.fig = plt.figure(figsize=self.figsize)
+        self.axes = self.fig.subplots(self.nrows, self.ncols)
+        self._subplotpars = {
+            name: getattr(self.fig.subplotpars, name)
+            for name in ('left', 'bottom', 'right', 'top', 'wspace', 'hspace')
+        }
+        self._build()
+    
+    @abstractmethod
+    def _build(self) -> None:
+        """Add static labels, lines and grid"""
+    
+    @abstractmethod
+    def _draw(self, *args, **kwargs) -> List:
+        """Draw the data artists and set the title; return the artists to remove on reset"""
+    
+    def _add_legends(self) -> None:
+        """Add legends once data artists exist"""
+
+
+class HeatmapTemplate(FigureTemplate):
+    """
+    Layout of LiquidationVisualizer._plot_all_leverage_heatmap
+    """
+    
+    nrows = 2
+    ncols = 2
+    figsize = (16, 12)
+    default_title = 'Liquidation Heatmap - All Leverage Levels'
+    
+    def _build(self) -> None:
+        self.axes = self.axes.flatten()
+        for idx, leverage in enumerate(config.LEVERAGE_LEVELS):
+            ax = self.axes[idx]
+            ax.set_xlabel('Price (USD)')
+            ax.set_ylabel('Liquidation Amount (USD)')
+            ax.set_title(f'{leverage} Leverage', fontweight='bold')
+            ax.grid(True, alpha=0.3)
+        
+        self.title = self.fig.suptitle(self.default_title,
+                                       fontsize=16, fontweight='bold', y=1.00)
+    
+    def _draw(
+        self,
+        leverage_data: Dict[str, pd.DataFrame],
+        current_price: float,
+        title: Optional[str] = None
+    ) -> List:
+        """
+        Args:
+            leverage_data: Processed DataFrame per leverage level
+            current_price: Current market price
+            title: Figure title (default: all-leverage heatmap title)
+        """
+        artists = []
+        for idx, leverage in enumerate(config.LEVERAGE_LEVELS):
+            df = leverage_data[leverage]
+            ax = self.axes[idx]
+            
+            long_df = df[df['position_type'] == 'Long']
+            short_df = df[df['position_type'] == 'Short']
+            
+            artists.append(ax.bar(long_df['liq_price'], long_df['liq_level'],
+                                  width=50, color='red', alpha=0.6, label='Long'))
+            artists.append(ax.bar(short_df['liq_price'], short_df['liq_level'],
+                                  width=50, color='green', alpha=0.6, label='Short'))
+            artists.append(ax.axvline(current_price, color='blue', linestyle='--',
+                                      linewidth=2, label='Current Price'))
+        
+        self.title.set_text(title or self.default_title)
+        return artists
+    
+    def _add_legends(self) -> None:
+        for ax in self.axes[:len(config.LEVERAGE_LEVELS)]:
+            ax.legend()
+
+
+class ComparisonTemplate(FigureTemplate):
+    """
+    Layout of LiquidationVisualizer.compare_leverage_levels
+    """
+    
+    nrows = 2
+    ncols = 2
+    figsize = (14, 10)
+    
+    def _build(self) -> None:
+        axes = self.axes
+        axes[0, 0].set_title('Total Liquidation Amount by Leverage')
+        axes[0, 0].set_ylabel('Amount (USD)')
+        axes[0, 0].tick_params(axis='x', rotation=0)
+        
+        axes[0, 1].set_title('Long vs Short Liquidations')
+        
+        axes[1, 0].set_title('Number of Liquidation Levels')
+        axes[1, 0].set_ylabel('Count')
+        
+        axes[1, 1].set_title('Long/Short Liquidation Ratio')
+        axes[1, 1].set_ylabel('Ratio')
+    
+    def _draw(self, summary: pd.DataFrame) -> List:
+        """
+        Args:
+            summary: Output of LiquidationDataProcessor.get_liquidation_summary
+        """
+        axes = self.axes
+        artists = []
+        
+        # Total liquidation amount
+        artists.append(axes[0, 0].bar(summary['leverage'], summary['total_liquidation_amount'],
+                                      color='steelblue'))
+        
+        # Long vs Short
+        x = np.arange(len(summary))
+        width = 0.35
+        artists.append(axes[0, 1].bar(x - width/2, summary['long_liquidation_amount'],
+                                      width, label='Long', color='red', alpha=0.7))
+        artists.append(axes[0, 1].bar(x + width/2, summary['short_liquidation_amount'],
+                                      width, label='Short', color='green', alpha=0.7))
+        axes[0, 1].set_xticks(x)
+        axes[0, 1].set_xticklabels(summary['leverage'])
+        
+        # Number of liquidation levels
+        artists.append(axes[1, 0].bar(summary['leverage'], summary['num_liquidation_levels'],
+                                      color='coral'))
+        
+        # Long/Short Ratio
+        artists.append(axes[1, 1].bar(summary['leverage'], summary['long_short_ratio'],
+                                      color='purple', alpha=0.7))
+        artists.append(axes[1, 1].axhline(y=1, color='black', linestyle='--', alpha=0.5))
+        return artists
+    
+    def _add_legends(self) -> None:
+        self.axes[0, 1].legend()
+
+
+class ZonesTemplate(FigureTemplate):
+    """
+    Layout of LiquidationVisualizer.identify_liquidation_zones
+    """
+    
+    nrows = 1
+    ncols = 2
+    figsize = (16, 6)
+    
+    def _build(self) -> None:
+        ax1, ax2 = self.axes
+        ax1.set_xlabel('Liquidation Amount (USD)')
+        self.title = ax1.set_title('')
+        ax1.invert_yaxis()
+        
+        ax2.set_xlabel('Distance from Current Price (%)')
+        ax2.set_title('Distance from Current Price')
+        ax2.invert_yaxis()
+    
+    def _draw(
+        self,
+        critical_zones: pd.DataFrame,
+        leverage: str,
+        top_n: int,
+        title: Optional[str] = None
+    ) -> List:
+        """
+        Args:
+            critical_zones: Output of LiquidationDataProcessor.identify_critical_zones
+            leverage: Leverage level of the zones
+            top_n: Number of zones requested
+            title: Title of the zone chart (default: top-N title for the leverage)
+        """
+        ax1, ax2 = self.axes
+        
+        # Bar chart of top liquidation zones
+        colors = ['red' if pt == 'Long' else 'green'
+                  for pt in critical_zones['position_type']]
+        tick_labels = [f"${p:,.0f}" for p in critical_zones['liq_price']]
+        positions = range(len(critical_zones))
+        
+        artists = [ax1.barh(positions, critical_zones['liq_level'], color=colors, alpha=0.7)]
+        ax1.set_yticks(positions)
+        ax1.set_yticklabels(tick_labels)
+        self.title.set_text(title or f'Top {top_n} Critical Liquidation Zones - {leverage}')
+        
+        # Distance from current price
+        artists.append(ax2.barh(positions, critical_zones['distance_pct'], color=colors, alpha=0.7))
+        ax2.set_yticks(positions)
+        ax2.set_yticklabels(tick_labels)
+        artists.append(ax2.axvline(x=0, color='blue', linestyle='--', linewidth=2))
+        return artists
+
+
+# FigureTemplates attribute -> template class
+TEMPLATE_CLASSES = {
+    'heatmap': HeatmapTemplate,
+    'comparison': ComparisonTemplate,
+    'zones': ZonesTemplate
+}
+
+
+class FigureTemplates:
+    """
+    One pooled template per chart kind
+    """
+    
+    def __init__(self):
+        for kind, template_class in TEMPLATE_CLASSES.items():
+            setattr(self, kind, template_class())
+    
+    def reset(self) -> None:
+        """Remove data artists from every template"""
+        for kind in TEMPLATE_CLASSES:
+            template = getattr(self, kind)
+            if template.fig is not None:
+                template.reset()
+    
+    def close(self) -> None:
+        """Release every template figure"""
+        for kind in TEMPLATE_CLASSES:
+            getattr(self, kind).close()
+
+
+_process_templates: Optional[FigureTemplates] = None
+
+
+def get_figure_templates() -> FigureTemplates:
+    """
+    Get the templates shared by the current process
+    
+    Templates are not thread-safe; callers rendering from several threads
+    must serialize renders (as matplotlib requires anyway).
+    
+    Returns:
+        FigureTemplates instance, created on first use
+    """
+    global _process_templates
+    if _process_templates is None:
+        _process_templates = FigureTemplates()
+    return _process_templates
@@ -0,0 +1,243 @@
+"""
+Multi-Timeframe Processor Module for Liquidation Data
+Aligns liquidation maps from several timeframes on a common price grid
+"""
+import pandas as pd
+import numpy as np
+import logging
+from typing import Dict, Optional
+from .data_processor import LiquidationDataProcessor
+import config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class MultiTimeframeProcessor:
+    """
+    Stacks liquidation maps for multiple timeframes into one
+    (timeframe x leverage x price bin) array for vectorized comparison
+    """
+    
+    def __init__(
+        self,
+        raw_by_timeframe: Dict[str, Dict],
+        num_bins: int = config.MTF_NUM_BINS
+    ):
+        """
+        Initialize the multi-timeframe processor
+        
+        Args:
+            raw_by_timeframe: Raw API responses keyed by timeframe, e.g. the
+                output of LiquidationDataFetcher.fetch_multiple_timeframes
+            num_bins: Number of price bins in the common grid
+        """
+        processors = {
+            timeframe: LiquidationDataProcessor.load_or_process(raw_data)
+            for timeframe, raw_data in raw_by_timeframe.items()
+        }
+        self._init_from_processors(processors, num_bins)
+    
+    @classmethod
+    def from_processors(
+        cls,
+        processors: Dict[str, LiquidationDataProcessor],
+        num_bins: int = config.MTF_NUM_BINS
+    ) -> "MultiTimeframeProcessor":
+        """
+        Build from already processed timeframes
+        
+        Args:
+            processors: LiquidationDataProcessor instances keyed by timeframe
+            num_bins: Number of price bins in the common grid
+        
+        Returns:
+            MultiTimeframeProcessor instance
+        """
+        instance = cls.__new__(cls)
+        instance._init_from_processors(processors, num_bins)
+        return instance
+    
+    def _init_from_processors(
+        self,
+        processors: Dict[str, LiquidationDataProcessor],
+        num_bins: int
+    ) -> None:
+        """Set up attributes and build the aligned array"""
+        if not processors:
+            raise ValueError("At least one timeframe is required")
+        
+        self.processors = processors
+        self.timeframes = list(processors.keys())
+        self.leverage_levels = list(config.LEVERAGE_LEVELS)
+        self.num_bins = num_bins
+        self.current_price = processors[self.timeframes[0]].current_price
+        self._build_cube()
+    
+    def _build_cube(self) -> None:
+        """
+        Bin every (timeframe, leverage) map onto a common price grid with a
+        single bincount over a flattened (timeframe, leverage, bin) index
+        """
+        prices, levels, offsets = [], [], []
+        num_leverage = len(self.leverage_levels)
+        
+        for t, timeframe in enumerate(self.timeframes):
+            processor = self.processors[timeframe]
+            for l, leverage in enumerate(self.leverage_levels):
+                df = processor.get_leverage_data(leverage)
+                if df.empty:
+                    continue
+                prices.append(df['liq_price'].to_numpy(dtype=np.float64))
+                levels.append(df['liq_level'].to_numpy(dtype=np.float64))
+                offsets.append(np.full(len(df), (t * num_leverage + l) * self.num_bins))
+        
+        if not prices:
+            raise ValueError("No liquidation data to align")
+        
+        prices = np.concatenate(prices)
+        levels = np.concatenate(levels)
+        offsets = np.concatenate(offsets)
+        
+        self.price_edges = np.linspace(prices.min(), prices.max(), self.num_bins + 1)
+        self.price_centers = (self.price_edges[:-1] + self.price_edges[1:]) / 2
+        
+        bins = np.clip(
+            np.searchsorted(self.price_edges, prices, side='right') - 1,
+            0, self.num_bins - 1
+        )
+        flat = np.bincount(
+            offsets + bins,
+            weights=levels,
+            minlength=len(self.timeframes) * num_leverage * self.num_bins
+        )
+        self.cube = flat.reshape(len(self.timeframes), num_leverage, self.num_bins)
+        
+        logger.info(
+            f"Aligned {len(self.timeframes)} timeframes x {num_leverage} leverage levels "
+            f"x {self.num_bins} price bins"
+        )
+    
+    def _reference_index(self, reference: Optional[str]) -> int:
+        """Index of the reference timeframe (default: first)"""
+        if reference is None:
+            return 0
+        if reference not in self.timeframes:
+            raise ValueError(f"Unknown timeframe '{reference}'")
+        return self.timeframes.index(reference)
+    
+    def get_cube(self, normalize: bool = False) -> np.ndarray:
+        """
+        Get the aligned (timeframe x leverage x price bin) array
+        
+        Args:
+            normalize: Scale each (timeframe, leverage) map to sum to 1, so
+                timeframes of different length compare by distribution
+        
+        Returns:
+            Array of liquidation amounts (or shares)
+        """
+        if not normalize:
+            return self.cube
+        totals = self.cube.sum(axis=-1, keepdims=True)
+        return np.divide(self.cube, totals, out=np.zeros_like(self.cube), where=totals > 0)
+    
+    def compare(
+        self,
+        reference: Optional[str] = None,
+        normalize: bool = False,
+        top_n: int = 10
+    ) -> Dict:
+        """
+        Compare every timeframe with a reference timeframe
+        
+        Args:
+            reference: Reference timeframe (default: first timeframe)
+            normalize: Compare distributions instead of absolute amounts
+            top_n: Strengthened/weakened zones returned per timeframe and leverage
+        
+        Returns:
+            Dictionary with 'deltas' and 'ratios' arrays (timeframe x leverage x bin)
+            and a 'zones' DataFrame of the largest changes
+        """
+        cube = self.get_cube(normalize)
+        ref_idx = self._reference_index(reference)
+        base = cube[ref_idx]
+        
+        deltas = cube - base
+        ratios = np.divide(cube, base, out=np.full_like(cube, np.nan), where=base > 0)
+        
+        others = [t for t in range(len(self.timeframes)) if t != ref_idx]
+        zones = self._changed_zones(deltas, ratios, cube, ref_idx, others, top_n)
+        
+        return {
+            'reference': self.timeframes[ref_idx],
+            'deltas': deltas,
+            'ratios': ratios,
+            'zones': zones
+        }
+    
+    def _changed_zones(
+        self,
+        deltas: np.ndarray,
+        ratios: np.ndarray,
+        cube: np.ndarray,
+        ref_idx: int,
+        others: list,
+        top_n: int
+    ) -> pd.DataFrame:
+        """Largest positive and negative deltas for each compared timeframe"""
+        columns = [
+            'timeframe', 'reference', 'leverage', 'change', 'price_low', 'price_high',
+            'reference_amount', 'amount', 'delta', 'ratio', 'position_type'
+        ]
+        if not others:
+            return pd.DataFrame(columns=columns)
+        
+        n = min(top_n, self.num_bins)
+        selected = deltas[others]                       # (T', L, B)
+        order = np.argsort(selected, axis=-1)
+        weakened = order[..., :n]
+        strengthened = order[..., ::-1][..., :n]
+        
+        frames = []
+        for change, bins in (('strengthened', strengthened), ('weakened', weakened)):
+            t_idx, l_idx, _ = np.indices(bins.shape)
+            t_full = np.asarray(others)[t_idx].ravel()
+            l_full = l_idx.ravel()
+            b_full = bins.ravel()
+            delta = deltas[t_full, l_full, b_full]
+            keep = delta > 0 if change == 'strengthened' else delta < 0
+            
+            centers = self.price_centers[b_full]
+            frames.append(pd.DataFrame({
+                'timeframe': np.asarray(self.timeframes)[t_full],
+                'reference': self.timeframes[ref_idx],
+                'leverage': np.asarray(self.leverage_levels)[l_full],
+                'change': change,
+                'price_low': self.price_edges[b_full],
+                'price_high': self.price_edges[b_full + 1],
+                'reference_amount': cube[ref_idx, l_full, b_full],
+                'amount': cube[t_full, l_full, b_full],
+                'delta': delta,
+                'ratio': ratios[t_full, l_full, b_full],
+                'position_type': np.where(centers < self.current_price, 'Long', 'Short')
+            })[keep])
+        
+        return pd.concat(frames, ignore_index=True)[columns]
+    
+    def get_timeframe_summary(self) -> pd.DataFrame:
+        """
+        Get summary statistics for every timeframe and leverage level
+        
+        Returns:
+            DataFrame with one row per timeframe and leverage
+        """
+        summaries = []
+        for timeframe in self.timeframes:
+            summary = self.processors[timeframe].get_liquidation_summary()
+            summary.insert(0, 'timeframe', timeframe)
+            summaries.append(summary)
+        
+        return pd.concat(summaries, ignore_index=True)
@@ -0,0 +1,238 @@
+"""
+Profiling Module for Liquidation Visualizer
+Attributes memory usage to pipeline stages with tracemalloc, RSS and object counts
+"""
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+import pandas as pd
+import contextlib
+import gc
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from .artifact_writer import write_atomic
+import config
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Allocations made by the profiler itself or the import machinery are not attributed
+_IGNORED_FRAMES = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def get_rss_bytes() -> Tuple[Optional[int], Optional[int]]:
+    """
+    Get the current and peak resident set size of this process
+    
+    Returns:
+        (current RSS, peak RSS) in bytes; current is None where /proc is
+        unavailable and both are None where resource is unavailable (Windows)
+    """
+    try:
+        with open("/proc/self/status") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return (
+            int(fields["VmRSS"].split()[0]) * 1024,
+            int(fields["VmHWM"].split()[0]) * 1024
+        )
+    except (OSError, KeyError, ValueError):
+        if resource is None:
+            return None, None
+        # ru_maxrss is in KiB on Linux and in bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return None, peak if sys.platform == "darwin" else peak * 1024
+
+
+def count_objects() -> Dict[str, int]:
+    """
+    Count live DataFrames and matplotlib figures
+    
+    Returns:
+        Dictionary with DataFrame, Figure and open pyplot figure counts
+    """
+    gc.collect()
+    dataframes = figures = 0
+    for obj in gc.get_objects():
+        if isinstance(obj, pd.DataFrame):
+            dataframes += 1
+        elif isinstance(obj, Figure):
+            figures += 1
+    
+    return {
+        'dataframes': dataframes,
+        'figures': figures,
+        'open_pyplot_figures': len(plt.get_fignums())
+    }
+
+
+class MemoryProfiler:
+    """
+    Records per-stage memory usage of a pipeline run
+    
+    For every stage it records the traced peak above the stage's starting
+    allocation, the allocations retained when the stage ends, the top
+    allocation sites of the retained memory, process RSS and counts of live
+    DataFrames and figures. Tracing slows the pipeline down noticeably, so
+    it is only meant for profiling runs.
+    """
+    
+    def __init__(self, top_sites: int = config.PROFILE_TOP_SITES):
+        """
+        Initialize the profiler
+        
+        Args:
+            top_sites: Number of allocation sites reported per stage
+        """
+        self.top_sites = top_sites
+        self.stages: List[Dict] = []
+        self.baseline_bytes = None
+        self._started_tracing = False
+    
+    def start(self) -> None:
+        """
+        Start tracing allocations (if not already tracing)
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self.baseline_bytes = tracemalloc.get_traced_memory()[0]
+    
+    def stop(self) -> None:
+        """
+        Stop tracing if this profiler started it
+        """
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+    
+    def __enter__(self) -> "MemoryProfiler":
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+    
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Profile the enclosed block as one pipeline stage
+        
+        Args:
+            name: Stage name used in the report
+        """
+        if not tracemalloc.is_tracing():
+            self.start()
+        
+        gc.collect()
+        before = tracemalloc.take_snapshot().filter_traces(_IGNORED_FRAMES)
+        start_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+            # Unreachable cycles (e.g. closed figures) are garbage, not retained memory
+            gc.collect()
+            current_bytes = tracemalloc.get_traced_memory()[0]
+            after = tracemalloc.take_snapshot().filter_traces(_IGNORED_FRAMES)
+            rss_bytes, rss_peak_bytes = get_rss_bytes()
+            
+            top = after.compare_to(before, 'lineno')[:self.top_sites]
+            self.stages.append({
+                'stage': name,
+                'seconds': seconds,
+                'peak_bytes': peak_bytes - start_bytes,
+                'retained_bytes': current_bytes - start_bytes,
+                'rss_bytes': rss_bytes,
+                'rss_peak_bytes': rss_peak_bytes,
+                **count_objects(),
+                'top_sites': [
+                    {
+                        'site': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                        'size_diff_bytes': stat.size_diff,
+                        'count_diff': stat.count_diff
+                    }
+                    for stat in top
+                ]
+            })
+            logger.info(
+                f"[memory] {name}: peak {(peak_bytes - start_bytes) / 1e6:.1f} MB, "
+                f"retained {(current_bytes - start_bytes) / 1e6:.1f} MB"
+            )
+    
+    def get_report(self) -> pd.DataFrame:
+        """
+        Get one row of memory metrics per stage
+        
+        Returns:
+            DataFrame without the allocation sites
+        """
+        return pd.DataFrame([
+            {key: value for key, value in stage.items() if key != 'top_sites'}
+            for stage in self.stages
+        ])
+    
+    def format_report(self) -> str:
+        """
+        Format the stage table and the top allocation sites as text
+        
+        Returns:
+            Human-readable report
+        """
+        report = self.get_report()
+        lines = ["STAGE MEMORY (bytes)", report.to_string(index=False), ""]
+        for stage in self.stages:
+            lines.append(f"Top allocation sites - {stage['stage']}")
+            for site in stage['top_sites']:
+                lines.append(
+                    f"  {site['size_diff_bytes']:>+14,d} B {site['count_diff']:>+9,d} blocks  "
+                    f"{site['site']}"
+                )
+            lines.append("")
+        return "\n".join(lines)
+    
+    def write_report(self, output_dir: str = config.REPORTS_DIR) -> str:
+        """
+        Write the report as JSON (for tracking across releases) and text
+        
+        Args:
+            output_dir: Directory for the report files
+        
+        Returns:
+            Path of the JSON report
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base = os.path.join(output_dir, f"memory_profile_{timestamp}")
+        
+        payload = {
+            'timestamp': timestamp,
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'baseline_bytes': self.baseline_bytes,
+            'stages': self.stages
+        }
+        write_atomic(f"{base}.json", json.dumps(payload, indent=2, default=int).encode("utf-8"))
+        write_atomic(f"{base}.txt", self.format_report().encode("utf-8"))
+        
+        logger.info(f"Memory profile saved to {base}.json")
+        return f"{base}.json"
@@ -0,0 +1,451 @@
+"""
+Query Service Module for Liquidation Visualizer
+Serves summaries, critical zones, price-band queries and charts over local HTTP
+"""
+import pandas as pd
+import http.client
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from .data_fetcher import LiquidationDataFetcher, UpstreamError
+from .data_processor import LiquidationDataProcessor
+from .visualizer import LiquidationVisualizer
+from .figure_templates import get_figure_templates
+import config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class InvalidQueryError(ValueError):
+    """
+    A query has an unknown route or invalid parameters (HTTP 400)
+    """
+
+
+# Failures of the upstream API (HTTP 502)
+UPSTREAM_ERRORS = (UpstreamError, OSError, http.client.HTTPException, json.JSONDecodeError)
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with per-entry TTL, a byte budget and
+    single-flight creation of missing entries
+    """
+    
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        """
+        Initialize the cache
+        
+        Args:
+            max_bytes: Total size budget; least recently used entries are evicted
+            ttl_seconds: Lifetime of an entry after creation
+        """
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        # key -> (value, size, expires_at)
+        self._entries: OrderedDict = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+    
+    def get_or_create(
+        self,
+        key: Hashable,
+        factory: Callable[[], Any],
+        size_of: Callable[[Any], int] = len
+    ) -> Any:
+        """
+        Return a cached value, creating it once if missing or expired
+        
+        Concurrent callers asking for the same missing key wait for a single
+        factory call and share its result.
+        
+        Args:
+            key: Cache key
+            factory: Creates the value on a miss
+            size_of: Returns the size of a value in bytes
+        
+        Returns:
+            Cached or newly created value
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[2] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                self._remove(key)
+            
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._inflight[key] = future
+                self.misses += 1
+        
+        if not is_leader:
+            return future.result()
+        
+        try:
+            value = factory()
+            self._insert(key, value, size_of(value))
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+    
+    def _insert(self, key: Hashable, value: Any, size: int) -> None:
+        """Insert an entry and evict least recently used entries over budget"""
+        if size > self.max_bytes:
+            logger.warning(f"Not caching {key}: {size:,} bytes exceeds cache budget")
+            return
+        
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl_seconds)
+            self.current_bytes += size
+            
+            while self.current_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+    
+    def _remove(self, key: Hashable) -> None:
+        """Remove an entry (caller holds the lock)"""
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+    
+    def clear(self) -> None:
+        """
+        Remove all entries
+        """
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+    
+    def get_stats(self) -> Dict:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with entry count, bytes, hits, misses and evictions
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+class _CaptureWriter:
+    """
+    Writer stand-in that keeps rendered artifacts in memory instead of on disk
+    """
+    
+    def __init__(self):
+        self.artifacts: Dict[str, bytes] = {}
+    
+    def submit_bytes(self, path: str, data: bytes) -> None:
+        self.artifacts[path] = data
+    
+    def submit_html(self, fig, path: str) -> None:
+        self.artifacts[path] = fig.to_html().encode("utf-8")
+
+
+def _processor_nbytes(processor: LiquidationDataProcessor) -> int:
+    """Estimate the memory held by a processor's DataFrames"""
+    return int(sum(
+        df.memory_usage(index=True, deep=True).sum()
+        for df in processor.leverage_data.values()
+    ))
+
+
+class LiquidationQueryService:
+    """
+    Answers liquidation queries from cached processors and rendered charts
+    """
+    
+    ROUTES = ('summary', 'zones', 'band', 'chart')
+    
+    # Chart kind -> (visualizer method, extension)
+    CHARTS = {
+        'heatmap': ('plot_liquidation_heatmap', 'png'),
+        'comparison': ('compare_leverage_levels', 'png'),
+        'zones': ('identify_liquidation_zones', 'png'),
+        'interactive': ('create_interactive_heatmap', 'html')
+    }
+    
+    def __init__(
+        self,
+        fetcher: Optional[LiquidationDataFetcher] = None,
+        ttl_seconds: float = config.SERVICE_TTL_SECONDS,
+        processor_cache_mb: float = config.SERVICE_PROCESSOR_CACHE_MB,
+        render_cache_mb: float = config.SERVICE_RENDER_CACHE_MB,
+        processed_dir: str = config.PROCESSED_DATA_DIR
+    ):
+        """
+        Initialize the query service
+        
+        Args:
+            fetcher: LiquidationDataFetcher instance (created if not given)
+            ttl_seconds: Lifetime of cached processors and responses
+            processor_cache_mb: Memory cap for cached processors
+            render_cache_mb: Memory cap for cached responses and charts
+            processed_dir: Directory for processed snapshots (warm start)
+        """
+        self.fetcher = fetcher or LiquidationDataFetcher()
+        self.processed_dir = processed_dir
+        self.processors = TTLCache(int(processor_cache_mb * 1024 * 1024), ttl_seconds)
+        self.responses = TTLCache(int(render_cache_mb * 1024 * 1024), ttl_seconds)
+        
+        # matplotlib is not thread-safe
+        self._render_lock = threading.Lock()
+    
+    def get_processor(self, exchange: str, pair: str, time_type: str) -> LiquidationDataProcessor:
+        """
+        Get a cached processor, fetching and processing on a miss
+        
+        Args:
+            exchange: Exchange name
+            pair: Trading pair
+            time_type: Time period
+        
+        Returns:
+            LiquidationDataProcessor instance
+        """
+        def create() -> LiquidationDataProcessor:
+            raw_data = self.fetcher.fetch_liquidation_map(exchange, pair, time_type)
+            processor = LiquidationDataProcessor.load_or_process(raw_data, self.processed_dir)
+            processor.raw_data = None
+            return processor
+        
+        return self.processors.get_or_create(
+            (exchange, pair, time_type), create, _processor_nbytes
+        )
+    
+    def query(self, route: str, params: Dict[str, str]) -> Tuple[bytes, str]:
+        """
+        Answer a query, serving cached response bytes when available
+        
+        Args:
+            route: Endpoint name (summary, zones, band, chart)
+            params: Query parameters
+        
+        Returns:
+            Tuple of (response body, content type)
+        
+        Raises:
+            InvalidQueryError: Unknown route or invalid parameters
+        """
+        market = (
+            params.get('exchange', config.DEFAULT_EXCHANGE),
+            params.get('pair', config.DEFAULT_PAIR),
+            params.get('time_type', config.DEFAULT_TIME_TYPE)
+        )
+        
+        if route == 'summary':
+            key = ('summary',) + market
+            build = lambda: self._to_json(self.get_processor(*market).get_liquidation_summary())
+        elif route == 'zones':
+            leverage = self._leverage_param(params, '100x')
+            top_n = self._number_param(params, 'top_n', int, 10)
+            if top_n < 1:
+                raise InvalidQueryError("top_n must be at least 1")
+            key = ('zones', leverage, top_n) + market
+            build = lambda: self._to_json(
+                self.get_processor(*market).identify_critical_zones(leverage, top_n)
+            )
+        elif route == 'band':
+            if 'low' not in params or 'high' not in params:
+                raise InvalidQueryError("band requires 'low' and 'high' parameters")
+            low = self._number_param(params, 'low', float)
+            high = self._number_param(params, 'high', float)
+            if low > high:
+                raise InvalidQueryError("low must not exceed high")
+            key = ('band', low, high) + market
+            build = lambda: self._to_json(
+                self.get_processor(*market).get_price_band_summary(low, high)
+            )
+        elif route == 'chart':
+            kind = params.get('kind', 'heatmap')
+            if kind not in self.CHARTS:
+                raise InvalidQueryError(f"Unknown chart kind '{kind}'")
+            leverage = self._leverage_param(params, None)
+            key = ('chart', kind, leverage) + market
+            build = lambda: self._render_chart(market, kind, leverage)
+        else:
+            raise InvalidQueryError(f"Unknown route '{route}'")
+        
+        body = self.responses.get_or_create(key, build)
+        content_type = self._content_type(route, params)
+        return body, content_type
+    
+    @staticmethod
+    def _leverage_param(params: Dict[str, str], default: Optional[str]) -> Optional[str]:
+        """Validated leverage parameter"""
+        leverage = params.get('leverage', default)
+        if leverage is not None and leverage not in config.LEVERAGE_LEVELS:
+            raise InvalidQueryError(
+                f"Unknown leverage '{leverage}' (expected one of {config.LEVERAGE_LEVELS})"
+            )
+        return leverage
+    
+    @staticmethod
+    def _number_param(params: Dict[str, str], name: str, cast: Callable, default=None):
+        """Numeric parameter converted with cast"""
+        if name not in params:
+            return default
+        try:
+            return cast(params[name])
+        except ValueError:
+            raise InvalidQueryError(f"Invalid {name} '{params[name]}'")
+    
+    def _render_chart(
+        self,
+        market: Tuple[str, str, str],
+        kind: str,
+        leverage: Optional[str]
+    ) -> bytes:
+        """Render a chart into memory"""
+        processor = self.get_processor(*market)
+        method, extension = self.CHARTS[kind]
+        path = f"chart.{extension}"
+        writer = _CaptureWriter()
+        # Templates are shared by the process; renders are serialized by the lock
+        visualizer = LiquidationVisualizer(processor, writer=writer, show=False,
+                                           templates=get_figure_templates())
+        
+        kwargs = {'save_path': path}
+        if leverage is not None and kind != 'comparison':
+            kwargs['leverage'] = leverage
+        
+        with self._render_lock:
+            getattr(visualizer, method)(**kwargs)
+        
+        if path not in writer.artifacts:
+            raise RuntimeError(f"Failed to render {kind} chart")
+        return writer.artifacts[path]
+    
+    def _content_type(self, route: str, params: Dict[str, str]) -> str:
+        """Content type for a route"""
+        if route != 'chart':
+            return 'application/json'
+        _, extension = self.CHARTS[params.get('kind', 'heatmap')]
+        return 'image/png' if extension == 'png' else 'text/html; charset=utf-8'
+    
+    @staticmethod
+    def _to_json(df: pd.DataFrame) -> bytes:
+        """Serialize a DataFrame as a JSON list of records"""
+        return df.to_json(orient='records').encode("utf-8")
+    
+    def get_stats(self) -> Dict:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with processor and response cache statistics
+        """
+        return {
+            'processors': self.processors.get_stats(),
+            'responses': self.responses.get_stats()
+        }
+
+
+class _QueryHandler(BaseHTTPRequestHandler):
+    """
+    HTTP handler routing GET requests to a LiquidationQueryService
+    """
+    
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; avoid Nagle/delayed-ACK stalls
+    disable_nagle_algorithm = True
+    service: LiquidationQueryService = None
+    
+    def do_GET(self):
+        url = urlparse(self.path)
+        route = url.path.strip('/') or 'health'
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        
+        try:
+            if route == 'health':
+                self._send(200, b'{"status": "ok"}', 'application/json')
+            elif route == 'stats':
+                self._send(200, json.dumps(self.service.get_stats()).encode("utf-8"),
+                           'application/json')
+            elif route in self.service.ROUTES:
+                body, content_type = self.service.query(route, params)
+                self._send(200, body, content_type)
+            else:
+                self._send_error(404, f"Unknown endpoint '/{route}'")
+        except InvalidQueryError as e:
+            self._send_error(400, str(e))
+        except UPSTREAM_ERRORS as e:
+            logger.error(f"Upstream error serving {self.path}: {str(e)}")
+            self._send_error(502, str(e))
+        except Exception as e:
+            logger.error(f"Error serving {self.path}: {str(e)}")
+            self._send_error(500, str(e))
+    
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _send_error(self, status: int, message: str) -> None:
+        self._send(status, json.dumps({'error': message}).encode("utf-8"), 'application/json')
+    
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def create_server(
+    service: Optional[LiquidationQueryService] = None,
+    host: str = config.SERVICE_HOST,
+    port: int = config.SERVICE_PORT
+) -> ThreadingHTTPServer:
+    """
+    Create an HTTP server for the query service
+    
+    Endpoints (all accept exchange, pair and time_type):
+        /summary, /zones?leverage=&top_n=, /band?low=&high=,
+        /chart?kind=heatmap|comparison|zones|interactive&leverage=,
+        /stats, /health
+    
+    Args:
+        service: LiquidationQueryService instance (created if not given)
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+    
+    Returns:
+        ThreadingHTTPServer; call serve_forever() to start serving
+    """
+    handler = type('QueryHandler', (_QueryHandler,), {
+        'service': service or LiquidationQueryService()
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
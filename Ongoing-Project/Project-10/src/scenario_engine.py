@@ -0,0 +1,260 @@
+"""
+Scenario Engine Module for Liquidation Data
+Evaluates how much is liquidated along price paths, with optional cascades
+"""
+import numpy as np
+import logging
+from typing import Callable, Dict, Optional, Tuple
+import config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Maps liquidated USD (array) to a fractional price move (array)
+ImpactFunction = Callable[[np.ndarray], np.ndarray]
+
+SIDES = ['Long', 'Short']
+
+
+def linear_impact(depth_usd_per_pct: float = config.SCENARIO_DEPTH_USD_PER_PCT) -> ImpactFunction:
+    """
+    Create a linear price impact function
+    
+    Args:
+        depth_usd_per_pct: USD of forced orders that moves price by 1%
+    
+    Returns:
+        Impact function returning the fractional price move
+    """
+    def impact(usd: np.ndarray) -> np.ndarray:
+        return usd / depth_usd_per_pct / 100
+    
+    return impact
+
+
+def sqrt_impact(depth_usd_per_pct: float = config.SCENARIO_DEPTH_USD_PER_PCT) -> ImpactFunction:
+    """
+    Create a square-root price impact function
+    
+    Args:
+        depth_usd_per_pct: USD of forced orders that moves price by 1%
+    
+    Returns:
+        Impact function returning the fractional price move
+    """
+    def impact(usd: np.ndarray) -> np.ndarray:
+        return np.sqrt(usd / depth_usd_per_pct) / 100
+    
+    return impact
+
+
+class LiquidationScenarioEngine:
+    """
+    Batched what-if analysis on top of processed liquidation levels
+    
+    A price path liquidates every long whose liquidation price lies between
+    the path's low and the current price, and every short between the current
+    price and the path's high. Per leverage and side this reduces to a
+    searchsorted lookup into a cumulative sum, so whole batches of scenarios
+    are evaluated with a handful of NumPy calls.
+    """
+    
+    def __init__(self, processor):
+        """
+        Initialize the scenario engine
+        
+        Args:
+            processor: LiquidationDataProcessor instance
+        """
+        self.current_price = processor.current_price
+        self.leverage_levels = []
+        
+        # Per leverage: long prices/cumsum (ascending), short prices/cumsum (ascending)
+        self._long_prices = []
+        self._long_cumsum = []
+        self._short_prices = []
+        self._short_cumsum = []
+        
+        for leverage in config.LEVERAGE_LEVELS:
+            df = processor.get_leverage_data(leverage)
+            if df.empty:
+                continue
+            
+            prices = df['liq_price'].to_numpy(dtype=np.float64)
+            levels = df['liq_level'].to_numpy(dtype=np.float64)
+            order = np.argsort(prices, kind='stable')
+            prices, levels = prices[order], levels[order]
+            is_long = prices < self.current_price
+            
+            self.leverage_levels.append(leverage)
+            self._long_prices.append(prices[is_long])
+            self._long_cumsum.append(np.concatenate(([0.0], np.cumsum(levels[is_long]))))
+            self._short_prices.append(prices[~is_long])
+            self._short_cumsum.append(np.concatenate(([0.0], np.cumsum(levels[~is_long]))))
+    
+    def _liquidated(self, low: np.ndarray, high: np.ndarray) -> np.ndarray:
+        """
+        Liquidated USD for price ranges [low, high] around the current price
+        
+        Args:
+            low: Lowest price reached per scenario
+            high: Highest price reached per scenario
+        
+        Returns:
+            Array of shape (n_scenarios, n_leverage, 2) with long/short USD
+        """
+        result = np.empty(low.shape + (len(self.leverage_levels), 2))
+        
+        for idx in range(len(self.leverage_levels)):
+            long_cumsum = self._long_cumsum[idx]
+            short_cumsum = self._short_cumsum[idx]
+            
+            # Longs with liq_price >= low
+            long_idx = np.searchsorted(self._long_prices[idx], low, side='left')
+            result[..., idx, 0] = long_cumsum[-1] - long_cumsum[long_idx]
+            
+            # Shorts with liq_price <= high
+            short_idx = np.searchsorted(self._short_prices[idx], high, side='right')
+            result[..., idx, 1] = short_cumsum[short_idx]
+        
+        return result
+    
+    def _cascade(
+        self,
+        low: np.ndarray,
+        high: np.ndarray,
+        impact: ImpactFunction,
+        max_iter: int,
+        tol: float
+    ) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        Extend price extremes by the impact of the liquidations they trigger
+        
+        Long liquidations are forced sells that push the low further down;
+        short liquidations are forced buys that push the high further up.
+        Iterates to a fixed point for all scenarios at once.
+        
+        Args:
+            low: Lowest price reached per scenario before the cascade
+            high: Highest price reached per scenario before the cascade
+            impact: Impact function
+            max_iter: Maximum iterations
+            tol: Convergence tolerance relative to the current price
+        
+        Returns:
+            Tuple of (cascaded low, cascaded high, iterations used)
+        """
+        base_low, base_high = low, high
+        iteration = 0
+        
+        for iteration in range(1, max_iter + 1):
+            liquidated = self._liquidated(low, high).sum(axis=-2)
+            new_low = np.maximum(base_low * (1 - impact(liquidated[..., 0])), 0.0)
+            new_high = base_high * (1 + impact(liquidated[..., 1]))
+            
+            converged = (
+                np.all(np.abs(new_low - low) <= tol * self.current_price)
+                and np.all(np.abs(new_high - high) <= tol * self.current_price)
+            )
+            low, high = new_low, new_high
+            if converged:
+                break
+        
+        return low, high, iteration
+    
+    def evaluate_paths(
+        self,
+        paths: np.ndarray,
+        cascade: bool = False,
+        impact: Optional[ImpactFunction] = None,
+        cumulative: bool = False,
+        max_iter: int = config.SCENARIO_MAX_ITER,
+        tol: float = config.SCENARIO_TOL
+    ) -> Dict:
+        """
+        Evaluate liquidations along a batch of price paths
+        
+        Args:
+            paths: Array of shape (n_paths, n_steps) with prices, starting
+                from the current price
+            cascade: Push price further with the impact of triggered liquidations
+            impact: Impact function used for cascades (default: linear_impact())
+            cumulative: Also return cumulative liquidations at every step
+                (without cascade), shape (n_paths, n_steps, n_leverage, 2)
+            max_iter: Maximum cascade iterations
+            tol: Convergence tolerance relative to the current price
+        
+        Returns:
+            Dictionary with 'liquidated' (n_paths, n_leverage, 2), 'low', 'high',
+            'leverage_levels', 'sides' and optionally 'cumulative'
+        """
+        paths = np.atleast_2d(np.asarray(paths, dtype=np.float64))
+        
+        low = np.minimum(paths.min(axis=1), self.current_price)
+        high = np.maximum(paths.max(axis=1), self.current_price)
+        
+        result = {
+            'leverage_levels': list(self.leverage_levels),
+            'sides': list(SIDES)
+        }
+        
+        if cumulative:
+            running_low = np.minimum(np.minimum.accumulate(paths, axis=1), self.current_price)
+            running_high = np.maximum(np.maximum.accumulate(paths, axis=1), self.current_price)
+            result['cumulative'] = self._liquidated(running_low, running_high)
+        
+        if cascade:
+            low, high, iterations = self._cascade(
+                low, high, impact or linear_impact(), max_iter, tol
+            )
+            result['cascade_iterations'] = iterations
+        
+        result['liquidated'] = self._liquidated(low, high)
+        result['low'] = low
+        result['high'] = high
+        
+        return result
+    
+    def evaluate_targets(
+        self,
+        target_prices: np.ndarray,
+        cascade: bool = False,
+        impact: Optional[ImpactFunction] = None,
+        max_iter: int = config.SCENARIO_MAX_ITER,
+        tol: float = config.SCENARIO_TOL
+    ) -> Dict:
+        """
+        Evaluate liquidations for a direct move to each target price
+        
+        Args:
+            target_prices: 1-D array of target prices
+            cascade: Push price further with the impact of triggered liquidations
+            impact: Impact function used for cascades (default: linear_impact())
+            max_iter: Maximum cascade iterations
+            tol: Convergence tolerance relative to the current price
+        
+        Returns:
+            Same dictionary as evaluate_paths
+        """
+        targets = np.asarray(target_prices, dtype=np.float64).reshape(-1, 1)
+        return self.evaluate_paths(
+            targets, cascade=cascade, impact=impact, max_iter=max_iter, tol=tol
+        )
+    
+    def price_grid(
+        self,
+        range_pct: float = config.SCENARIO_GRID_RANGE_PCT,
+        num: int = config.SCENARIO_GRID_POINTS
+    ) -> np.ndarray:
+        """
+        Build a grid of target prices around the current price
+        
+        Args:
+            range_pct: Half-width of the grid in percent of current price
+            num: Number of grid points
+        
+        Returns:
+            1-D array of target prices
+        """
+        return self.current_price * (1 + np.linspace(-range_pct, range_pct, num) / 100)
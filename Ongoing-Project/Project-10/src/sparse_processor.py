@@ -0,0 +1,479 @@
+"""
+Sparse Processor Module for Liquidation Data
+Stores only significant liquidation levels as index/value arrays over the price axis
+"""
+import pandas as pd
+import numpy as np
+import json
+import logging
+import os
+from typing import Dict, Optional, Union
+from .data_processor import (
+    LiquidationDataProcessor, PROCESSED_COLUMNS, compute_raw_hash,
+    read_snapshot_meta, write_snapshot
+)
+import config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class _SparseLevels:
+    """
+    Liquidation levels of one leverage map above a threshold
+    
+    `indices` point into the sorted `price_axis`; `values` are the matching
+    liquidation amounts and `row_prices` the per-row market price column of
+    the response (a scalar when it is constant, as it usually is). Scalars
+    over the full map are kept so statistics do not depend on the dropped rows.
+    """
+    
+    __slots__ = ('price_axis', 'indices', 'values', 'row_prices', 'num_levels', 'max_level')
+    
+    # Arrays persisted by SparseLiquidationProcessor.save_processed
+    ARRAYS = ('price_axis', 'indices', 'values', 'row_prices')
+    
+    def __init__(
+        self,
+        price_axis: np.ndarray,
+        indices: np.ndarray,
+        values: np.ndarray,
+        row_prices: Union[float, np.ndarray],
+        num_levels: int,
+        max_level: float
+    ):
+        self.price_axis = price_axis
+        self.indices = indices
+        self.values = values
+        self.row_prices = row_prices
+        self.num_levels = num_levels
+        self.max_level = max_level
+    
+    @property
+    def prices(self) -> np.ndarray:
+        """Liquidation prices of the stored levels"""
+        return self.price_axis[self.indices]
+
+
+class SparseLiquidationProcessor(LiquidationDataProcessor):
+    """
+    Sparse-storage variant of LiquidationDataProcessor
+    
+    High-leverage maps are mostly zero or dust-level entries. Each map is
+    parsed straight into NumPy arrays and only levels above min_level are
+    kept, as int32 indices into the sorted price axis plus float64 values;
+    identical price axes are shared between leverage levels. Statistics,
+    summaries, critical zones and near-spot/band amounts are computed on the
+    sparse arrays and match the in-memory processor when min_level is 0.
+    get_leverage_data materializes the stored rows only, which is what the
+    bar plots draw. Snapshots saved by save_processed hold the sparse
+    arrays and are keyed by min_level as well as the raw hash.
+    """
+    
+    def __init__(
+        self,
+        raw_data: Dict,
+        min_level: float = config.SPARSE_MIN_LEVEL
+    ):
+        """
+        Initialize the sparse processor
+        
+        Args:
+            raw_data: Raw API response data
+            min_level: Liquidation levels at or below this amount (USD) are dropped
+        """
+        self.min_level = min_level
+        self.sparse_data: Dict[str, _SparseLevels] = {}
+        self._frame_cache: Dict[str, pd.DataFrame] = {}
+        super().__init__(raw_data)
+    
+    def _process_all_leverage_levels(self) -> None:
+        """
+        Process liquidation data for all leverage levels into sparse form
+        """
+        previous_axis = None
+        
+        for leverage in config.LEVERAGE_LEVELS:
+            try:
+                levels = self._process_sparse_level(leverage, previous_axis)
+                self.sparse_data[leverage] = levels
+                previous_axis = levels.price_axis
+                logger.info(
+                    f"Processed {leverage} data: {len(levels.values)} of "
+                    f"{levels.num_levels} records above {self.min_level}"
+                )
+            except Exception as e:
+                logger.error(f"Error processing {leverage} data: {str(e)}")
+    
+    def _process_sparse_level(
+        self,
+        leverage: str,
+        previous_axis: Optional[np.ndarray]
+    ) -> _SparseLevels:
+        """
+        Parse one leverage map and keep the levels above the threshold
+        
+        Args:
+            leverage: Leverage level (e.g., "10x", "25x")
+            previous_axis: Price axis of the previous leverage level, reused when equal
+        
+        Returns:
+            Sparse levels for the leverage level
+        """
+        key = f"liq_{leverage}_map_data"
+        data = self.raw_data['data']['data'][key]['data'][0]
+        
+        prices = np.asarray(data['liq_price'], dtype=np.float64)
+        levels = np.asarray(data['liq_level'], dtype=np.float64)
+        row_prices = np.asarray(data['price'], dtype=np.float64)
+        
+        if not len(prices) == len(levels) == len(row_prices):
+            raise ValueError(
+                f"Column lengths differ: liq_price {len(prices)}, "
+                f"liq_level {len(levels)}, price {len(row_prices)}"
+            )
+        
+        # Sort by liquidation price (stable, like DataFrame.sort_values on sorted input)
+        if len(prices) > 1 and np.any(prices[1:] < prices[:-1]):
+            order = np.argsort(prices, kind='stable')
+            prices, levels, row_prices = prices[order], levels[order], row_prices[order]
+        
+        if previous_axis is not None and np.array_equal(prices, previous_axis):
+            prices = previous_axis
+        
+        indices = np.flatnonzero(levels > self.min_level).astype(np.int32)
+        
+        # The market price column is constant within a response in practice
+        if len(row_prices) and np.all(row_prices == row_prices[0]):
+            row_prices = float(row_prices[0])
+        else:
+            row_prices = row_prices[indices]
+        
+        return _SparseLevels(
+            price_axis=prices,
+            indices=indices,
+            values=levels[indices],
+            row_prices=row_prices,
+            num_levels=len(prices),
+            max_level=float(levels.max()) if len(levels) else np.nan
+        )
+    
+    def get_leverage_data(self, leverage: str) -> pd.DataFrame:
+        """
+        Get the stored (above-threshold) rows for a leverage level
+        
+        Args:
+            leverage: Leverage level (e.g., "10x")
+        
+        Returns:
+            DataFrame with the same columns as the in-memory processor
+        """
+        levels = self.sparse_data.get(leverage)
+        if levels is None:
+            return pd.DataFrame()
+        
+        cached = self._frame_cache.get(leverage)
+        if cached is None:
+            prices = levels.prices
+            distance = prices - self.current_price
+            cached = pd.DataFrame({
+                'liq_price': prices,
+                'liq_level': levels.values,
+                'current_price': levels.row_prices,
+                'leverage': leverage,
+                'distance_from_current': distance,
+                'distance_pct': distance / self.current_price * 100,
+                'position_type': np.where(prices < self.current_price, 'Long', 'Short')
+            }, index=levels.indices.astype(np.int64))
+            self._frame_cache[leverage] = cached
+        
+        return cached
+    
+    def get_all_leverage_data(self) -> pd.DataFrame:
+        """
+        Combine the stored rows of all leverage levels into a single DataFrame
+        
+        Returns:
+            Combined DataFrame with all stored rows
+        """
+        return pd.concat(
+            [self.get_leverage_data(leverage) for leverage in self.sparse_data],
+            ignore_index=True
+        )
+    
+    def identify_critical_zones(
+        self,
+        leverage: str,
+        top_n: int = 10
+    ) -> pd.DataFrame:
+        """
+        Identify critical liquidation zones with highest amounts
+        
+        Args:
+            leverage: Leverage level to analyze
+            top_n: Number of top zones to return (fewer if fewer levels are stored)
+        
+        Returns:
+            DataFrame with top liquidation zones, indexed by price-axis position
+        """
+        levels = self.sparse_data.get(leverage)
+        if levels is None:
+            return pd.DataFrame(columns=['liq_price', 'liq_level', 'position_type', 'distance_pct'])
+        
+        # Stable sort keeps the lower price first among ties, like nlargest
+        top = np.argsort(-levels.values, kind='stable')[:top_n]
+        indices = levels.indices[top]
+        prices = levels.price_axis[indices]
+        
+        return pd.DataFrame({
+            'liq_price': prices,
+            'liq_level': levels.values[top],
+            'position_type': np.where(prices < self.current_price, 'Long', 'Short'),
+            'distance_pct': (prices - self.current_price) / self.current_price * 100
+        }, index=indices.astype(np.int64))
+    
+    def calculate_statistics(self, leverage: str) -> Dict:
+        """
+        Calculate statistical metrics for liquidation data
+        
+        Args:
+            leverage: Leverage level to analyze
+        
+        Returns:
+            Dictionary with statistical metrics
+        """
+        levels = self.sparse_data.get(leverage)
+        if levels is None:
+            return super().calculate_statistics(leverage)
+        
+        # Axis is sorted, so long positions are the indices below the split
+        split = np.searchsorted(levels.price_axis, self.current_price, side='left')
+        is_long = levels.indices < split
+        long_sum = levels.values[is_long].sum()
+        short_sum = levels.values[~is_long].sum()
+        total = long_sum + short_sum
+        has_rows = levels.num_levels > 0
+        
+        return {
+            'total_liquidation_amount': total,
+            'long_liquidation_amount': long_sum,
+            'short_liquidation_amount': short_sum,
+            'avg_liquidation_amount': total / levels.num_levels if has_rows else np.nan,
+            'max_liquidation_amount': levels.max_level,
+            'num_liquidation_levels': levels.num_levels,
+            'price_range': (levels.price_axis[0], levels.price_axis[-1])
+            if has_rows else (np.nan, np.nan),
+            'long_short_ratio': long_sum / short_sum
+            if short_sum > 0 else 0
+        }
+    
+    def get_near_spot_liquidation(
+        self,
+        band_pct: float = config.NEAR_SPOT_PCT
+    ) -> Dict[str, float]:
+        """
+        Calculate liquidation amount within a band around the current price
+        
+        Args:
+            band_pct: Half-width of the band in percent of current price
+        
+        Returns:
+            Dictionary with leverage as key and liquidation amount (USD) as value
+        """
+        near_spot = {}
+        
+        for leverage in config.LEVERAGE_LEVELS:
+            levels = self.sparse_data.get(leverage)
+            if levels is None:
+                near_spot[leverage] = 0.0
+                continue
+            
+            distance_pct = (levels.prices - self.current_price) / self.current_price * 100
+            near_spot[leverage] = float(levels.values[np.abs(distance_pct) <= band_pct].sum())
+        
+        return near_spot
+    
+    def get_price_band_summary(
+        self,
+        low_price: float,
+        high_price: float
+    ) -> pd.DataFrame:
+        """
+        Summarize liquidations with liquidation price inside a price band
+        
+        Args:
+            low_price: Lower bound of the band (inclusive)
+            high_price: Upper bound of the band (inclusive)
+        
+        Returns:
+            DataFrame with long/short amounts and level count per leverage
+        """
+        band_data = []
+        
+        for leverage in config.LEVERAGE_LEVELS:
+            levels = self.sparse_data.get(leverage)
+            if levels is None:
+                continue
+            
+            axis = levels.price_axis
+            start = np.searchsorted(axis, low_price, side='left')
+            stop = np.searchsorted(axis, high_price, side='right')
+            
+            # Stored indices are sorted, so the band is a contiguous slice of them
+            lo, hi = np.searchsorted(levels.indices, [start, stop], side='left')
+            values = levels.values[lo:hi]
+            is_long = axis[levels.indices[lo:hi]] < self.current_price
+            
+            band_data.append({
+                'leverage': leverage,
+                'long_liquidation_amount': float(values[is_long].sum()),
+                'short_liquidation_amount': float(values[~is_long].sum()),
+                'total_liquidation_amount': float(values.sum()),
+                'num_liquidation_levels': int(stop - start)
+            })
+        
+        return pd.DataFrame(band_data)
+    
+    def get_memory_report(self) -> Dict:
+        """
+        Get sparse storage size against the dense numeric columns it replaces
+        
+        Returns:
+            Dictionary with stored/total levels and bytes. dense_bytes counts
+            only the numeric columns and position flag of the in-memory
+            processor, so the savings are a lower bound.
+        """
+        axes = {id(levels.price_axis): levels.price_axis for levels in self.sparse_data.values()}
+        sparse_bytes = sum(axis.nbytes for axis in axes.values()) + sum(
+            levels.indices.nbytes + levels.values.nbytes + np.asarray(levels.row_prices).nbytes
+            for levels in self.sparse_data.values()
+        )
+        total_levels = sum(levels.num_levels for levels in self.sparse_data.values())
+        stored_levels = sum(len(levels.values) for levels in self.sparse_data.values())
+        dense_bytes = total_levels * (len(PROCESSED_COLUMNS) * 8 + 1)
+        
+        return {
+            'min_level': self.min_level,
+            'total_levels': total_levels,
+            'stored_levels': stored_levels,
+            'sparse_bytes': sparse_bytes,
+            'dense_bytes': dense_bytes,
+            'savings_pct': (1 - sparse_bytes / dense_bytes) * 100 if dense_bytes else 0.0
+        }
+    
+    def save_processed(
+        self,
+        output_dir: str = config.PROCESSED_DATA_DIR,
+        top_n: int = config.PROCESSED_TOP_N,
+        replace: bool = False
+    ) -> str:
+        """
+        Persist the sparse arrays of every leverage level
+        
+        Critical zones and statistics are cheap to recompute from the sparse
+        arrays, so only the arrays and the full-map scalars are stored.
+        
+        Args:
+            output_dir: Directory holding processed snapshots
+            top_n: Unused; kept for compatibility with LiquidationDataProcessor
+            replace: Replace an existing snapshot of the same name
+        
+        Returns:
+            Path of the snapshot directory
+        """
+        if self.raw_hash is None:
+            self.raw_hash = compute_raw_hash(self.raw_data)
+        
+        def write(tmp_dir: str) -> None:
+            for leverage, levels in self.sparse_data.items():
+                for field in _SparseLevels.ARRAYS:
+                    np.save(os.path.join(tmp_dir, f"{leverage}_{field}.npy"),
+                            np.asarray(getattr(levels, field)))
+            
+            meta = {
+                'format_version': config.PROCESSED_FORMAT_VERSION,
+                'raw_hash': self.raw_hash,
+                'min_level': self.min_level,
+                'current_price': self.current_price,
+                'leverage_levels': list(self.sparse_data.keys()),
+                'num_levels': {k: v.num_levels for k, v in self.sparse_data.items()},
+                'max_level': {k: v.max_level for k, v in self.sparse_data.items()}
+            }
+            with open(os.path.join(tmp_dir, "meta.json"), 'w') as f:
+                json.dump(meta, f, default=float)
+        
+        return write_snapshot(output_dir, self.snapshot_name(self.raw_hash, self.min_level), write, replace)
+    
+    @classmethod
+    def snapshot_name(cls, raw_hash: str, min_level: float = config.SPARSE_MIN_LEVEL) -> str:
+        """
+        Name of the snapshot directory for a raw input and threshold
+        
+        Args:
+            raw_hash: Hash of the raw input (see compute_raw_hash)
+            min_level: Threshold the snapshot was stored with
+        
+        Returns:
+            Directory name inside the processed data directory
+        """
+        return f"{raw_hash}-sparse-{min_level:g}"
+    
+    @classmethod
+    def from_processed(
+        cls,
+        raw_hash: str,
+        input_dir: str = config.PROCESSED_DATA_DIR,
+        mmap: bool = config.PROCESSED_MMAP,
+        min_level: float = config.SPARSE_MIN_LEVEL
+    ) -> "SparseLiquidationProcessor":
+        """
+        Warm-start a sparse processor from a processed snapshot
+        
+        Args:
+            raw_hash: Hash of the raw input (see compute_raw_hash)
+            input_dir: Directory holding processed snapshots
+            mmap: Memory-map the arrays instead of reading them into memory
+            min_level: Threshold the snapshot was stored with
+        
+        Returns:
+            SparseLiquidationProcessor without raw_data
+        """
+        snapshot_dir = os.path.join(input_dir, cls.snapshot_name(raw_hash, min_level))
+        meta = read_snapshot_meta(snapshot_dir)
+        mmap_mode = 'r' if mmap else None
+        
+        processor = cls.__new__(cls)
+        processor.raw_data = None
+        processor.raw_hash = raw_hash
+        processor.min_level = meta['min_level']
+        processor.current_price = meta['current_price']
+        processor.leverage_data = {}
+        processor.sparse_data = {}
+        processor._frame_cache = {}
+        processor._summary_cache = None
+        processor._zones_cache = {}
+        
+        previous_axis = None
+        for leverage in meta['leverage_levels']:
+            arrays = {
+                field: np.load(os.path.join(snapshot_dir, f"{leverage}_{field}.npy"),
+                               mmap_mode=mmap_mode)
+                for field in _SparseLevels.ARRAYS
+            }
+            # Share identical price axes again
+            if previous_axis is not None and np.array_equal(arrays['price_axis'], previous_axis):
+                arrays['price_axis'] = previous_axis
+            if arrays['row_prices'].ndim == 0:
+                arrays['row_prices'] = float(arrays['row_prices'])
+            
+            levels = _SparseLevels(
+                num_levels=meta['num_levels'][leverage],
+                max_level=meta['max_level'][leverage],
+                **arrays
+            )
+            processor.sparse_data[leverage] = levels
+            previous_axis = levels.price_axis
+        
+        logger.info(f"Loaded processed data from {snapshot_dir}")
+        return processor
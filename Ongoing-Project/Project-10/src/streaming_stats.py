@@ -0,0 +1,322 @@
+"""
+Streaming Statistics Module for Liquidation Data
+Tracks liquidation metrics over a history of snapshots in bounded memory
+"""
+import pandas as pd
+import math
+import logging
+from collections import deque
+from typing import Dict, Optional
+import config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Summary columns tracked per leverage level
+TRACKED_METRICS = [
+    'total_liquidation_amount',
+    'long_liquidation_amount',
+    'short_liquidation_amount',
+    'long_short_ratio',
+    'max_liquidation_amount'
+]
+
+
+class StreamingStatistic:
+    """
+    Constant-memory statistics for a single stream of values
+    
+    Keeps Welford mean/variance over the full history, an EWMA, and
+    rolling mean/variance/max over the last `window` values.
+    """
+    
+    def __init__(
+        self,
+        window: int = config.STATS_WINDOW,
+        alpha: float = config.STATS_EWMA_ALPHA
+    ):
+        """
+        Initialize the statistic
+        
+        Args:
+            window: Number of most recent values used for rolling metrics
+            alpha: EWMA smoothing factor (0 < alpha <= 1)
+        """
+        self.window = window
+        self.alpha = alpha
+        
+        # Full history (Welford)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.last = math.nan
+        
+        # EWMA as weighted sum / total weight, so partials can be merged
+        self.ewma_sum = 0.0
+        self.ewma_weight = 0.0
+        
+        # Rolling window: values with shifted running sums, and a
+        # monotonically decreasing deque of (sequence, value) for the max
+        self.window_values = deque(maxlen=window)
+        self.window_shift = None
+        self.window_sum = 0.0
+        self.window_sumsq = 0.0
+        self.window_max = deque()
+    
+    def update(self, value: float) -> None:
+        """
+        Add a new value to the stream
+        
+        Args:
+            value: Observed value
+        """
+        value = float(value)
+        
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.last = value
+        
+        decay = 1.0 - self.alpha
+        self.ewma_sum = self.ewma_sum * decay + self.alpha * value
+        self.ewma_weight = self.ewma_weight * decay + self.alpha
+        
+        self._push_window(value, self.count)
+    
+    def _push_window(self, value: float, seq: int) -> None:
+        """Push a value into the rolling window structures"""
+        if self.window_shift is None:
+            self.window_shift = value
+        
+        if len(self.window_values) == self.window:
+            dropped = self.window_values[0] - self.window_shift
+            self.window_sum -= dropped
+            self.window_sumsq -= dropped * dropped
+        self.window_values.append(value)
+        shifted = value - self.window_shift
+        self.window_sum += shifted
+        self.window_sumsq += shifted * shifted
+        
+        # Re-anchor the shifted sums once per window to bound rounding drift
+        if seq % self.window == 0:
+            self._reset_window_sums()
+        
+        while self.window_max and self.window_max[-1][1] <= value:
+            self.window_max.pop()
+        self.window_max.append((seq, value))
+        while self.window_max[0][0] <= seq - self.window:
+            self.window_max.popleft()
+    
+    def _reset_window_sums(self) -> None:
+        """Recompute rolling sums from the window values"""
+        self.window_shift = self.window_values[0]
+        self.window_sum = sum(v - self.window_shift for v in self.window_values)
+        self.window_sumsq = sum((v - self.window_shift) ** 2 for v in self.window_values)
+    
+    @property
+    def variance(self) -> float:
+        """Sample variance over the full history"""
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+    
+    @property
+    def ewma(self) -> float:
+        """Exponentially weighted moving average (bias-corrected)"""
+        return self.ewma_sum / self.ewma_weight if self.ewma_weight > 0 else math.nan
+    
+    @property
+    def rolling_mean(self) -> float:
+        """Mean over the last `window` values"""
+        n = len(self.window_values)
+        return self.window_shift + self.window_sum / n if n else math.nan
+    
+    @property
+    def rolling_variance(self) -> float:
+        """Sample variance over the last `window` values"""
+        n = len(self.window_values)
+        if n < 2:
+            return math.nan
+        variance = (self.window_sumsq - self.window_sum ** 2 / n) / (n - 1)
+        return max(variance, 0.0)
+    
+    @property
+    def rolling_max(self) -> float:
+        """Maximum over the last `window` values"""
+        return self.window_max[0][1] if self.window_max else math.nan
+    
+    def merge(self, other: "StreamingStatistic") -> "StreamingStatistic":
+        """
+        Merge a partial statistic computed over a later segment of the stream
+        
+        Welford, min and max are order independent; EWMA and rolling metrics
+        assume `other` observed its values after this one.
+        
+        Args:
+            other: Statistic covering the values that follow this one
+        
+        Returns:
+            Self, updated in place
+        """
+        if self.window != other.window or self.alpha != other.alpha:
+            raise ValueError("Cannot merge statistics with different window or alpha")
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.__dict__.update(_copy_state(other))
+            return self
+        
+        # Chan et al. parallel variance
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.mean += delta * other.count / total
+        offset = self.count
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.last = other.last
+        
+        decay = (1.0 - self.alpha) ** other.count
+        self.ewma_sum = self.ewma_sum * decay + other.ewma_sum
+        self.ewma_weight = self.ewma_weight * decay + other.ewma_weight
+        
+        # Rebuild window sums from the combined tail
+        values = list(self.window_values) + list(other.window_values)
+        self.window_values = deque(values[-self.window:], maxlen=self.window)
+        self._reset_window_sums()
+        
+        for seq, value in other.window_max:
+            seq += offset
+            while self.window_max and self.window_max[-1][1] <= value:
+                self.window_max.pop()
+            self.window_max.append((seq, value))
+        while self.window_max[0][0] <= self.count - self.window:
+            self.window_max.popleft()
+        
+        return self
+    
+    def to_dict(self) -> Dict[str, float]:
+        """
+        Get current values
+        
+        Returns:
+            Dictionary with all tracked metrics
+        """
+        return {
+            'count': self.count,
+            'last': self.last,
+            'mean': self.mean if self.count else math.nan,
+            'variance': self.variance,
+            'min': self.min if self.count else math.nan,
+            'max': self.max if self.count else math.nan,
+            'ewma': self.ewma,
+            'rolling_mean': self.rolling_mean,
+            'rolling_variance': self.rolling_variance,
+            'rolling_max': self.rolling_max
+        }
+
+
+def _copy_state(stat: StreamingStatistic) -> Dict:
+    """Copy the state of a statistic so merged objects do not share deques"""
+    state = dict(stat.__dict__)
+    state['window_values'] = deque(stat.window_values, maxlen=stat.window)
+    state['window_max'] = deque(stat.window_max)
+    return state
+
+
+class LiquidationStatsAccumulator:
+    """
+    Accumulates liquidation summary metrics over successive processor snapshots
+    """
+    
+    def __init__(
+        self,
+        window: int = config.STATS_WINDOW,
+        alpha: float = config.STATS_EWMA_ALPHA,
+        metrics: Optional[list] = None
+    ):
+        """
+        Initialize the accumulator
+        
+        Args:
+            window: Number of most recent snapshots used for rolling metrics
+            alpha: EWMA smoothing factor
+            metrics: Summary columns to track (default: TRACKED_METRICS)
+        """
+        self.window = window
+        self.alpha = alpha
+        self.metrics = metrics or TRACKED_METRICS
+        self.num_snapshots = 0
+        self.stats = {
+            (leverage, metric): StreamingStatistic(window, alpha)
+            for leverage in config.LEVERAGE_LEVELS
+            for metric in self.metrics
+        }
+    
+    def update(self, processor) -> None:
+        """
+        Consume a new snapshot
+        
+        Args:
+            processor: LiquidationDataProcessor instance
+        """
+        summary = processor.get_liquidation_summary()
+        
+        for row in summary.to_dict('records'):
+            for metric in self.metrics:
+                stat = self.stats.get((row['leverage'], metric))
+                value = row[metric]
+                if stat is not None and math.isfinite(value):
+                    stat.update(value)
+        
+        self.num_snapshots += 1
+    
+    def merge(self, other: "LiquidationStatsAccumulator") -> "LiquidationStatsAccumulator":
+        """
+        Merge an accumulator computed over a later range of snapshots
+        
+        Args:
+            other: Accumulator covering the snapshots that follow this one
+        
+        Returns:
+            Self, updated in place
+        """
+        for key, stat in other.stats.items():
+            if key in self.stats:
+                self.stats[key].merge(stat)
+            else:
+                self.stats[key] = StreamingStatistic(stat.window, stat.alpha).merge(stat)
+        
+        self.num_snapshots += other.num_snapshots
+        return self
+    
+    def get(self, leverage: str, metric: str) -> Dict[str, float]:
+        """
+        Get current values for one leverage level and metric
+        
+        Args:
+            leverage: Leverage level (e.g., "100x")
+            metric: Summary column (e.g., "long_short_ratio")
+        
+        Returns:
+            Dictionary with current statistics
+        """
+        return self.stats[(leverage, metric)].to_dict()
+    
+    def get_current(self) -> pd.DataFrame:
+        """
+        Get current values for all leverage levels and metrics
+        
+        Returns:
+            DataFrame with one row per leverage level and metric
+        """
+        rows = [
+            {'leverage': leverage, 'metric': metric, **stat.to_dict()}
+            for (leverage, metric), stat in self.stats.items()
+        ]
+        return pd.DataFrame(rows)
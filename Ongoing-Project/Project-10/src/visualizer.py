@@ -11,6 +11,8 @@ import pandas as pd
 import numpy as np
 import logging
 from typing import Optional, List
+from .artifact_writer import ArtifactWriter, closing_figure, save_figure, save_html
+from .figure_templates import FigureTemplates, TEMPLATE_CLASSES
 import config
 
 # Configure logging
@@ -28,20 +30,56 @@ class LiquidationVisualizer:
     Creates visualizations for liquidation data analysis
     """
     
-    def __init__(self, processor):
+    def __init__(
+        self,
+        processor,
+        writer: Optional[ArtifactWriter] = None,
+        show: bool = True,
+        templates: Optional[FigureTemplates] = None
+    ):
         """
         Initialize the visualizer
         
         Args:
             processor: LiquidationDataProcessor instance
+            writer: ArtifactWriter for background saving (None saves inline)
+            show: Display figures after rendering; figures are always closed
+            templates: Reusable figure layouts (e.g. get_figure_templates()) for
+                the heatmap, comparison and zone charts; used when show is False
         """
         self.processor = processor
         self.current_price = processor.current_price
+        self.writer = writer
+        self.show = show
+        self.templates = templates
+    
+    def _render_template(self, kind: str, save_path: Optional[str], *args, **kwargs) -> None:
+        """
+        Render a chart through a pooled template, or a one-off figure
+        
+        Args:
+            kind: Template attribute of FigureTemplates ('heatmap', 'comparison', 'zones')
+            save_path: Path to save the figure
+            *args, **kwargs: Data passed to the template's render
+        """
+        if self.templates is not None and not self.show:
+            fig = getattr(self.templates, kind).render(*args, **kwargs)
+            save_figure(fig, save_path, self.writer, show=False, close=False,
+                        dpi=300, bbox_inches='tight')
+        else:
+            template = TEMPLATE_CLASSES[kind](pooled=False)
+            try:
+                fig = template.render(*args, **kwargs)
+                save_figure(fig, save_path, self.writer, self.show,
+                            dpi=300, bbox_inches='tight')
+            finally:
+                template.close()
     
     def plot_liquidation_heatmap(
         self,
         leverage: Optional[str] = None,
-        save_path: Optional[str] = None
+        save_path: Optional[str] = None,
+        title: Optional[str] = None
     ) -> None:
         """
         Create liquidation heatmap visualization
@@ -49,13 +87,14 @@ class LiquidationVisualizer:
         Args:
             leverage: Specific leverage level or None for all
             save_path: Path to save the figure
+            title: Title of the all-leverage figure (default: generic title)
         """
         try:
             if leverage:
                 df = self.processor.get_leverage_data(leverage)
                 self._plot_single_heatmap(df, leverage, save_path)
             else:
-                self._plot_all_leverage_heatmap(save_path)
+                self._plot_all_leverage_heatmap(save_path, title)
                 
             logger.info("Liquidation heatmap created successfully")
             
@@ -71,109 +110,50 @@ class LiquidationVisualizer:
         """Plot heatmap for single leverage level"""
         fig, ax = plt.subplots(figsize=(14, 6))
         
-        # Separate long and short positions
-        long_df = df[df['position_type'] == 'Long']
-        short_df = df[df['position_type'] == 'Short']
-        
-        # Plot liquidation levels
-        ax.bar(long_df['liq_price'], long_df['liq_level'], 
-               width=50, color='red', alpha=0.6, label='Long Liquidations')
-        ax.bar(short_df['liq_price'], short_df['liq_level'],
-               width=50, color='green', alpha=0.6, label='Short Liquidations')
-        
-        # Add current price line
-        ax.axvline(self.current_price, color='blue', linestyle='--',
-                   linewidth=2, label=f'Current Price: ${self.current_price:,.0f}')
-        
-        ax.set_xlabel('Price (USD)', fontsize=12)
-        ax.set_ylabel('Liquidation Amount (USD)', fontsize=12)
-        ax.set_title(f'Liquidation Heatmap - {leverage} Leverage', fontsize=14, fontweight='bold')
-        ax.legend()
-        ax.grid(True, alpha=0.3)
-        
-        plt.tight_layout()
-        
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        plt.show()
-
-    def _plot_all_leverage_heatmap(self, save_path: Optional[str]) -> None:
-        """Plot heatmap for all leverage levels"""
-        fig, axes = plt.subplots(2, 2, figsize=(16, 12))
-        axes = axes.flatten()
-        
-        for idx, leverage in enumerate(config.LEVERAGE_LEVELS):
-            df = self.processor.get_leverage_data(leverage)
-            ax = axes[idx]
-            
+        with closing_figure(fig):
+            # Separate long and short positions
             long_df = df[df['position_type'] == 'Long']
             short_df = df[df['position_type'] == 'Short']
             
-            ax.bar(long_df['liq_price'], long_df['liq_level'],
-                   width=50, color='red', alpha=0.6, label='Long')
+            # Plot liquidation levels
+            ax.bar(long_df['liq_price'], long_df['liq_level'], 
+                   width=50, color='red', alpha=0.6, label='Long Liquidations')
             ax.bar(short_df['liq_price'], short_df['liq_level'],
-                   width=50, color='green', alpha=0.6, label='Short')
+                   width=50, color='green', alpha=0.6, label='Short Liquidations')
+            
+            # Add current price line
             ax.axvline(self.current_price, color='blue', linestyle='--',
-                       linewidth=2, label='Current Price')
+                       linewidth=2, label=f'Current Price: ${self.current_price:,.0f}')
             
-            ax.set_xlabel('Price (USD)')
-            ax.set_ylabel('Liquidation Amount (USD)')
-            ax.set_title(f'{leverage} Leverage', fontweight='bold')
+            ax.set_xlabel('Price (USD)', fontsize=12)
+            ax.set_ylabel('Liquidation Amount (USD)', fontsize=12)
+            ax.set_title(f'Liquidation Heatmap - {leverage} Leverage', fontsize=14, fontweight='bold')
             ax.legend()
             ax.grid(True, alpha=0.3)
-        
-        plt.suptitle('Liquidation Heatmap - All Leverage Levels',
-                     fontsize=16, fontweight='bold', y=1.00)
-        plt.tight_layout()
-        
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        plt.show()
+            
+            plt.tight_layout()
+            
+            save_figure(fig, save_path, self.writer, self.show,
+                        dpi=300, bbox_inches='tight')
+
+    def _plot_all_leverage_heatmap(
+        self,
+        save_path: Optional[str],
+        title: Optional[str] = None
+    ) -> None:
+        """Plot heatmap for all leverage levels"""
+        leverage_data = {
+            leverage: self.processor.get_leverage_data(leverage)
+            for leverage in config.LEVERAGE_LEVELS
+        }
+        self._render_template('heatmap', save_path,
+                              leverage_data, self.current_price, title=title)
     
     def compare_leverage_levels(self, save_path: Optional[str] = None) -> None:
         """Compare liquidation patterns across leverage levels"""
         try:
             summary = self.processor.get_liquidation_summary()
-            
-            fig, axes = plt.subplots(2, 2, figsize=(14, 10))
-            
-            # Total liquidation amount
-            axes[0, 0].bar(summary['leverage'], summary['total_liquidation_amount'],
-                           color='steelblue')
-            axes[0, 0].set_title('Total Liquidation Amount by Leverage')
-            axes[0, 0].set_ylabel('Amount (USD)')
-            axes[0, 0].tick_params(axis='x', rotation=0)
-            
-            # Long vs Short
-            x = np.arange(len(summary))
-            width = 0.35
-            axes[0, 1].bar(x - width/2, summary['long_liquidation_amount'],
-                           width, label='Long', color='red', alpha=0.7)
-            axes[0, 1].bar(x + width/2, summary['short_liquidation_amount'],
-                           width, label='Short', color='green', alpha=0.7)
-            axes[0, 1].set_title('Long vs Short Liquidations')
-            axes[0, 1].set_xticks(x)
-            axes[0, 1].set_xticklabels(summary['leverage'])
-            axes[0, 1].legend()
-            
-            # Number of liquidation levels
-            axes[1, 0].bar(summary['leverage'], summary['num_liquidation_levels'],
-                           color='coral')
-            axes[1, 0].set_title('Number of Liquidation Levels')
-            axes[1, 0].set_ylabel('Count')
-            
-            # Long/Short Ratio
-            axes[1, 1].bar(summary['leverage'], summary['long_short_ratio'],
-                           color='purple', alpha=0.7)
-            axes[1, 1].set_title('Long/Short Liquidation Ratio')
-            axes[1, 1].axhline(y=1, color='black', linestyle='--', alpha=0.5)
-            axes[1, 1].set_ylabel('Ratio')
-            
-            plt.tight_layout()
-            
-            if save_path:
-                plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            plt.show()
+            self._render_template('comparison', save_path, summary)
             
             logger.info("Leverage comparison created successfully")
             
@@ -184,40 +164,14 @@ class LiquidationVisualizer:
         self,
         leverage: str = "100x",
         top_n: int = 10,
-        save_path: Optional[str] = None
+        save_path: Optional[str] = None,
+        title: Optional[str] = None
     ) -> None:
         """Identify and visualize critical liquidation zones"""
         try:
             critical_zones = self.processor.identify_critical_zones(leverage, top_n)
-            
-            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
-            
-            # Bar chart of top liquidation zones
-            colors = ['red' if pt == 'Long' else 'green' 
-                     for pt in critical_zones['position_type']]
-            ax1.barh(range(len(critical_zones)), critical_zones['liq_level'],
-                     color=colors, alpha=0.7)
-            ax1.set_yticks(range(len(critical_zones)))
-            ax1.set_yticklabels([f"${p:,.0f}" for p in critical_zones['liq_price']])
-            ax1.set_xlabel('Liquidation Amount (USD)')
-            ax1.set_title(f'Top {top_n} Critical Liquidation Zones - {leverage}')
-            ax1.invert_yaxis()
-            
-            # Distance from current price
-            ax2.barh(range(len(critical_zones)), critical_zones['distance_pct'],
-                     color=colors, alpha=0.7)
-            ax2.set_yticks(range(len(critical_zones)))
-            ax2.set_yticklabels([f"${p:,.0f}" for p in critical_zones['liq_price']])
-            ax2.set_xlabel('Distance from Current Price (%)')
-            ax2.set_title('Distance from Current Price')
-            ax2.axvline(x=0, color='blue', linestyle='--', linewidth=2)
-            ax2.invert_yaxis()
-            
-            plt.tight_layout()
-            
-            if save_path:
-                plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            plt.show()
+            self._render_template('zones', save_path,
+                                  critical_zones, leverage, top_n, title=title)
             
             # Print summary
             print(f"\n{'='*60}")
@@ -287,12 +241,102 @@ class LiquidationVisualizer:
                 height=600
             )
             
-            if save_path:
-                fig.write_html(save_path)
-            
-            fig.show()
+            save_html(fig, save_path, self.writer, self.show)
             
             logger.info("Interactive heatmap created successfully")
             
         except Exception as e:
             logger.error(f"Error creating interactive heatmap: {str(e)}")
+
+
+class MultiTimeframeVisualizer:
+    """
+    Creates combined visualizations for a MultiTimeframeProcessor
+    """
+    
+    def __init__(
+        self,
+        mtf_processor,
+        writer: Optional[ArtifactWriter] = None,
+        show: bool = True
+    ):
+        """
+        Initialize the visualizer
+        
+        Args:
+            mtf_processor: MultiTimeframeProcessor instance
+            writer: ArtifactWriter for background saving (None saves inline)
+            show: Display figures after rendering; figures are always closed
+        """
+        self.mtf = mtf_processor
+        self.current_price = mtf_processor.current_price
+        self.writer = writer
+        self.show = show
+    
+    def plot_timeframe_comparison(
+        self,
+        reference: Optional[str] = None,
+        normalize: bool = True,
+        save_path: Optional[str] = None
+    ) -> None:
+        """
+        Plot every leverage level as a timeframe x price heatmap next to its
+        change against the reference timeframe
+        
+        Args:
+            reference: Reference timeframe (default: first timeframe)
+            normalize: Compare distributions instead of absolute amounts
+            save_path: Path to save the figure
+        """
+        try:
+            comparison = self.mtf.compare(reference=reference, normalize=normalize)
+            cube = self.mtf.get_cube(normalize)
+            deltas = comparison['deltas']
+            timeframes = self.mtf.timeframes
+            edges = self.mtf.price_edges
+            extent = [edges[0], edges[-1], len(timeframes) - 0.5, -0.5]
+            
+            num_leverage = len(self.mtf.leverage_levels)
+            fig, axes = plt.subplots(num_leverage, 2, figsize=(16, 3.5 * num_leverage),
+                                     squeeze=False)
+            
+            with closing_figure(fig):
+                for idx, leverage in enumerate(self.mtf.leverage_levels):
+                    ax_level, ax_delta = axes[idx]
+                    
+                    # Liquidation amount per timeframe and price bin
+                    image = ax_level.imshow(cube[:, idx, :], aspect='auto', extent=extent,
+                                            cmap=config.COLOR_PALETTE, interpolation='nearest')
+                    ax_level.set_yticks(range(len(timeframes)))
+                    ax_level.set_yticklabels(timeframes)
+                    ax_level.axvline(self.current_price, color='white', linestyle='--', linewidth=1.5)
+                    ax_level.set_title(f'{leverage} Leverage - Liquidations by Timeframe',
+                                       fontweight='bold')
+                    fig.colorbar(image, ax=ax_level, label='Share' if normalize else 'USD')
+                    
+                    # Change against the reference timeframe
+                    limit = np.abs(deltas[:, idx, :]).max() or 1.0
+                    image = ax_delta.imshow(deltas[:, idx, :], aspect='auto', extent=extent,
+                                            cmap='RdYlGn', vmin=-limit, vmax=limit,
+                                            interpolation='nearest')
+                    ax_delta.set_yticks(range(len(timeframes)))
+                    ax_delta.set_yticklabels(timeframes)
+                    ax_delta.axvline(self.current_price, color='blue', linestyle='--', linewidth=1.5)
+                    ax_delta.set_title(f'{leverage} Leverage - Change vs {comparison["reference"]}',
+                                       fontweight='bold')
+                    fig.colorbar(image, ax=ax_delta, label='Delta')
+                
+                for ax in axes[-1]:
+                    ax.set_xlabel('Price (USD)')
+                
+                plt.suptitle('Liquidation Walls Across Timeframes',
+                             fontsize=16, fontweight='bold', y=1.00)
+                plt.tight_layout()
+                
+                save_figure(fig, save_path, self.writer, self.show,
+                            dpi=300, bbox_inches='tight')
+            
+            logger.info("Timeframe comparison created successfully")
+            
+        except Exception as e:
+            logger.error(f"Error creating timeframe comparison: {str(e)}")
@@ -10,6 +10,23 @@ def check_module(module_name):
     spec = importlib.util.find_spec(module_name)
     return spec is not None
 
+def make_sample_response(num_levels=400, current_price=50000.0, seed=0):
+    """Build a synthetic API response with string values, like the live API"""
+    import numpy as np
+    
+    rng = np.random.default_rng(seed)
+    data = {'cur_price_data': {'data': [{'cur_price': str(current_price)}]}}
+    for leverage in ['10x', '25x', '50x', '100x']:
+        prices = np.linspace(current_price * 0.7, current_price * 1.3, num_levels)
+        levels = rng.gamma(2.0, 1e5, num_levels)
+        levels[rng.random(num_levels) < 0.5] = 0.0
+        data[f'liq_{leverage}_map_data'] = {'data': [{
+            'liq_price': [f"{p:.1f}" for p in prices[::-1]],
+            'liq_level': [f"{l:.2f}" for l in levels],
+            'price': [str(current_price)] * num_levels
+        }]}
+    return {'success': True, 'data': {'data': data}}
+
 def test_dependencies():
     """Test if all required dependencies are installed"""
     print("="*60)
@@ -20,6 +37,7 @@ def test_dependencies():
         'pandas',
         'numpy',
         'matplotlib',
+        'PIL',
         'seaborn',
         'plotly',
         'dotenv'
@@ -62,6 +80,83 @@ def test_imports():
         print(f"❌ visualizer.py: {str(e)}")
         return False
     
+    try:
+        from src.batch_runner import BatchLiquidationRunner
+        print("✅ batch_runner.py")
+    except Exception as e:
+        print(f"❌ batch_runner.py: {str(e)}")
+        return False
+    
+    try:
+        from src.streaming_stats import LiquidationStatsAccumulator
+        print("✅ streaming_stats.py")
+    except Exception as e:
+        print(f"❌ streaming_stats.py: {str(e)}")
+        return False
+    
+    try:
+        from src.scenario_engine import LiquidationScenarioEngine
+        print("✅ scenario_engine.py")
+    except Exception as e:
+        print(f"❌ scenario_engine.py: {str(e)}")
+        return False
+    
+    try:
+        from src.artifact_writer import ArtifactWriter
+        print("✅ artifact_writer.py")
+    except Exception as e:
+        print(f"❌ artifact_writer.py: {str(e)}")
+        return False
+    
+    try:
+        from src.chunked_processor import ChunkedLiquidationProcessor
+        print("✅ chunked_processor.py")
+    except Exception as e:
+        print(f"❌ chunked_processor.py: {str(e)}")
+        return False
+    
+    try:
+        from src.sparse_processor import SparseLiquidationProcessor
+        print("✅ sparse_processor.py")
+    except Exception as e:
+        print(f"❌ sparse_processor.py: {str(e)}")
+        return False
+    
+    try:
+        from src.query_service import LiquidationQueryService
+        print("✅ query_service.py")
+    except Exception as e:
+        print(f"❌ query_service.py: {str(e)}")
+        return False
+    
+    try:
+        from src.multi_timeframe import MultiTimeframeProcessor
+        print("✅ multi_timeframe.py")
+    except Exception as e:
+        print(f"❌ multi_timeframe.py: {str(e)}")
+        return False
+    
+    try:
+        from src.animation import LiquidationAnimator
+        print("✅ animation.py")
+    except Exception as e:
+        print(f"❌ animation.py: {str(e)}")
+        return False
+    
+    try:
+        from src.figure_templates import FigureTemplates
+        print("✅ figure_templates.py")
+    except Exception as e:
+        print(f"❌ figure_templates.py: {str(e)}")
+        return False
+    
+    try:
+        from src.profiling import MemoryProfiler
+        print("✅ profiling.py")
+    except Exception as e:
+        print(f"❌ profiling.py: {str(e)}")
+        return False
+    
     try:
         import config
         print("✅ config.py")
@@ -156,6 +251,1226 @@ def test_sample_data():
         print(f"❌ Sample data test failed: {str(e)}")
         return False
 
+def test_compressed_transfer():
+    """Test gzip/deflate negotiation against a local compressing server"""
+    print("\n" + "="*60)
+    print("Testing Compressed Transfer...")
+    print("="*60)
+    
+    import gzip
+    import json
+    import threading
+    import zlib
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from src.data_fetcher import LiquidationDataFetcher
+    
+    payload = json.dumps({
+        'success': True,
+        'data': {'liq_level': [str(1000.0 + i % 50) for i in range(20000)]}
+    }).encode("utf-8")
+    
+    class CompressingHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            accepted = self.headers.get('Accept-Encoding', '')
+            if 'gzip' in accepted:
+                body, encoding = gzip.compress(payload), 'gzip'
+            elif 'deflate' in accepted:
+                body, encoding = zlib.compress(payload), 'deflate'
+            else:
+                body, encoding = payload, None
+            self.send_response(200)
+            if encoding:
+                self.send_header('Content-Encoding', encoding)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), CompressingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    try:
+        all_ok = True
+        for accept_encoding in ['gzip, deflate', 'deflate', None]:
+            fetcher = LiquidationDataFetcher(
+                api_host=f"127.0.0.1:{server.server_port}",
+                use_https=False,
+                accept_encoding=accept_encoding
+            )
+            fetcher._save_raw_data = lambda *args: None
+            data = fetcher.fetch_liquidation_map()
+            record = fetcher.transfer_log[-1]
+            
+            ok = (data['data']['liq_level'][-1] == '1049.0'
+                  and record['decoded_bytes'] == len(payload))
+            status = "✅" if ok else "❌"
+            print(f"{status} {record['content_encoding']}: "
+                  f"{record['wire_bytes']:,} bytes on wire, "
+                  f"{record['decoded_bytes']:,} bytes decoded")
+            all_ok = all_ok and ok
+        
+        return all_ok
+    except Exception as e:
+        print(f"❌ Compressed transfer test failed: {str(e)}")
+        return False
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_fetch_retries():
+    """Test retries, Retry-After handling and request coalescing against a local server"""
+    print("\n" + "="*60)
+    print("Testing Fetch Retries...")
+    print("="*60)
+    
+    import json
+    import threading
+    import time
+    import types
+    from collections import Counter
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlparse
+    from src import data_fetcher
+    from src.data_fetcher import LiquidationDataFetcher, UpstreamError
+    
+    payload = json.dumps({'success': True, 'data': {'liq_level': ['1.0']}}).encode("utf-8")
+    
+    # pair -> (status, headers) per attempt; the last entry repeats
+    script = {
+        'RETRY': [(429, {'retry-after': '0.01'}), (200, {})],
+        'CAPPED': [(429, {'Retry-After': '3600'}), (200, {})],
+        'FLAKY': [(503, {}), (502, {}), (200, {})],
+        'DOWN': [(503, {})],
+        'SLOW': [(200, {})]
+    }
+    calls = Counter()
+    calls_lock = threading.Lock()
+    
+    class CountingHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            pair = parse_qs(urlparse(self.path).query)['pair'][0]
+            with calls_lock:
+                attempt = calls[pair]
+                calls[pair] += 1
+            if pair == 'SLOW':
+                time.sleep(0.3)
+            status, headers = script[pair][min(attempt, len(script[pair]) - 1)]
+            body = payload if status == 200 else b'{"success": false}'
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), CountingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    # Record backoff delays instead of sleeping through them
+    delays = []
+    real_time = data_fetcher.time
+    data_fetcher.time = types.SimpleNamespace(
+        **{name: getattr(time, name) for name in dir(time) if not name.startswith('_')}
+    )
+    data_fetcher.time.sleep = delays.append
+    
+    def fetch(pair, **kwargs):
+        fetcher = LiquidationDataFetcher(
+            api_host=f"127.0.0.1:{server.server_port}", use_https=False,
+            backoff_base=0.01, **kwargs
+        )
+        fetcher._save_raw_data = lambda *args: None
+        return fetcher, fetcher.fetch_liquidation_map(pair=pair)
+    
+    try:
+        _, data = fetch('RETRY')
+        retry_ok = calls['RETRY'] == 2 and delays == [0.01] and data['success']
+        
+        delays.clear()
+        fetch('CAPPED', backoff_max=0.05)
+        capped_ok = calls['CAPPED'] == 2 and delays == [0.05]
+        
+        delays.clear()
+        fetch('FLAKY', max_retries=3)
+        flaky_ok = calls['FLAKY'] == 3 and len(delays) == 2 and all(0 <= d <= 0.02 for d in delays)
+        
+        try:
+            fetch('DOWN', max_retries=2)
+            down_ok = False
+        except UpstreamError as e:
+            down_ok = calls['DOWN'] == 3 and '503' in str(e)
+        
+        # Concurrent identical requests share one upstream call
+        fetcher = LiquidationDataFetcher(
+            api_host=f"127.0.0.1:{server.server_port}", use_https=False
+        )
+        fetcher._save_raw_data = lambda *args: None
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(fetcher.fetch_liquidation_map(pair='SLOW')))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        coalesce_ok = (
+            calls['SLOW'] == 1 and len(results) == 4
+            and all(result is results[0] for result in results)
+        )
+        
+        checks = [
+            ("429 retried after Retry-After (any header case)", retry_ok),
+            ("Retry-After capped at backoff_max", capped_ok),
+            ("5xx retried with bounded backoff", flaky_ok),
+            ("Gives up after max_retries with UpstreamError", down_ok),
+            ("Concurrent identical requests coalesced", coalesce_ok)
+        ]
+        for name, ok in checks:
+            status = "✅" if ok else "❌"
+            print(f"{status} {name}")
+        
+        return all(ok for _, ok in checks)
+    except Exception as e:
+        print(f"❌ Fetch retry test failed: {str(e)}")
+        return False
+    finally:
+        data_fetcher.time = real_time
+        server.shutdown()
+        server.server_close()
+
+def test_artifact_writer():
+    """Test atomic writes, queue backpressure and write error reporting"""
+    print("\n" + "="*60)
+    print("Testing Artifact Writer...")
+    print("="*60)
+    
+    import os
+    import stat
+    import tempfile
+    import threading
+    from src import artifact_writer
+    from src.artifact_writer import ArtifactWriter, ArtifactWriteError, write_atomic
+    
+    real_write_atomic = artifact_writer.write_atomic
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "report.txt")
+            write_atomic(path, b"first")
+            
+            # A failed write leaves the previous file intact and no temporary file
+            try:
+                write_atomic(path, "not bytes")
+            except TypeError:
+                pass
+            with open(path, 'rb') as f:
+                atomic_ok = f.read() == b"first" and os.listdir(tmp) == ["report.txt"]
+            
+            # Permissions follow the umask for new files and are kept on overwrite
+            umask = os.umask(0)
+            os.umask(umask)
+            new_mode = stat.S_IMODE(os.stat(path).st_mode)
+            os.chmod(path, 0o600)
+            write_atomic(path, b"second")
+            mode_ok = os.name == 'nt' or (
+                new_mode == 0o666 & ~umask and stat.S_IMODE(os.stat(path).st_mode) == 0o600
+            )
+            
+            # One blocked worker and a queue of 2: the fourth submit waits
+            release = threading.Event()
+            
+            def slow_write(target, data):
+                release.wait(5)
+                real_write_atomic(target, data)
+            
+            artifact_writer.write_atomic = slow_write
+            writer = ArtifactWriter(num_workers=1, max_queue_size=2)
+            submitted = []
+            
+            def submit_all():
+                for i in range(4):
+                    writer.submit_bytes(os.path.join(tmp, f"chart_{i}.png"), b"x" * 10)
+                    submitted.append(i)
+            
+            submitter = threading.Thread(target=submit_all)
+            submitter.start()
+            submitter.join(0.5)
+            blocked = submitter.is_alive() and len(submitted) == 3
+            release.set()
+            submitter.join(5)
+            writer.close()
+            artifact_writer.write_atomic = real_write_atomic
+            backpressure_ok = blocked and writer.files_written == 4 and writer.bytes_written == 40
+            
+            # Failed background writes are raised on close
+            writer = ArtifactWriter()
+            missing = os.path.join(tmp, "missing", "chart.png")
+            writer.submit_bytes(missing, b"x")
+            writer.submit_bytes(os.path.join(tmp, "chart.png"), b"x")
+            try:
+                writer.close()
+                errors_ok = False
+            except ArtifactWriteError as e:
+                errors_ok = [p for p, _ in e.errors] == [missing] and writer.files_written == 1
+            
+            # ...but do not mask an exception already propagating
+            try:
+                with ArtifactWriter() as writer:
+                    writer.submit_bytes(missing, b"x")
+                    raise KeyError("drawing failed")
+            except KeyError:
+                pass
+            except ArtifactWriteError:
+                errors_ok = False
+        
+        checks = [
+            ("Failed write leaves the previous file", atomic_ok),
+            ("File mode follows umask / existing file", mode_ok),
+            ("Full queue blocks submit until written", backpressure_ok),
+            ("close() raises ArtifactWriteError for failed writes", errors_ok)
+        ]
+        for name, ok in checks:
+            status = "✅" if ok else "❌"
+            print(f"{status} {name}")
+        
+        return all(ok for _, ok in checks)
+    except Exception as e:
+        print(f"❌ Artifact writer test failed: {str(e)}")
+        return False
+    finally:
+        artifact_writer.write_atomic = real_write_atomic
+
+def test_batch_runner():
+    """Test the batch runner's cross-market table, ranking and stage report"""
+    print("\n" + "="*60)
+    print("Testing Batch Runner...")
+    print("="*60)
+    
+    import os
+    import tempfile
+    import numpy as np
+    from src.batch_runner import BatchLiquidationRunner
+    from src.data_fetcher import UpstreamError
+    from src.data_processor import LiquidationDataProcessor
+    
+    responses = {
+        ('Binance', 'BTC/USDT', '1d'): make_sample_response(num_levels=150, seed=13),
+        ('Binance', 'ETH/USDT', '1d'): make_sample_response(num_levels=150, current_price=3000.0, seed=14),
+        ('OKX', 'BTC/USDT', '1d'): make_sample_response(num_levels=150, seed=15)
+    }
+    
+    class StubFetcher:
+        def fetch_liquidation_map(self, exchange, pair, time_type):
+            if pair == 'FAIL/USDT':
+                raise UpstreamError("API request failed with status 500")
+            return responses[(exchange, pair, time_type)]
+    
+    markets = list(responses) + [('Binance', 'FAIL/USDT', '1d')]
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            figures_dir = os.path.join(tmp, "figures")
+            os.makedirs(figures_dir)
+            runner = BatchLiquidationRunner(
+                fetcher=StubFetcher(), process_workers=1,
+                figures_dir=figures_dir, processed_dir=tmp
+            )
+            cross_market = runner.run(markets)
+            ranking = runner.rank_markets(cross_market)
+            report = runner.get_throughput_report().set_index('stage')
+            snapshots = [name for name in os.listdir(tmp) if name != "figures"]
+            charts = os.listdir(figures_dir)
+        
+        table_ok = (
+            len(cross_market) == 3 * 4
+            and 'FAIL/USDT' not in set(cross_market['pair'])
+        )
+        
+        expected = {
+            market: sum(LiquidationDataProcessor(raw).get_near_spot_liquidation().values())
+            for market, raw in responses.items()
+        }
+        ranked_markets = list(zip(ranking['exchange'], ranking['pair'], ranking['time_type']))
+        ranking_ok = (
+            list(ranking['rank']) == [1, 2, 3]
+            and ranked_markets == sorted(expected, key=expected.get, reverse=True)
+            and np.allclose(ranking['near_spot_amount'], [expected[m] for m in ranked_markets])
+        )
+        
+        report_ok = (
+            list(report.index) == ['fetch', 'process', 'render', 'merge', 'total']
+            and report.loc['fetch', 'markets'] == 3
+            and report.loc['process', 'markets'] == 3
+            and report.loc['render', 'markets'] == 3
+            # Rendering is timed apart from processing, not inside it
+            and report.loc['process', 'seconds'] + report.loc['render', 'seconds']
+            <= report.loc['total', 'seconds']
+        )
+        output_ok = len(snapshots) == 3 and len(charts) == 3 * 3
+        
+        checks = [
+            ("Cross-market table skips failed markets", table_ok),
+            ("Markets ranked by near-spot liquidations", ranking_ok),
+            ("Stage report times each stage once", report_ok),
+            ("Snapshots and charts written to the given directories", output_ok)
+        ]
+        for name, ok in checks:
+            status = "✅" if ok else "❌"
+            print(f"{status} {name}")
+        
+        return all(ok for _, ok in checks)
+    except Exception as e:
+        print(f"❌ Batch runner test failed: {str(e)}")
+        return False
+
+def test_warm_start():
+    """Test that a warm-started processor matches the freshly processed one"""
+    print("\n" + "="*60)
+    print("Testing Processed Snapshot Warm Start...")
+    print("="*60)
+    
+    import json
+    import os
+    import tempfile
+    import pandas as pd
+    from src.data_processor import LiquidationDataProcessor, compute_raw_hash
+    import config
+    
+    raw_data = make_sample_response()
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cold = LiquidationDataProcessor.load_or_process(raw_data, tmp_dir)
+            warm = LiquidationDataProcessor.load_or_process(raw_data, tmp_dir)
+            
+            all_ok = warm.raw_data is None
+            for top_n in [5, config.PROCESSED_TOP_N, config.PROCESSED_TOP_N + 5]:
+                for leverage in ['10x', '100x']:
+                    pd.testing.assert_frame_equal(
+                        cold.identify_critical_zones(leverage, top_n),
+                        warm.identify_critical_zones(leverage, top_n)
+                    )
+            pd.testing.assert_frame_equal(
+                cold.get_liquidation_summary(), warm.get_liquidation_summary()
+            )
+            
+            status = "✅" if all_ok else "❌"
+            print(f"{status} Warm start matches processing (summary, zones with row index)")
+            # Release the memory-mapped arrays before the directory is removed
+            del cold, warm
+            
+            # A snapshot of an older format version is rewritten, not reprocessed every run
+            meta_path = os.path.join(tmp_dir, compute_raw_hash(raw_data), "meta.json")
+            with open(meta_path) as f:
+                meta = json.load(f)
+            meta['format_version'] = 1
+            with open(meta_path, 'w') as f:
+                json.dump(meta, f)
+            
+            reprocessed = LiquidationDataProcessor.load_or_process(raw_data, tmp_dir)
+            upgraded = LiquidationDataProcessor.load_or_process(raw_data, tmp_dir)
+            with open(meta_path) as f:
+                version = json.load(f)['format_version']
+            upgrade_ok = (
+                reprocessed.raw_data is not None and upgraded.raw_data is None
+                and version == config.PROCESSED_FORMAT_VERSION
+                and not [name for name in os.listdir(tmp_dir) if name.startswith('.')]
+            )
+            status = "✅" if upgrade_ok else "❌"
+            print(f"{status} Outdated snapshot replaced and warm-started")
+            del reprocessed, upgraded
+        
+        return all_ok and upgrade_ok
+    except Exception as e:
+        print(f"❌ Warm start test failed: {str(e)}")
+        return False
+
+def test_streaming_stats():
+    """Test that merged streaming partials match numpy/pandas over the full stream"""
+    print("\n" + "="*60)
+    print("Testing Streaming Statistics...")
+    print("="*60)
+    
+    import numpy as np
+    import pandas as pd
+    from src.streaming_stats import StreamingStatistic
+    
+    rng = np.random.default_rng(1)
+    values = rng.lognormal(12.0, 1.5, 500)
+    window, alpha = 30, 0.2
+    
+    try:
+        # Three partials over consecutive segments, merged in order
+        partials = []
+        for segment in np.split(values, [170, 340]):
+            stat = StreamingStatistic(window, alpha)
+            for value in segment:
+                stat.update(value)
+            partials.append(stat)
+        merged = partials[0].merge(partials[1]).merge(partials[2])
+        result = merged.to_dict()
+        
+        tail = values[-window:]
+        expected = {
+            'count': len(values),
+            'mean': values.mean(),
+            'variance': values.var(ddof=1),
+            'min': values.min(),
+            'max': values.max(),
+            'ewma': pd.Series(values).ewm(alpha=alpha, adjust=True).mean().iloc[-1],
+            'rolling_mean': tail.mean(),
+            'rolling_variance': tail.var(ddof=1),
+            'rolling_max': tail.max()
+        }
+        
+        all_ok = True
+        for name, value in expected.items():
+            ok = np.isclose(result[name], value, rtol=1e-9)
+            all_ok = all_ok and ok
+            status = "✅" if ok else "❌"
+            print(f"{status} {name}: {result[name]:.6g} (expected {value:.6g})")
+        
+        return all_ok
+    except Exception as e:
+        print(f"❌ Streaming statistics test failed: {str(e)}")
+        return False
+
+def test_scenario_engine():
+    """Test batched scenario evaluation against a brute-force loop on a tiny grid"""
+    print("\n" + "="*60)
+    print("Testing Scenario Engine...")
+    print("="*60)
+    
+    import numpy as np
+    from src.data_processor import LiquidationDataProcessor
+    from src.scenario_engine import LiquidationScenarioEngine, linear_impact
+    
+    processor = LiquidationDataProcessor(make_sample_response(num_levels=40))
+    engine = LiquidationScenarioEngine(processor)
+    current_price = processor.current_price
+    
+    rng = np.random.default_rng(2)
+    paths = current_price * (1 + np.cumsum(rng.normal(0, 0.04, (25, 6)), axis=1))
+    impact = linear_impact(5e6)
+    
+    def brute_force(low, high):
+        """Liquidated USD per leverage and side by scanning every level"""
+        result = np.zeros((len(engine.leverage_levels), 2))
+        for idx, leverage in enumerate(engine.leverage_levels):
+            for price, level in processor.get_leverage_data(leverage)[['liq_price', 'liq_level']].values:
+                if low <= price < current_price:
+                    result[idx, 0] += level
+                elif current_price <= price <= high:
+                    result[idx, 1] += level
+        return result
+    
+    try:
+        batched = engine.evaluate_paths(paths, cumulative=True)
+        cascaded = engine.evaluate_paths(paths, cascade=True, impact=impact)
+        
+        plain_ok = cumulative_ok = cascade_ok = True
+        for i, path in enumerate(paths):
+            low, high = min(path.min(), current_price), max(path.max(), current_price)
+            plain_ok &= np.allclose(batched['liquidated'][i], brute_force(low, high))
+            
+            for step in range(len(path)):
+                step_low = min(path[:step + 1].min(), current_price)
+                step_high = max(path[:step + 1].max(), current_price)
+                cumulative_ok &= np.allclose(
+                    batched['cumulative'][i, step], brute_force(step_low, step_high)
+                )
+            
+            # Same number of fixed-point iterations as the batch
+            cascade_low, cascade_high = low, high
+            for _ in range(cascaded['cascade_iterations']):
+                liquidated = brute_force(cascade_low, cascade_high).sum(axis=0)
+                cascade_low = max(low * (1 - impact(liquidated[0])), 0.0)
+                cascade_high = high * (1 + impact(liquidated[1]))
+            cascade_ok &= (np.isclose(cascaded['low'][i], cascade_low)
+                           and np.isclose(cascaded['high'][i], cascade_high))
+        
+        for name, ok in [("Paths", plain_ok), ("Cumulative", cumulative_ok), ("Cascade", cascade_ok)]:
+            status = "✅" if ok else "❌"
+            print(f"{status} {name} match brute force ({len(paths)} paths)")
+        
+        return bool(plain_ok and cumulative_ok and cascade_ok)
+    except Exception as e:
+        print(f"❌ Scenario engine test failed: {str(e)}")
+        return False
+
+def test_chunked_parity():
+    """Test that chunked processing matches the in-memory processor"""
+    print("\n" + "="*60)
+    print("Testing Chunked Processing Parity...")
+    print("="*60)
+    
+    import copy
+    import numpy as np
+    import pandas as pd
+    from src.data_processor import LiquidationDataProcessor
+    from src import chunked_processor
+    from src.chunked_processor import ChunkedLiquidationProcessor
+    
+    raw_data = make_sample_response(num_levels=500, seed=4)
+    original = copy.deepcopy(raw_data)
+    
+    try:
+        dense = LiquidationDataProcessor(raw_data)
+        chunked = ChunkedLiquidationProcessor(raw_data, chunk_size=37, measure_memory=True)
+        
+        dense_summary = dense.get_liquidation_summary()
+        chunked_summary = chunked.get_liquidation_summary()
+        summary_ok = (
+            np.allclose(dense_summary.drop(columns=['leverage', 'price_range']).to_numpy(float),
+                        chunked_summary.drop(columns=['leverage', 'price_range']).to_numpy(float))
+            and np.allclose(np.vstack(dense_summary['price_range']),
+                            np.vstack(chunked_summary['price_range']))
+        )
+        
+        zones_ok = True
+        for leverage in ['10x', '25x', '50x', '100x']:
+            dense_zones = dense.identify_critical_zones(leverage, 15).reset_index(drop=True)
+            chunked_zones = chunked.identify_critical_zones(leverage, 15)
+            pd.testing.assert_frame_equal(dense_zones, chunked_zones, check_dtype=False)
+        
+        near_ok = np.allclose(list(dense.get_near_spot_liquidation().values()),
+                              list(chunked.get_near_spot_liquidation().values()))
+        untouched_ok = raw_data == original and chunked.raw_data is None
+        traced_ok = chunked.get_memory_report()['peak_traced_bytes'] is not None
+        
+        # Mismatched columns are an error for that leverage, as in the in-memory processor
+        broken = copy.deepcopy(raw_data)
+        broken['data']['data']['liq_10x_map_data']['data'][0]['liq_level'].pop()
+        mismatch_ok = '10x' not in ChunkedLiquidationProcessor(broken).aggregates
+        
+        # Underestimated rows overshoot the budget: traced chunks shrink to fit,
+        # and a budget that single rows exceed is an error
+        large = make_sample_response(num_levels=5000, seed=12)
+        estimate = chunked_processor.ESTIMATED_BYTES_PER_ROW
+        chunked_processor.ESTIMATED_BYTES_PER_ROW = 1
+        try:
+            shrunk = ChunkedLiquidationProcessor(large, memory_budget_mb=0.1, measure_memory=True)
+            budget_ok = shrunk.chunk_size < 5000 and np.allclose(
+                LiquidationDataProcessor(large).get_liquidation_summary()['total_liquidation_amount'],
+                shrunk.get_liquidation_summary()['total_liquidation_amount']
+            )
+            try:
+                ChunkedLiquidationProcessor(large, memory_budget_mb=0.0125, measure_memory=True)
+                budget_ok = False
+            except MemoryError:
+                pass
+        finally:
+            chunked_processor.ESTIMATED_BYTES_PER_ROW = estimate
+        
+        checks = [
+            ("Summary matches", summary_ok),
+            ("Critical zones match", zones_ok),
+            ("Near-spot amounts match", near_ok),
+            ("Raw data left unmodified", untouched_ok),
+            ("Peak memory traced", traced_ok),
+            ("Mismatched column lengths rejected", mismatch_ok),
+            ("Memory budget enforced on traced peak", budget_ok)
+        ]
+        for name, ok in checks:
+            status = "✅" if ok else "❌"
+            print(f"{status} {name}")
+        
+        return all(ok for _, ok in checks)
+    except Exception as e:
+        print(f"❌ Chunked parity test failed: {str(e)}")
+        return False
+
+def test_sparse_parity():
+    """Test that sparse processing matches the in-memory processor"""
+    print("\n" + "="*60)
+    print("Testing Sparse Processing Parity...")
+    print("="*60)
+    
+    import copy
+    import tempfile
+    import numpy as np
+    import pandas as pd
+    from src.data_processor import LiquidationDataProcessor
+    from src.sparse_processor import SparseLiquidationProcessor
+    
+    raw_data = make_sample_response(num_levels=500, seed=8)
+    # Per-row market prices that differ between rows (and from the spot
+    # price) must survive, including in the last leverage block
+    for leverage, base in (('50x', 50000), ('100x', 49000)):
+        block = raw_data['data']['data'][f'liq_{leverage}_map_data']['data'][0]
+        block['price'] = [f"{base + i * 0.5:.1f}" for i in range(len(block['price']))]
+    
+    try:
+        dense = LiquidationDataProcessor(raw_data)
+        sparse = SparseLiquidationProcessor(raw_data, min_level=0.0)
+        
+        def matches(other):
+            summary_ok = np.allclose(
+                dense.get_liquidation_summary().drop(columns=['leverage', 'price_range']).to_numpy(float),
+                other.get_liquidation_summary().drop(columns=['leverage', 'price_range']).to_numpy(float)
+            )
+            for leverage in ['10x', '25x', '50x', '100x']:
+                pd.testing.assert_frame_equal(
+                    dense.identify_critical_zones(leverage, 15),
+                    other.identify_critical_zones(leverage, 15),
+                    check_dtype=False, check_index_type=False
+                )
+                # Sparse frames hold the non-zero rows of the dense frame
+                dense_df = dense.get_leverage_data(leverage)
+                pd.testing.assert_frame_equal(
+                    dense_df[dense_df['liq_level'] > 0],
+                    other.get_leverage_data(leverage),
+                    check_dtype=False, check_index_type=False
+                )
+            band_ok = np.allclose(
+                dense.get_price_band_summary(45000, 52000).drop(columns='leverage').to_numpy(float),
+                other.get_price_band_summary(45000, 52000).drop(columns='leverage').to_numpy(float)
+            )
+            return summary_ok and band_ok
+        
+        parity_ok = matches(sparse)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            saved = SparseLiquidationProcessor.load_or_process(raw_data, tmp, min_level=0.0)
+            warm = SparseLiquidationProcessor.load_or_process(raw_data, tmp, min_level=0.0)
+            dense_snapshot = LiquidationDataProcessor.load_or_process(raw_data, tmp)
+            round_trip_ok = (
+                saved.raw_data is not None and warm.raw_data is None
+                and isinstance(warm, SparseLiquidationProcessor)
+                and warm.current_price == dense.current_price and matches(warm)
+            )
+            separate_ok = (
+                not isinstance(dense_snapshot, SparseLiquidationProcessor)
+                and len(dense_snapshot.get_leverage_data('10x')) == 500
+            )
+        
+        broken = copy.deepcopy(raw_data)
+        broken['data']['data']['liq_10x_map_data']['data'][0]['liq_level'].pop()
+        mismatch_ok = '10x' not in SparseLiquidationProcessor(broken).sparse_data
+        
+        checks = [
+            ("Summary, zones, band and leverage data match", parity_ok),
+            ("Saved snapshot warm-starts with the same results", round_trip_ok),
+            ("Sparse and dense snapshots kept apart", separate_ok),
+            ("Mismatched column lengths rejected", mismatch_ok)
+        ]
+        for name, ok in checks:
+            status = "✅" if ok else "❌"
+            print(f"{status} {name}")
+        
+        return all(ok for _, ok in checks)
+    except Exception as e:
+        print(f"❌ Sparse parity test failed: {str(e)}")
+        return False
+
+def test_query_service():
+    """Test query service caching, single-flight and HTTP error mapping"""
+    print("\n" + "="*60)
+    print("Testing Query Service...")
+    print("="*60)
+    
+    import json
+    import tempfile
+    import threading
+    import time
+    import urllib.error
+    import urllib.request
+    from src.data_fetcher import UpstreamError
+    from src.query_service import LiquidationQueryService, create_server
+    
+    class FakeFetcher:
+        """Counts fetches; slow enough for concurrent queries to overlap"""
+        def __init__(self):
+            self.calls = 0
+            self.lock = threading.Lock()
+        
+        def fetch_liquidation_map(self, exchange, pair, time_type):
+            with self.lock:
+                self.calls += 1
+            time.sleep(0.2)
+            if pair == "FAIL":
+                raise UpstreamError("API request failed with status 503")
+            return make_sample_response(num_levels=200, seed=5)
+    
+    def get(path):
+        try:
+            with urllib.request.urlopen(f"{base}{path}", timeout=10) as res:
+                return res.status, json.loads(res.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            fetcher = FakeFetcher()
+            service = LiquidationQueryService(fetcher=fetcher, processed_dir=tmp)
+            server = create_server(service, "127.0.0.1", 0)
+            base = f"http://127.0.0.1:{server.server_address[1]}"
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            
+            try:
+                statuses = []
+                threads = [
+                    threading.Thread(target=lambda: statuses.append(get("/zones?leverage=25x")[0]))
+                    for _ in range(4)
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                single_flight_ok = statuses == [200] * 4 and fetcher.calls == 1
+                
+                hits = service.get_stats()['responses']['hits']
+                status, zones = get("/zones?leverage=25x")
+                cache_hit_ok = (
+                    status == 200 and len(zones) == 10
+                    and service.get_stats()['responses']['hits'] == hits + 1
+                    and fetcher.calls == 1
+                )
+                
+                bad_leverage_ok = get("/zones?leverage=7x")[0] == 400
+                bad_number_ok = get("/zones?top_n=ten")[0] == 400 and get("/band?low=2&high=1")[0] == 400
+                upstream_ok = get("/summary?pair=FAIL")[0] == 502
+                not_found_ok = get("/nothing")[0] == 404
+            finally:
+                server.shutdown()
+                server.server_close()
+        
+        checks = [
+            ("Concurrent identical queries fetch once", single_flight_ok),
+            ("Repeated query served from cache", cache_hit_ok),
+            ("Unknown leverage returns 400", bad_leverage_ok),
+            ("Invalid numbers return 400", bad_number_ok),
+            ("Upstream failure returns 502", upstream_ok),
+            ("Unknown endpoint returns 404", not_found_ok)
+        ]
+        for name, ok in checks:
+            status = "✅" if ok else "❌"
+            print(f"{status} {name}")
+        
+        return all(ok for _, ok in checks)
+    except Exception as e:
+        print(f"❌ Query service test failed: {str(e)}")
+        return False
+
+def test_timeframe_comparison():
+    """Test timeframe comparison deltas and zones against direct binning"""
+    print("\n" + "="*60)
+    print("Testing Timeframe Comparison...")
+    print("="*60)
+    
+    import copy
+    import numpy as np
+    from src.data_processor import LiquidationDataProcessor
+    from src.multi_timeframe import MultiTimeframeProcessor
+    
+    leverage_levels = ['10x', '25x', '50x', '100x']
+    
+    try:
+        # 24h is the 12h map with one 100x level raised by a known amount
+        raw_12h = make_sample_response(num_levels=300, seed=6)
+        raw_24h = copy.deepcopy(raw_12h)
+        levels = raw_24h['data']['data']['liq_100x_map_data']['data'][0]['liq_level']
+        bumped = int(np.argmax([float(v) for v in levels]))
+        levels[bumped] = str(float(levels[bumped]) + 5e6)
+        bumped_price = float(raw_24h['data']['data']['liq_100x_map_data']['data'][0]['liq_price'][bumped])
+        raw_4h = make_sample_response(num_levels=300, seed=7)
+        
+        processors = {
+            timeframe: LiquidationDataProcessor(raw)
+            for timeframe, raw in (('12h', raw_12h), ('24h', raw_24h), ('4h', raw_4h))
+        }
+        mtf = MultiTimeframeProcessor.from_processors(processors, num_bins=40)
+        comparison = mtf.compare(top_n=3)
+        
+        # Expected cube by binning every map directly
+        expected = np.stack([
+            np.stack([
+                np.histogram(
+                    processors[timeframe].get_leverage_data(leverage)['liq_price'],
+                    bins=mtf.price_edges,
+                    weights=processors[timeframe].get_leverage_data(leverage)['liq_level']
+                )[0]
+                for leverage in leverage_levels
+            ])
+            for timeframe in ['12h', '24h', '4h']
+        ])
+        cube_ok = np.allclose(mtf.get_cube(), expected)
+        deltas_ok = (
+            comparison['reference'] == '12h'
+            and np.allclose(comparison['deltas'], expected - expected[0])
+        )
+        
+        # The only change in 24h is the bumped 100x level
+        zones = comparison['zones']
+        changed = zones[zones['timeframe'] == '24h']
+        bump_ok = (
+            len(changed) == 1
+            and changed.iloc[0]['leverage'] == '100x'
+            and changed.iloc[0]['change'] == 'strengthened'
+            and np.isclose(changed.iloc[0]['delta'], 5e6)
+            and changed.iloc[0]['price_low'] <= bumped_price <= changed.iloc[0]['price_high']
+        )
+        
+        # Zones are the top_n largest changes per timeframe and leverage
+        other = zones[zones['timeframe'] == '4h']
+        top_ok = all(
+            np.allclose(
+                np.sort(other[(other['leverage'] == leverage)
+                              & (other['change'] == 'strengthened')]['delta'])[::-1],
+                [d for d in np.sort(comparison['deltas'][2, l])[::-1][:3] if d > 0]
+            )
+            for l, leverage in enumerate(leverage_levels)
+        )
+        
+        normalized = mtf.get_cube(normalize=True).sum(axis=-1)
+        normalize_ok = np.allclose(normalized[mtf.get_cube().sum(axis=-1) > 0], 1.0)
+        
+        checks = [
+            ("Aligned array matches direct binning", cube_ok),
+            ("Deltas are relative to the reference", deltas_ok),
+            ("Single changed level reported as strengthened", bump_ok),
+            ("Zones are the largest changes", top_ok),
+            ("Normalized maps sum to one", normalize_ok)
+        ]
+        for name, ok in checks:
+            status = "✅" if ok else "❌"
+            print(f"{status} {name}")
+        
+        return all(ok for _, ok in checks)
+    except Exception as e:
+        print(f"❌ Timeframe comparison test failed: {str(e)}")
+        return False
+
+def test_animation():
+    """Test rendering a GIF time-lapse from synthetic snapshots"""
+    print("\n" + "="*60)
+    print("Testing Animation...")
+    print("="*60)
+    
+    import os
+    import tempfile
+    from PIL import Image
+    from src.animation import LiquidationAnimator
+    from src.data_processor import LiquidationDataProcessor
+    
+    try:
+        snapshots = [
+            LiquidationDataProcessor(make_sample_response(num_levels=200, current_price=price, seed=seed))
+            for seed, price in enumerate([49000.0, 50000.0, 51000.0])
+        ]
+        animator = LiquidationAnimator(num_bins=30, dpi=30, fps=5)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "timelapse.gif")
+            stats = animator.render(snapshots, path, labels=['t0', 't1', 't2'])
+            
+            size_ok = os.path.getsize(path) > 0
+            with Image.open(path) as gif:
+                frames_ok = gif.format == 'GIF' and gif.n_frames == len(snapshots)
+                frame_size_ok = gif.size == tuple(stats['frame_size'])
+            stats_ok = stats['frames'] == len(snapshots) and stats['frames_per_second'] > 0
+            
+            try:
+                animator.render(snapshots, os.path.join(tmp, "timelapse.avi"))
+                format_ok = False
+            except ValueError:
+                format_ok = True
+        
+        checks = [
+            ("GIF file is non-empty", size_ok),
+            ("One GIF frame per snapshot", frames_ok),
+            ("Frame size matches render stats", frame_size_ok),
+            ("Render stats count every frame", stats_ok),
+            ("Unsupported format rejected", format_ok)
+        ]
+        for name, ok in checks:
+            status = "✅" if ok else "❌"
+            print(f"{status} {name}")
+        
+        return all(ok for _, ok in checks)
+    except Exception as e:
+        print(f"❌ Animation test failed: {str(e)}")
+        return False
+
+def test_command_line_modes():
+    """Test that conflicting command line modes are rejected"""
+    print("\n" + "="*60)
+    print("Testing Command Line Modes...")
+    print("="*60)
+    
+    import contextlib
+    import io
+    from main import parse_args
+    
+    def rejected(argv):
+        try:
+            with contextlib.redirect_stderr(io.StringIO()):
+                parse_args(argv)
+        except SystemExit:
+            return True
+        return False
+    
+    try:
+        checks = [
+            ("--batch --serve rejected", rejected(['--batch', '--serve'])),
+            ("--timeframes --animate rejected", rejected(['--timeframes', '--animate'])),
+            ("--batch --chunked rejected", rejected(['--batch', '--chunked'])),
+            ("--profile-memory --batch rejected", rejected(['--profile-memory', '--batch'])),
+            ("--chunked --sparse rejected", rejected(['--chunked', '--sparse'])),
+            ("--charts without --batch rejected", rejected(['--charts'])),
+            ("--port without --serve rejected", rejected(['--port', '9000'])),
+            ("--profile-memory --sparse accepted", not rejected(['--profile-memory', '--sparse'])),
+            ("--batch --charts accepted", not rejected(['--batch', '--charts'])),
+            ("--serve --port accepted", parse_args(['--serve', '--port', '0']).port == 0)
+        ]
+        for name, ok in checks:
+            status = "✅" if ok else "❌"
+            print(f"{status} {name}")
+        
+        return all(ok for _, ok in checks)
+    except Exception as e:
+        print(f"❌ Command line mode test failed: {str(e)}")
+        return False
+
+def _baseline_charts(processor, leverage="100x", top_n=10):
+    """Charts drawn as LiquidationVisualizer drew them before figure templates"""
+    import matplotlib.pyplot as plt
+    import numpy as np
+    import config
+    
+    current_price = processor.current_price
+    
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    axes = axes.flatten()
+    for idx, lev in enumerate(config.LEVERAGE_LEVELS):
+        df = processor.get_leverage_data(lev)
+        ax = axes[idx]
+        long_df = df[df['position_type'] == 'Long']
+        short_df = df[df['position_type'] == 'Short']
+        ax.bar(long_df['liq_price'], long_df['liq_level'],
+               width=50, color='red', alpha=0.6, label='Long')
+        ax.bar(short_df['liq_price'], short_df['liq_level'],
+               width=50, color='green', alpha=0.6, label='Short')
+        ax.axvline(current_price, color='blue', linestyle='--',
+                   linewidth=2, label='Current Price')
+        ax.set_xlabel('Price (USD)')
+        ax.set_ylabel('Liquidation Amount (USD)')
+        ax.set_title(f'{lev} Leverage', fontweight='bold')
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+    fig.suptitle('Liquidation Heatmap - All Leverage Levels',
+                 fontsize=16, fontweight='bold', y=1.00)
+    fig.tight_layout()
+    heatmap = fig
+    
+    summary = processor.get_liquidation_summary()
+    fig, axes = plt.subplots(2, 2, figsize=(14, 10))
+    axes[0, 0].bar(summary['leverage'], summary['total_liquidation_amount'], color='steelblue')
+    axes[0, 0].set_title('Total Liquidation Amount by Leverage')
+    axes[0, 0].set_ylabel('Amount (USD)')
+    axes[0, 0].tick_params(axis='x', rotation=0)
+    x = np.arange(len(summary))
+    width = 0.35
+    axes[0, 1].bar(x - width/2, summary['long_liquidation_amount'],
+                   width, label='Long', color='red', alpha=0.7)
+    axes[0, 1].bar(x + width/2, summary['short_liquidation_amount'],
+                   width, label='Short', color='green', alpha=0.7)
+    axes[0, 1].set_title('Long vs Short Liquidations')
+    axes[0, 1].set_xticks(x)
+    axes[0, 1].set_xticklabels(summary['leverage'])
+    axes[0, 1].legend()
+    axes[1, 0].bar(summary['leverage'], summary['num_liquidation_levels'], color='coral')
+    axes[1, 0].set_title('Number of Liquidation Levels')
+    axes[1, 0].set_ylabel('Count')
+    axes[1, 1].bar(summary['leverage'], summary['long_short_ratio'], color='purple', alpha=0.7)
+    axes[1, 1].set_title('Long/Short Liquidation Ratio')
+    axes[1, 1].axhline(y=1, color='black', linestyle='--', alpha=0.5)
+    axes[1, 1].set_ylabel('Ratio')
+    fig.tight_layout()
+    comparison = fig
+    
+    zones = processor.identify_critical_zones(leverage, top_n)
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
+    colors = ['red' if pt == 'Long' else 'green' for pt in zones['position_type']]
+    ax1.barh(range(len(zones)), zones['liq_level'], color=colors, alpha=0.7)
+    ax1.set_yticks(range(len(zones)))
+    ax1.set_yticklabels([f"${p:,.0f}" for p in zones['liq_price']])
+    ax1.set_xlabel('Liquidation Amount (USD)')
+    ax1.set_title(f'Top {top_n} Critical Liquidation Zones - {leverage}')
+    ax1.invert_yaxis()
+    ax2.barh(range(len(zones)), zones['distance_pct'], color=colors, alpha=0.7)
+    ax2.set_yticks(range(len(zones)))
+    ax2.set_yticklabels([f"${p:,.0f}" for p in zones['liq_price']])
+    ax2.set_xlabel('Distance from Current Price (%)')
+    ax2.set_title('Distance from Current Price')
+    ax2.axvline(x=0, color='blue', linestyle='--', linewidth=2)
+    ax2.invert_yaxis()
+    fig.tight_layout()
+    
+    return {'heatmap': heatmap, 'comparison': comparison, 'zones': fig}
+
+def test_figure_templates():
+    """Test that pooled figure templates draw the same pixels as the baseline charts"""
+    print("\n" + "="*60)
+    print("Testing Figure Templates...")
+    print("="*60)
+    
+    import io
+    import matplotlib.pyplot as plt
+    import numpy as np
+    from PIL import Image
+    import src.visualizer  # applies the chart style
+    import config
+    from src.data_processor import LiquidationDataProcessor
+    from src.figure_templates import FigureTemplate, FigureTemplates
+    
+    def pixels(fig):
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', dpi=40, bbox_inches='tight')
+        buffer.seek(0)
+        return np.asarray(Image.open(buffer))
+    
+    try:
+        try:
+            FigureTemplate()
+            abstract_ok = False
+        except TypeError:
+            abstract_ok = True
+        
+        templates = FigureTemplates()
+        checks = [("Template base class is abstract", abstract_ok)]
+        
+        # The second market reuses the layouts built for the first
+        for market, seed in (("first", 9), ("second", 10)):
+            processor = LiquidationDataProcessor(
+                make_sample_response(num_levels=120, current_price=30000.0 + seed * 1000, seed=seed)
+            )
+            leverage_data = {
+                leverage: processor.get_leverage_data(leverage)
+                for leverage in config.LEVERAGE_LEVELS
+            }
+            pooled = {
+                'heatmap': templates.heatmap.render(leverage_data, processor.current_price),
+                'comparison': templates.comparison.render(processor.get_liquidation_summary()),
+                'zones': templates.zones.render(
+                    processor.identify_critical_zones("100x", 10), "100x", 10
+                )
+            }
+            baseline = _baseline_charts(processor)
+            
+            for kind, fig in pooled.items():
+                expected = pixels(baseline[kind])
+                actual = pixels(fig)
+                same = expected.shape == actual.shape and np.array_equal(expected, actual)
+                checks.append((f"{kind} chart identical ({market} market)", same))
+                plt.close(baseline[kind])
+        
+        templates.close()
+        
+        for name, ok in checks:
+            status = "✅" if ok else "❌"
+            print(f"{status} {name}")
+        
+        return all(ok for _, ok in checks)
+    except Exception as e:
+        print(f"❌ Figure template test failed: {str(e)}")
+        return False
+
+def test_memory_profile():
+    """Test that --profile-memory reports every pipeline stage"""
+    print("\n" + "="*60)
+    print("Testing Memory Profile...")
+    print("="*60)
+    
+    import contextlib
+    import glob
+    import importlib
+    import io
+    import json
+    import os
+    import tempfile
+    import config
+    import main as pipeline
+    import src.profiling
+    
+    class FakeFetcher:
+        def __init__(self, *args, **kwargs):
+            pass
+        
+        def fetch_liquidation_map(self, exchange, pair, time_type):
+            return make_sample_response(num_levels=100, seed=11)
+    
+    saved = (pipeline.LiquidationDataFetcher, config.FIGURES_DIR,
+             config.REPORTS_DIR, config.PROCESSED_DATA_DIR)
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            pipeline.LiquidationDataFetcher = FakeFetcher
+            config.FIGURES_DIR = config.REPORTS_DIR = config.PROCESSED_DATA_DIR = tmp
+            
+            def run(argv):
+                args = pipeline.parse_args(argv)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    pipeline.main(chunked=args.chunked, sparse=args.sparse,
+                                  profile_memory=args.profile_memory)
+                reports = glob.glob(os.path.join(tmp, "memory_profile_*.json"))
+                with open(max(reports, key=os.path.getmtime)) as f:
+                    stages = json.load(f)['stages']
+                for report in glob.glob(os.path.join(tmp, "memory_profile_*")):
+                    os.remove(report)
+                return stages
+            
+            stages = run(['--profile-memory'])
+            chunked_stages = run(['--profile-memory', '--chunked'])
+        
+        names = [stage['stage'] for stage in stages]
+        stages_ok = names == ['fetch', 'process', 'combine', 'statistics', 'visualize']
+        # The chunked pipeline frees the decoded response once it is folded
+        chunked_ok = (
+            [stage['stage'] for stage in chunked_stages] == ['fetch', 'process', 'statistics', 'visualize']
+            and chunked_stages[1]['retained_bytes'] < 0
+        )
+        metrics_ok = all(
+            stage['peak_bytes'] >= stage['retained_bytes'] and stage['seconds'] >= 0
+            for stage in stages
+        )
+        
+        # Without the Unix-only resource module the profiler still imports
+        original = sys.modules.get('resource')
+        sys.modules['resource'] = None
+        try:
+            portable_ok = importlib.reload(src.profiling).resource is None
+        finally:
+            if original is None:
+                del sys.modules['resource']
+            else:
+                sys.modules['resource'] = original
+            importlib.reload(src.profiling)
+        
+        checks = [
+            ("Report has a row for each stage", stages_ok),
+            ("Peak at least retained memory", metrics_ok),
+            ("Chunked run releases the raw response", chunked_ok),
+            ("Profiler imports without resource module", portable_ok)
+        ]
+        for name, ok in checks:
+            status = "✅" if ok else "❌"
+            print(f"{status} {name}")
+        
+        return all(ok for _, ok in checks)
+    except Exception as e:
+        print(f"❌ Memory profile test failed: {str(e)}")
+        return False
+    finally:
+        (pipeline.LiquidationDataFetcher, config.FIGURES_DIR,
+         config.REPORTS_DIR, config.PROCESSED_DATA_DIR) = saved
+
 def main():
     """Run all tests"""
     print("\n" + "="*60)
@@ -170,6 +1485,21 @@ def main():
     results.append(("Directory Structure", test_directories()))
     results.append(("Configuration", test_config()))
     results.append(("Sample Data", test_sample_data()))
+    results.append(("Compressed Transfer", test_compressed_transfer()))
+    results.append(("Fetch Retries", test_fetch_retries()))
+    results.append(("Artifact Writer", test_artifact_writer()))
+    results.append(("Warm Start", test_warm_start()))
+    results.append(("Batch Runner", test_batch_runner()))
+    results.append(("Streaming Statistics", test_streaming_stats()))
+    results.append(("Scenario Engine", test_scenario_engine()))
+    results.append(("Chunked Parity", test_chunked_parity()))
+    results.append(("Sparse Parity", test_sparse_parity()))
+    results.append(("Query Service", test_query_service()))
+    results.append(("Timeframe Comparison", test_timeframe_comparison()))
+    results.append(("Animation", test_animation()))
+    results.append(("Command Line Modes", test_command_line_modes()))
+    results.append(("Figure Templates", test_figure_templates()))
+    results.append(("Memory Profile", test_memory_profile()))
     
     # Summary
     print("\n" + "="*60)